@@ -1,13 +1,25 @@
 import pandas as pd
+import numpy as np
 import os
 import logging
+from backtest.kline_store import read_partitions, to_millis, TIME_FIELD
+from market.resampler import resample_klines
 
-def load_historical_data(filepath: str):
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def load_historical_data(filepath: str, start=None, end=None, columns: list = None, timeframe: str = None):
     """
-    Load historical market data from a CSV file.
+    Load historical market data from a CSV file or a kline store partition.
 
     Parameters:
-    - filepath: Path to the CSV file containing historical data.
+    - filepath: Path to the CSV file containing historical data, or to a
+      '<store root>/<SYMBOL>/<interval>' directory of the columnar kline store.
+    - start: Optional inclusive start (epoch ms, date string or Timestamp).
+    - end: Optional exclusive end (epoch ms, date string or Timestamp).
+    - columns: Optional list of columns to load.
+    - timeframe: Optional higher interval (e.g., 4h) to resample the loaded
+      candles to. The base interval is taken from the store path, or inferred
+      from the open times of a CSV file.
 
     Returns:
     - DataFrame containing the historical data.
@@ -17,12 +29,29 @@ def load_historical_data(filepath: str):
         raise FileNotFoundError(f"File not found: {filepath}")
 
     try:
-        data = pd.read_csv(filepath)
-        data['close'] = data['close'].astype(float)
-        data['open'] = data['open'].astype(float)
-        data['high'] = data['high'].astype(float)
-        data['low'] = data['low'].astype(float)
-        data['volume'] = data['volume'].astype(float)
+        if os.path.isdir(filepath):
+            data = read_partitions(filepath, start, end, columns)
+        else:
+            usecols = None
+            if columns is not None:
+                usecols = list(columns)
+                if (start is not None or end is not None) and TIME_FIELD not in usecols:
+                    usecols.insert(0, TIME_FIELD)
+            dtypes = {column: np.float64 for column in PRICE_COLUMNS}
+            data = pd.read_csv(filepath, usecols=usecols, dtype=dtypes)
+            if start is not None or end is not None:
+                if TIME_FIELD not in data.columns:
+                    raise ValueError(f"Time-range filtering needs an '{TIME_FIELD}' column in {filepath}")
+                times = data[TIME_FIELD]
+                mask = np.ones(len(data), dtype=bool)
+                if start is not None:
+                    mask &= (times >= to_millis(start)).to_numpy()
+                if end is not None:
+                    mask &= (times < to_millis(end)).to_numpy()
+                data = data[mask].reset_index(drop=True)
+        if timeframe is not None:
+            base_interval = os.path.basename(os.path.normpath(filepath)) if os.path.isdir(filepath) else None
+            data = resample_klines(data, timeframe, base_interval)
         logging.info(f"Data loaded successfully from {filepath}.")
         return data
     except Exception as e:
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from binance.client import Client
+from backtest.kline_store import FIELD_DTYPES, TIME_FIELD, to_millis, partition_path, write_klines, read_partitions
+from market.kline_cache import MAX_KLINES_PER_REQUEST, parse_klines
+from market.kline_stream import interval_to_millis
+from market.rate_limiter import RateLimitedClient, WeightBudget, DEFAULT_WEIGHT_LIMIT
+
+CHECKPOINT_FILE = 'download_checkpoint.json'
+
+def plan_units(start_ms: int, end_ms: int, interval_ms: int):
+    """
+    Split [start_ms, end_ms) into month-aligned units of get_klines pages.
+
+    Each unit is written to the store in one go, so a month partition is
+    rewritten once per run instead of once per page.
+
+    Returns:
+    - List of (unit_start, unit_end, [(page_start, page_end), ...]).
+    """
+    units = []
+    page_span = interval_ms * MAX_KLINES_PER_REQUEST
+    month = pd.Timestamp(start_ms, unit='ms', tz='UTC').normalize().replace(day=1)
+    while int(month.value // 1_000_000) < end_ms:
+        next_month = month + pd.offsets.MonthBegin(1)
+        unit_start = max(start_ms, int(month.value // 1_000_000))
+        unit_end = min(end_ms, int(next_month.value // 1_000_000))
+        pages = [(page, min(page + page_span, unit_end)) for page in range(unit_start, unit_end, page_span)]
+        units.append((unit_start, unit_end, pages))
+        month = next_month
+    return units
+
+def find_gaps(open_times: np.ndarray, interval_ms: int, start_ms: int = None):
+    """
+    Locate missing candles in a sorted open-time array.
+
+    Parameters:
+    - open_times: Sorted open times in epoch ms.
+    - interval_ms: Candle length in milliseconds.
+    - start_ms: Optional range start; candles missing before the first one are reported too.
+
+    Returns:
+    - List of (first missing open time, number of missing candles).
+    """
+    gaps = []
+    if start_ms is not None:
+        expected = -(-start_ms // interval_ms) * interval_ms
+        first = int(open_times[0]) if len(open_times) else expected
+        if first > expected:
+            gaps.append((expected, (first - expected) // interval_ms))
+    steps = np.diff(open_times)
+    positions = np.flatnonzero(steps != interval_ms)
+    gaps += [(int(open_times[i] + interval_ms), int(steps[i] // interval_ms - 1)) for i in positions]
+    return gaps
+
+class Checkpoint:
+    """Completed download units of one symbol/interval, persisted next to its partitions."""
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, CHECKPOINT_FILE)
+        self.done = set()
+        if os.path.exists(self.path):
+            with open(self.path) as file:
+                self.done = {tuple(unit) for unit in json.load(file)['done']}
+
+    def is_done(self, unit_start: int, unit_end: int):
+        return (unit_start, unit_end) in self.done
+
+    def mark_done(self, unit_start: int, unit_end: int):
+        # A unit replaces any earlier entry for the same month (e.g. a trailing unit that ended at a previous "now")
+        self.done = {unit for unit in self.done if unit[0] != unit_start}
+        self.done.add((unit_start, unit_end))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({'done': sorted(self.done)}, file)
+        os.replace(tmp_path, self.path)
+
+def fetch_page(client, symbol: str, interval: str, page_start: int, page_end: int, retries: int = 3):
+    """Fetch the candles opening in [page_start, page_end), retrying transient failures."""
+    for attempt in range(retries + 1):
+        try:
+            return client.get_klines(symbol=symbol, interval=interval, startTime=page_start,
+                                     endTime=page_end - 1, limit=MAX_KLINES_PER_REQUEST)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = 2 ** attempt
+            logging.warning(f"get_klines {symbol} {interval} @ {page_start} failed ({e}); retrying in {delay}s.")
+            time.sleep(delay)
+
+def download(client, root: str, symbols: list, interval: str, start, end, workers: int = 8,
+             max_pending_pages: int = None):
+    """
+    Download [start, end) klines for every symbol into the kline store.
+
+    Pages of up to 1000 candles are fetched concurrently on a thread pool;
+    pass a RateLimitedClient to keep the pool inside the request-weight
+    budget. Pages are grouped by month, and each completed month is written
+    to the store (which deduplicates on open time) and checkpointed once it
+    lies wholly in the past, so an interrupted run resumes with the first
+    unfinished month. Finally every
+    symbol's range is checked for gaps.
+
+    Parameters:
+    - client: Binance Client object (ideally a RateLimitedClient).
+    - root: Kline store root directory.
+    - symbols: Trading pairs to download.
+    - interval: Kline interval (e.g., 1m, 1h).
+    - start: Inclusive start (epoch ms, date string or Timestamp).
+    - end: Exclusive end (epoch ms, date string or Timestamp).
+    - workers: Concurrent get_klines requests.
+    - max_pending_pages: Pages in flight before waiting (bounds memory); defaults to 4 * workers.
+
+    Returns:
+    - Dictionary with candles, seconds, candles_per_second, skipped units and gaps per symbol.
+    """
+    start_ms, end_ms = to_millis(start), to_millis(end)
+    interval_ms = interval_to_millis(interval)
+    max_pending_pages = max_pending_pages or 4 * workers
+    checkpoints = {symbol: Checkpoint(partition_path(root, symbol, interval)) for symbol in symbols}
+    units = [(symbol, *unit) for symbol in symbols for unit in plan_units(start_ms, end_ms, interval_ms)]
+
+    candles, skipped = 0, 0
+    began = time.perf_counter()
+    pending = deque()
+
+    def finish(symbol, unit_start, unit_end, futures):
+        rows = [kline for future in futures for kline in future.result()]
+        if rows:
+            frame = pd.DataFrame(parse_klines(rows, list(FIELD_DTYPES)))
+            # Keep the unit's range and never store the still-forming candle
+            frame = frame[(frame[TIME_FIELD] >= unit_start) & (frame[TIME_FIELD] < unit_end)
+                          & (frame['close_time'] < time.time() * 1000)]
+            write_klines(root, symbol, interval, frame)
+        # A unit reaching into the future still has candles to come
+        if unit_end <= time.time() * 1000:
+            checkpoints[symbol].mark_done(unit_start, unit_end)
+        return len(rows)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for symbol, unit_start, unit_end, pages in units:
+            if checkpoints[symbol].is_done(unit_start, unit_end):
+                skipped += 1
+                continue
+            futures = [executor.submit(fetch_page, client, symbol, interval, page_start, page_end)
+                       for page_start, page_end in pages]
+            pending.append((symbol, unit_start, unit_end, futures))
+            while sum(len(unit[3]) for unit in pending) > max_pending_pages:
+                candles += finish(*pending.popleft())
+                logging.info(f"Downloaded {candles} candles ({candles / (time.perf_counter() - began):.0f}/s).")
+        while pending:
+            candles += finish(*pending.popleft())
+
+    seconds = time.perf_counter() - began
+    gaps = {}
+    for symbol in symbols:
+        path = partition_path(root, symbol, interval)
+        if not os.path.isdir(path) or not any(os.path.isdir(os.path.join(path, name)) for name in os.listdir(path)):
+            times = np.empty(0, dtype=np.int64)
+        else:
+            times = read_partitions(path, start_ms, end_ms, [TIME_FIELD])[TIME_FIELD].to_numpy()
+        gaps[symbol] = find_gaps(times, interval_ms, start_ms)
+        if gaps[symbol]:
+            missing = sum(count for _, count in gaps[symbol])
+            logging.warning(f"{symbol} {interval}: {len(gaps[symbol])} gaps, {missing} candles missing.")
+    return {
+        'candles': candles,
+        'seconds': seconds,
+        'candles_per_second': candles / seconds if seconds else 0.0,
+        'skipped_units': skipped,
+        'gaps': gaps,
+    }
+
+def main(argv=None):
+    """Command-line entry point: python -m backtest.downloader ROOT --symbols BTCUSDT --interval 1m --start 2023-01-01"""
+    parser = argparse.ArgumentParser(description="Download historical klines into the columnar kline store.")
+    parser.add_argument('root', help="Kline store root directory.")
+    parser.add_argument('--symbols', nargs='+', required=True)
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--start', required=True)
+    parser.add_argument('--end', default=None, help="Exclusive end (defaults to now).")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--weight-limit', type=int, default=DEFAULT_WEIGHT_LIMIT)
+    parser.add_argument('--api-url', help="Override the REST base URL (e.g. a local mock exchange).")
+    args = parser.parse_args(argv)
+
+    client = Client(os.getenv("BINANCE_API_KEY"), os.getenv("BINANCE_SECRET_KEY"), ping=False)
+    if args.api_url:
+        client.API_URL = args.api_url
+    client = RateLimitedClient(client, WeightBudget(args.weight_limit))
+    end = args.end or pd.Timestamp.now(tz='UTC')
+    result = download(client, args.root, [symbol.upper() for symbol in args.symbols], args.interval,
+                      args.start, end, args.workers)
+    print(f"Downloaded {result['candles']} candles in {result['seconds']:.1f}s "
+          f"({result['candles_per_second']:.0f} candles/s), {result['skipped_units']} units already done.")
+    for symbol, gaps in result['gaps'].items():
+        missing = sum(count for _, count in gaps)
+        print(f"{symbol}: {len(gaps)} gaps, {missing} candles missing")
+
+if __name__ == "__main__":
+    main()
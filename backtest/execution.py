@@ -0,0 +1,287 @@
+import math
+import numpy as np
+import pandas as pd
+
+ORDER_TYPES = ('market', 'limit')
+LIMIT_FALLBACKS = ('market', 'cancel')
+
+# Execution settings read from the strategy config, with their defaults (no costs)
+EXECUTION_DEFAULTS = {
+    'taker_fee': 0.0,            # Fee of market orders, as a fraction of the notional
+    'maker_fee': 0.0,            # Fee of resting limit orders
+    'spread': 0.0,               # Full bid/ask spread as a fraction of the close; market orders pay half
+    'slippage': 0.0,             # Price impact per unit of participation: a fill of q units moves the price by slippage * q / volume
+    'max_participation': None,   # Largest fraction of a bar's volume one order can fill; the rest fills on later bars
+    'order_type': 'market',      # 'market' fills at the signal bar's close; 'limit' rests at limit_offset from it
+    'limit_offset': 0.0,         # Limit price below (buy) or above (sell) the signal bar's close, as a fraction
+    'limit_ttl': None,           # Bars a limit order rests before expiring (None: until the next signal)
+    'limit_fallback': 'market',  # On expiry, send the unfilled rest as a market order or cancel it
+}
+
+def execution_settings(config: dict):
+    """
+    Read the execution settings of a strategy config.
+
+    Parameters:
+    - config: Strategy configuration; missing keys take EXECUTION_DEFAULTS.
+
+    Returns:
+    - Dictionary with every EXECUTION_DEFAULTS key.
+    """
+    settings = {name: config.get(name, default) for name, default in EXECUTION_DEFAULTS.items()}
+    if settings['order_type'] not in ORDER_TYPES:
+        raise ValueError(f"Unknown order type: {settings['order_type']}")
+    if settings['limit_fallback'] not in LIMIT_FALLBACKS:
+        raise ValueError(f"Unknown limit fallback: {settings['limit_fallback']}")
+    if settings['max_participation'] is not None and not settings['max_participation'] > 0:
+        raise ValueError("max_participation must be positive")
+    return settings
+
+class _Book:
+    """Cash, holdings, fills and round trips of one execution run."""
+
+    def __init__(self, initial_balance: float):
+        self.cash = float(initial_balance)
+        self.held = 0.0
+        self.fills = []
+        self.trips = []
+        self.trip = None
+
+    def buy(self, bar: int, quantity: float, price: float, fee: float, liquidity: str, reference: float, spent_all: bool):
+        cost = quantity * price
+        # An order that used the whole balance leaves exactly nothing (not rounding residue)
+        self.cash = 0.0 if spent_all else self.cash - cost - fee
+        if self.trip is None:
+            self.trip = {'entry_bar': bar, 'bought': 0.0, 'cost': 0.0, 'sold': 0.0, 'proceeds': 0.0, 'fees': 0.0}
+        self.held += quantity
+        self.trip['bought'] += quantity
+        self.trip['cost'] += cost
+        self.trip['fees'] += fee
+        self.fills.append((bar, 1, quantity, price, fee, liquidity, reference, self.cash, self.held))
+
+    def sell(self, bar: int, quantity: float, price: float, fee: float, liquidity: str, reference: float):
+        proceeds = quantity * price
+        self.cash += proceeds - fee
+        self.held = 0.0 if quantity >= self.held else self.held - quantity
+        self.trip['sold'] += quantity
+        self.trip['proceeds'] += proceeds
+        self.trip['fees'] += fee
+        self.fills.append((bar, -1, quantity, price, fee, liquidity, reference, self.cash, self.held))
+        if self.held == 0.0:
+            self._close_trip(bar)
+
+    def _close_trip(self, bar: int):
+        trip = self.trip
+        self.trips.append((trip['entry_bar'], bar, trip['cost'] / trip['bought'], trip['proceeds'] / trip['sold'],
+                           trip['bought'], trip['fees'], self.cash))
+        self.trip = None
+
+def _affordable(cash: float, price: float, impact: float, fee: float):
+    """
+    Quantity a cash amount buys at `price` moved up by `impact` per unit, fees included.
+
+    Solves q * price * (1 + impact * q) * (1 + fee) = cash.
+    """
+    unit = price * (1 + fee)
+    if impact <= 0:
+        return cash / unit
+    # Stable root of impact*unit*q^2 + unit*q - cash = 0
+    return 2 * cash / (unit + math.sqrt(unit * unit + 4 * impact * unit * cash))
+
+class _Executor:
+    """Fills the orders of one run bar by bar against close, high, low and volume."""
+
+    def __init__(self, close, high, low, volume, settings: dict, book: _Book):
+        self.close, self.high, self.low, self.volume = close, high, low, volume
+        self.settings = settings
+        self.book = book
+        self.half_spread = settings['spread'] / 2
+        self.participation = settings['max_participation']
+
+    def _capacity(self, bar: int):
+        if self.participation is None:
+            return math.inf
+        volume = self.volume[bar] if self.volume is not None else math.nan
+        return self.participation * volume if volume > 0 else 0.0
+
+    def _impact(self, bar: int):
+        """Price move per unit traded on a bar (0 without slippage or volume)."""
+        if not self.settings['slippage'] or self.volume is None:
+            return 0.0
+        volume = self.volume[bar]
+        return self.settings['slippage'] / volume if volume > 0 else 0.0
+
+    def market_fill(self, side: int, bar: int):
+        """Fill as much of a market order as bar allows; return True once the order is complete."""
+        book = self.book
+        capacity = self._capacity(bar)
+        if capacity <= 0:
+            return False
+        reference = float(self.close[bar])
+        impact = self._impact(bar)
+        fee = self.settings['taker_fee']
+        if side == 1:
+            price = reference * (1 + self.half_spread)
+            wanted = _affordable(book.cash, price, impact, fee)
+            quantity = min(wanted, capacity)
+            if quantity <= 0:
+                return True
+            price *= 1 + impact * quantity
+            book.buy(bar, quantity, price, quantity * price * fee, 'taker', reference, quantity >= wanted)
+            return quantity >= wanted
+        quantity = min(book.held, capacity)
+        price = max(0.0, reference * (1 - self.half_spread) * (1 - impact * quantity))
+        book.sell(bar, quantity, price, quantity * price * fee, 'taker', reference)
+        return book.held == 0.0
+
+    def market(self, side: int, start: int, end: int):
+        """Work a market order from bar start until it is complete or bar end."""
+        for bar in range(start, end):
+            if self.market_fill(side, bar):
+                return
+
+    def limit(self, side: int, start: int, end: int):
+        """
+        Rest a limit order placed at the close of bar start until it fills,
+        expires or the next signal (bar end) replaces it.
+
+        Returns:
+        - The bar at whose close an expired order is handed to the fallback, or None.
+        """
+        book = self.book
+        settings = self.settings
+        reference = float(self.close[start])
+        limit = reference * (1 - settings['limit_offset'] if side == 1 else 1 + settings['limit_offset'])
+        expiry = None if settings['limit_ttl'] is None else start + settings['limit_ttl']
+        stop = end if expiry is None else min(end, expiry + 1)
+        # Bars whose range reaches the limit price; the others are skipped without a Python step
+        prices = self.low[start + 1:stop] if side == 1 else self.high[start + 1:stop]
+        touched = np.flatnonzero(prices <= limit if side == 1 else prices >= limit) + start + 1
+        fee = settings['maker_fee']
+        for bar in touched.tolist():
+            capacity = self._capacity(bar)
+            if capacity <= 0:
+                continue
+            if side == 1:
+                wanted = book.cash / (limit * (1 + fee))
+                quantity = min(wanted, capacity)
+                book.buy(bar, quantity, limit, quantity * limit * fee, 'maker', float(self.close[bar]), quantity >= wanted)
+                if quantity >= wanted:
+                    return None
+            else:
+                quantity = min(book.held, capacity)
+                book.sell(bar, quantity, limit, quantity * limit * fee, 'maker', float(self.close[bar]))
+                if book.held == 0.0:
+                    return None
+        return expiry if expiry is not None and expiry < end else None
+
+def execute_signals(close: np.ndarray, buy: np.ndarray, sell: np.ndarray, initial_balance: float = 10000,
+                    high: np.ndarray = None, low: np.ndarray = None, volume: np.ndarray = None, config: dict = None):
+    """
+    Event-driven execution of all-in/all-out signals with trading costs.
+
+    The target position is the forward-filled last signal, as in
+    simulate_signals; each change of target is an event that sends an order
+    for the whole balance (buy) or holdings (sell). Market orders fill at the
+    close plus half the spread and a volume-proportional price impact and pay
+    the taker fee; limit orders rest at limit_offset from the signal close,
+    fill on later bars whose low (buy) or high (sell) reaches the limit and
+    pay the maker fee. With max_participation an order fills at most that
+    fraction of each bar's volume and the rest carries over to later bars
+    (partial fills). An order still working when the next event arrives is
+    cancelled. Only events and fills run in Python; bars in between are
+    skipped, so the cost is proportional to the number of orders.
+
+    Without costs and with unlimited participation the result equals
+    simulate_signals.
+
+    Parameters:
+    - close: Array of close prices.
+    - buy: Boolean array of buy signals.
+    - sell: Boolean array of sell signals.
+    - initial_balance: Starting cash balance.
+    - high, low: Bar ranges used to fill limit orders (default: close).
+    - volume: Bar volumes used for slippage and participation (required when either is set).
+    - config: Execution settings (see EXECUTION_DEFAULTS).
+
+    Returns:
+    - Dictionary with 'final_balance' (cash plus holdings at the last close),
+      'position', 'equity', 'trades' (round trips, with fees), 'fills',
+      'costs' (fees, spread and slippage paid) and 'orders' counters.
+    """
+    settings = execution_settings(config or {})
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    high = close if high is None else np.asarray(high, dtype=np.float64)
+    low = close if low is None else np.asarray(low, dtype=np.float64)
+    if volume is None and (settings['slippage'] or settings['max_participation'] is not None):
+        raise ValueError("slippage and max_participation need bar volumes")
+    volume = None if volume is None else np.asarray(volume, dtype=np.float64)
+    book = _Book(initial_balance)
+    executor = _Executor(close, high, low, volume, settings, book)
+
+    state = np.full(n, np.nan)
+    state[sell] = 0.0
+    state[buy] = 1.0
+    target = pd.Series(state).ffill().fillna(0.0).to_numpy(dtype=np.int8)
+    change = np.diff(target, prepend=np.int8(0))
+    events = np.flatnonzero(change)
+    orders = {'submitted': 0, 'filled': 0, 'partial': 0, 'unfilled': 0}
+
+    for start, end in zip(events.tolist(), np.append(events[1:], n).tolist()):
+        side = int(change[start])
+        if (book.cash if side == 1 else book.held) <= 0:
+            continue
+        orders['submitted'] += 1
+        fills = len(book.fills)
+        if settings['order_type'] == 'market':
+            executor.market(side, start, end)
+        else:
+            expiry = executor.limit(side, start, end)
+            if expiry is not None and settings['limit_fallback'] == 'market':
+                executor.market(side, expiry, end)
+        remaining = book.cash if side == 1 else book.held
+        if len(book.fills) == fills:
+            orders['unfilled'] += 1
+        elif remaining > 0:
+            orders['partial'] += 1
+        else:
+            orders['filled'] += 1
+
+    fills = pd.DataFrame(book.fills, columns=['bar', 'side', 'quantity', 'price', 'fee', 'liquidity',
+                                              'reference', 'cash', 'held'])
+    # Per-bar state after the last fill of each bar (initial state before the first fill)
+    last = np.searchsorted(fills['bar'].to_numpy(dtype=np.int64), np.arange(n), side='right') - 1
+    cash_levels = np.concatenate(([float(initial_balance)], fills['cash'].to_numpy(dtype=np.float64)))
+    held_levels = np.concatenate(([0.0], fills['held'].to_numpy(dtype=np.float64)))
+    cash = cash_levels[last + 1]
+    held = held_levels[last + 1]
+    equity = cash + held * close
+
+    if book.trip is not None:
+        # Holdings still open are marked at the last close, like simulate_signals
+        trip = book.trip
+        book.trips.append((trip['entry_bar'], n - 1, trip['cost'] / trip['bought'],
+                           (trip['proceeds'] + book.held * close[-1]) / (trip['sold'] + book.held),
+                           trip['bought'], trip['fees'], float(equity[-1])))
+    trades = pd.DataFrame(book.trips, columns=['entry_bar', 'exit_bar', 'entry_price', 'exit_price',
+                                               'quantity', 'fees', 'balance'])
+    trades['pnl'] = (trades['exit_price'] - trades['entry_price']) * trades['quantity'] - trades['fees']
+
+    notional = fills['quantity'] * fills['reference']
+    market = fills['liquidity'] == 'taker'
+    costs = {
+        'fees': float(fills['fee'].sum()),
+        'spread': float((notional[market] * settings['spread'] / 2).sum()),
+        'slippage': float((fills['side'] * (fills['price'] - fills['reference']) * fills['quantity'])[market].sum()
+                          - (notional[market] * settings['spread'] / 2).sum()),
+    }
+    return {
+        'final_balance': float(equity[-1]) if n else float(initial_balance),
+        'position': (held > 0).astype(np.int8),
+        'equity': equity,
+        'trades': trades,
+        'fills': fills.drop(columns=['cash', 'held']),
+        'costs': costs,
+        'orders': orders,
+    }
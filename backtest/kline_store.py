@@ -0,0 +1,224 @@
+import os
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+# Typed layout of every field the store knows about; one .npy file per field
+FIELD_DTYPES = {
+    'open_time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_asset_volume': np.float64,
+    'number_of_trades': np.int64,
+    'taker_buy_base_asset_volume': np.float64,
+    'taker_buy_quote_asset_volume': np.float64,
+}
+
+TIME_FIELD = 'open_time'
+
+def to_millis(value):
+    """
+    Convert a timestamp-like value to epoch milliseconds (UTC).
+
+    Parameters:
+    - value: None, epoch milliseconds, a date string or a Timestamp/datetime.
+
+    Returns:
+    - Integer milliseconds, or None when value is None.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int(timestamp.value // 1_000_000)
+
+def partition_path(root: str, symbol: str, interval: str):
+    """Return the directory holding the monthly partitions of symbol/interval."""
+    return os.path.join(root, symbol.upper(), interval)
+
+def _month_key(open_times: np.ndarray):
+    return open_times.astype('datetime64[ms]').astype('datetime64[M]')
+
+def _month_bounds(month: str):
+    begin = np.datetime64(month, 'M')
+    return int(begin.astype('datetime64[ms]').astype(np.int64)), int((begin + 1).astype('datetime64[ms]').astype(np.int64))
+
+def _load_partition(month_dir: str, fields: list, mmap_mode=None):
+    return {field: np.load(os.path.join(month_dir, f"{field}.npy"), mmap_mode=mmap_mode) for field in fields}
+
+def _save_array(path: str, array: np.ndarray):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        np.save(file, array)
+    os.replace(tmp_path, path)
+
+def _stored_fields(month_dir: str):
+    return [field for field in FIELD_DTYPES if os.path.exists(os.path.join(month_dir, f"{field}.npy"))]
+
+def write_klines(root: str, symbol: str, interval: str, data: pd.DataFrame):
+    """
+    Write klines into the store, partitioned by month of open time.
+
+    Existing partitions are merged: rows are deduplicated on open time (new
+    rows win) and kept sorted.
+
+    Parameters:
+    - root: Store root directory.
+    - symbol: Trading pair (e.g., BTCUSDT).
+    - interval: Kline interval (e.g., 1m, 1h).
+    - data: DataFrame with an 'open_time' column in epoch milliseconds.
+
+    Returns:
+    - Number of rows written.
+    """
+    if TIME_FIELD not in data.columns:
+        raise ValueError(f"Kline data must contain an '{TIME_FIELD}' column.")
+    fields = [field for field in FIELD_DTYPES if field in data.columns]
+    arrays = {field: data[field].to_numpy(dtype=FIELD_DTYPES[field]) for field in fields}
+    months = _month_key(arrays[TIME_FIELD])
+    base = partition_path(root, symbol, interval)
+
+    for month in np.unique(months):
+        mask = months == month
+        chunk = {field: arrays[field][mask] for field in fields}
+        month_dir = os.path.join(base, str(month))
+        if os.path.isdir(month_dir):
+            existing_fields = _stored_fields(month_dir)
+            if existing_fields != fields:
+                raise ValueError(f"Field mismatch with existing partition {month_dir}: {existing_fields} != {fields}")
+            existing = _load_partition(month_dir, fields)
+            chunk = {field: np.concatenate([existing[field], chunk[field]]) for field in fields}
+        else:
+            os.makedirs(month_dir)
+
+        # Keep the last occurrence of each open time, sorted ascending
+        reversed_times = chunk[TIME_FIELD][::-1]
+        _, first = np.unique(reversed_times, return_index=True)
+        keep = len(reversed_times) - 1 - first
+        for field in fields:
+            _save_array(os.path.join(month_dir, f"{field}.npy"), np.ascontiguousarray(chunk[field][keep]))
+    logging.info(f"Stored {len(data)} klines for {symbol} {interval} in {base}.")
+    return len(data)
+
+def read_partitions(path: str, start=None, end=None, columns: list = None):
+    """
+    Read a [start, end) time range from a symbol/interval partition directory.
+
+    Partitions are opened memory-mapped and sliced with a binary search on
+    open time, so only the bytes inside the range are read from disk.
+
+    Parameters:
+    - path: Directory returned by partition_path.
+    - start: Inclusive start (epoch ms, date string or Timestamp).
+    - end: Exclusive end (epoch ms, date string or Timestamp).
+    - columns: Fields to load; 'open_time' is always included.
+
+    Returns:
+    - DataFrame with the requested typed columns.
+    """
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No kline partitions found at: {path}")
+    start_ms, end_ms = to_millis(start), to_millis(end)
+    months = sorted(name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name)))
+    if not months:
+        raise FileNotFoundError(f"No kline partitions found at: {path}")
+
+    available = _stored_fields(os.path.join(path, months[0]))
+    fields = [TIME_FIELD] + [field for field in (columns or available) if field != TIME_FIELD]
+    missing = [field for field in fields if field not in available]
+    if missing:
+        raise KeyError(f"Columns not present in store: {missing}")
+
+    parts = {field: [] for field in fields}
+    for month in months:
+        month_begin, month_end = _month_bounds(month)
+        if (end_ms is not None and month_begin >= end_ms) or (start_ms is not None and month_end <= start_ms):
+            continue
+        arrays = _load_partition(os.path.join(path, month), fields, mmap_mode='r')
+        times = arrays[TIME_FIELD]
+        lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side='left'))
+        hi = len(times) if end_ms is None else int(np.searchsorted(times, end_ms, side='left'))
+        if hi <= lo:
+            continue
+        for field in fields:
+            parts[field].append(np.array(arrays[field][lo:hi]))
+
+    return pd.DataFrame({
+        field: np.concatenate(parts[field]) if parts[field] else np.empty(0, dtype=FIELD_DTYPES[field])
+        for field in fields
+    })
+
+def read_klines(root: str, symbol: str, interval: str, start=None, end=None, columns: list = None):
+    """
+    Read klines for symbol/interval from the store.
+
+    Parameters:
+    - root: Store root directory.
+    - symbol: Trading pair (e.g., BTCUSDT).
+    - interval: Kline interval (e.g., 1m, 1h).
+    - start: Inclusive start (epoch ms, date string or Timestamp).
+    - end: Exclusive end (epoch ms, date string or Timestamp).
+    - columns: Fields to load; 'open_time' is always included.
+
+    Returns:
+    - DataFrame with the requested typed columns.
+    """
+    return read_partitions(partition_path(root, symbol, interval), start, end, columns)
+
+def convert_csv_to_store(csv_path: str, root: str, symbol: str, interval: str, chunksize: int = 1_000_000):
+    """
+    One-time conversion of a kline CSV into the columnar store.
+
+    The CSV is read in chunks so peak memory stays bounded. Its 'open_time'
+    column may hold epoch milliseconds or date strings.
+
+    Parameters:
+    - csv_path: Path to the CSV file.
+    - root: Store root directory.
+    - symbol: Trading pair (e.g., BTCUSDT).
+    - interval: Kline interval (e.g., 1m, 1h).
+    - chunksize: Rows per CSV chunk.
+
+    Returns:
+    - Total number of rows converted.
+    """
+    if not os.path.exists(csv_path):
+        logging.error(f"File not found: {csv_path}")
+        raise FileNotFoundError(f"File not found: {csv_path}")
+
+    total = 0
+    for chunk in pd.read_csv(csv_path, usecols=lambda column: column in FIELD_DTYPES, chunksize=chunksize):
+        if TIME_FIELD not in chunk.columns:
+            raise ValueError(f"CSV must contain an '{TIME_FIELD}' column: {csv_path}")
+        if not pd.api.types.is_numeric_dtype(chunk[TIME_FIELD]):
+            chunk[TIME_FIELD] = pd.to_datetime(chunk[TIME_FIELD], utc=True).astype('datetime64[ms, UTC]').astype(np.int64)
+        total += write_klines(root, symbol, interval, chunk)
+    logging.info(f"Converted {total} rows from {csv_path} into {partition_path(root, symbol, interval)}.")
+    return total
+
+def main(argv=None):
+    """Command-line entry point: python -m backtest.kline_store convert CSV ROOT SYMBOL INTERVAL"""
+    parser = argparse.ArgumentParser(description="Columnar kline store utilities.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert = subparsers.add_parser('convert', help="Convert a kline CSV into the store.")
+    convert.add_argument('csv_path')
+    convert.add_argument('root')
+    convert.add_argument('symbol')
+    convert.add_argument('interval')
+    convert.add_argument('--chunksize', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        rows = convert_csv_to_store(args.csv_path, args.root, args.symbol, args.interval, args.chunksize)
+        print(f"Converted {rows} rows into {partition_path(args.root, args.symbol, args.interval)}")
+
+if __name__ == "__main__":
+    main()
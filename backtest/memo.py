@@ -0,0 +1,212 @@
+import os
+import json
+import pickle
+import hashlib
+import logging
+import threading
+import numpy as np
+
+# Default size cap of a memo directory
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# Eviction deletes least recently used entries until the memo is this fraction of its cap
+EVICT_TO = 0.8
+
+# Config keys that determine the result of simulating each strategy
+STRATEGY_PARAMS = {
+    'RSI': ('rsi_period', 'rsi_oversold', 'rsi_overbought'),
+    'MACD': ('fast_period', 'slow_period', 'signal_period'),
+    'SMA': ('short_window', 'long_window'),
+}
+
+def fingerprint(values: np.ndarray):
+    """
+    Content hash of a data array (e.g. the close column of a dataset).
+
+    Parameters:
+    - values: NumPy array.
+
+    Returns:
+    - Hex digest; equal arrays give equal digests whatever their origin.
+    """
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{values.dtype.str}{values.shape}".encode())
+    digest.update(memoryview(values).cast('B'))
+    return digest.hexdigest()
+
+def memo_key(*parts):
+    """Hash a tuple of JSON-serializable parts (name, fingerprint, parameters) into a memo key."""
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+def result_key(digest: str, strategy: str, config: dict):
+    """Memo key of a simulation result: only the parameters the strategy reads are part of it."""
+    params = {name: config.get(name) for name in STRATEGY_PARAMS.get(strategy, ())}
+    return memo_key('simulate', digest, strategy, params, config.get('initial_balance', 10000))
+
+class MemoCache:
+    """
+    Content-addressed on-disk memo of computed values.
+
+    Keys come from memo_key (a dataset fingerprint, a name and parameters),
+    so a value is reused by any run over the same data, in this process or
+    another. Each entry is one pickle file written atomically; reading an
+    entry refreshes its modification time, and when the directory grows past
+    max_bytes the least recently used entries are deleted. Several processes
+    may share a directory: each checks the cap against its own view and
+    rescans the directory before evicting.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Parameters:
+        - root: Directory holding the entries (created if missing).
+        - max_bytes: Size cap of the directory.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._bytes = sum(size for _, size, _ in self._entries())
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bytes_saved': 0, 'bytes_written': 0}
+
+    def _path(self, key: str):
+        return os.path.join(self.root, f"{key}.pkl")
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.root) as scan:
+            for entry in scan:
+                if entry.name.endswith('.pkl'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, key: str):
+        """
+        Return the value stored under key, or None on a miss.
+
+        Parameters:
+        - key: Memo key.
+
+        Returns:
+        - The stored value, or None.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                value = pickle.load(file)
+        except FileNotFoundError:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        except Exception as e:
+            logging.error(f"Discarding unreadable memo entry {path}: {e}")
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        try:
+            # The modification time orders entries for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += size
+        return value
+
+    def put(self, key: str, value):
+        """
+        Store value under key, evicting least recently used entries past the size cap.
+
+        Parameters:
+        - key: Memo key.
+        - value: Picklable value.
+        """
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, 'wb') as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+                size = file.tell()
+            os.replace(temporary, path)
+        except Exception as e:
+            logging.error(f"Failed to store memo entry {path}: {e}")
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        with self._lock:
+            self.stats['stores'] += 1
+            self.stats['bytes_written'] += size
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def get_or_compute(self, key: str, compute):
+        """
+        Return the value under key, computing and storing it on a miss.
+
+        Parameters:
+        - key: Memo key.
+        - compute: Function without arguments returning the value.
+
+        Returns:
+        - The stored or computed value.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                self.stats['evictions'] += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def counters(self):
+        """Return hit/miss counters, bytes served from the memo and the hit rate."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {**self.stats, 'hit_rate': self.stats['hits'] / lookups if lookups else 0.0}
+
+    def clear(self):
+        """Delete every entry."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._bytes = 0
+
+def merge_counters(counters: list):
+    """Sum memo counters from several caches (e.g. one per worker process) and recompute the hit rate."""
+    total = {}
+    for counter in counters:
+        for name, value in counter.items():
+            if name != 'hit_rate':
+                total[name] = total.get(name, 0) + value
+    lookups = total.get('hits', 0) + total.get('misses', 0)
+    total['hit_rate'] = total.get('hits', 0) / lookups if lookups else 0.0
+    return total
+
+def format_counters(counters: dict):
+    """One-line summary of memo counters for the end of a run."""
+    return (f"hit rate {counters.get('hit_rate', 0.0):.1%} ({counters.get('hits', 0)} hits, "
+            f"{counters.get('misses', 0)} misses), {counters.get('bytes_saved', 0) / 1e6:.1f} MB reused, "
+            f"{counters.get('bytes_written', 0) / 1e6:.1f} MB written, {counters.get('evictions', 0)} evictions")
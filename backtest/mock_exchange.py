@@ -0,0 +1,576 @@
+import json
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+import websockets
+from websockets.asyncio.server import serve
+from binance.client import Client
+from backtest.data_loader import load_historical_data
+from backtest.kline_store import read_klines
+from market.kline_stream import interval_to_millis
+from market.resampler import resample_klines
+from market.symbols import split_symbol
+from logs.metrics import LatencyHistogram
+
+# Permissive filters served by exchangeInfo; orders are still rounded to them by place_order
+DEFAULT_FILTERS = {'tickSize': '0.00000001', 'stepSize': '0.00001', 'minNotional': '1'}
+
+class MockExchange:
+    """
+    Local stand-in for the Binance spot API.
+
+    Replays historical candles at `speed` times real time and serves the
+    REST endpoints the bot uses (klines, ticker/price, exchangeInfo,
+    account, order, openOrders, userDataStream) plus the combined kline
+    stream and the user data stream over WebSocket. Market orders fill at
+    the last closed price; limit orders rest until a replayed candle trades
+    through their price. Like the exchange, klines end with the forming
+    candle, built up to the replay time; the clock starts after `warmup`
+    candles so strategies have history from the start.
+    """
+
+    def __init__(self, data: dict, interval: str, speed: float = 100.0, balances: dict = None,
+                 host: str = '127.0.0.1', rest_port: int = 0, ws_port: int = 0, warmup: int = 500):
+        """
+        Parameters:
+        - data: {symbol: DataFrame} with open_time, open, high, low, close, volume
+          (and optionally close_time) columns.
+        - interval: Interval of the replayed candles (e.g., 1m).
+        - speed: Replay speed as a multiple of real time.
+        - balances: Initial free balances, e.g. {'USDT': 10000}.
+        - host: Interface to listen on.
+        - rest_port: REST port (0 picks a free port).
+        - ws_port: WebSocket port (0 picks a free port).
+        - warmup: Candles already closed when the replay starts.
+        """
+        self.interval = interval
+        self.speed = speed
+        self.host = host
+        self.rest_port = rest_port
+        self.ws_port = ws_port
+        self.candles = {}
+        interval_ms = interval_to_millis(interval)
+        for symbol, frame in data.items():
+            open_time = frame['open_time'].to_numpy(dtype=np.int64)
+            close_time = (frame['close_time'].to_numpy(dtype=np.int64) if 'close_time' in frame
+                          else open_time + interval_ms - 1)
+            self.candles[symbol.upper()] = {
+                'open_time': open_time,
+                'close_time': close_time,
+                **{column: frame[column].to_numpy(dtype=np.float64) for column in ['open', 'high', 'low', 'close', 'volume']},
+            }
+        first_closes = [c['close_time'][min(warmup, len(c['close_time'])) - 1] for c in self.candles.values()]
+        self.sim_start = int(max(first_closes))
+        self.sim_end = int(max(c['close_time'][-1] for c in self.candles.values()))
+        self.balances = {asset: {'free': float(amount), 'locked': 0.0} for asset, amount in (balances or {'USDT': 10000}).items()}
+        self.orders = {}
+        self.processed = {symbol: 0 for symbol in self.candles}
+        self.requests = {}
+        self.fills = 0
+        self.bars_replayed = 0
+        self.reaction_latency = LatencyHistogram()
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+        self._next_order_id = 1
+        self._kline_clients = {}
+        self._user_clients = set()
+        self._last_close_wall = {}
+        self._wall_start = None
+        self._loop = None
+        self._http = None
+        self._stop = None
+        self._ready = threading.Event()
+
+    # --- Replay clock ---
+
+    def now(self):
+        """Current replay time in epoch milliseconds."""
+        if self._wall_start is None:
+            return self.sim_start
+        return min(self.sim_start + int((time.monotonic() - self._wall_start) * 1000 * self.speed), self.sim_end)
+
+    def _closed(self, symbol: str, now: int = None):
+        """Number of candles of symbol closed at replay time now."""
+        return int(np.searchsorted(self.candles[symbol]['close_time'], self.now() if now is None else now, side='right'))
+
+    def _forming(self, symbol: str, row: int, now: int):
+        """
+        The candle at row as it stands at replay time now, or None when it has not opened.
+
+        Its close moves linearly from the open toward the recorded close and
+        its volume accrues in proportion to the time elapsed.
+        """
+        candles = self.candles[symbol]
+        if row >= len(candles['open_time']) or candles['open_time'][row] > now:
+            return None
+        open_time, close_time = int(candles['open_time'][row]), int(candles['close_time'][row])
+        elapsed = (now - open_time) / (close_time + 1 - open_time)
+        open_price = float(candles['open'][row])
+        close = open_price + elapsed * (float(candles['close'][row]) - open_price)
+        return {'open_time': open_time, 'close_time': close_time, 'open': open_price, 'high': max(open_price, close),
+                'low': min(open_price, close), 'close': close, 'volume': float(candles['volume'][row]) * elapsed}
+
+    def last_price(self, symbol: str):
+        candles = self.candles[symbol]
+        return float(candles['close'][max(self._closed(symbol) - 1, 0)])
+
+    # --- Orders and balances ---
+
+    def _balance(self, asset: str):
+        return self.balances.setdefault(asset, {'free': 0.0, 'locked': 0.0})
+
+    def _order_view(self, order: dict):
+        return {
+            'symbol': order['symbol'], 'orderId': order['orderId'], 'clientOrderId': order['clientOrderId'],
+            'price': f"{order['price']:.8f}", 'origQty': f"{order['quantity']:.8f}",
+            'executedQty': f"{order['executed']:.8f}", 'cummulativeQuoteQty': f"{order['quote']:.8f}",
+            'status': order['status'], 'timeInForce': 'GTC', 'type': order['type'], 'side': order['side'],
+            'time': order['time'], 'updateTime': order['update_time'],
+        }
+
+    def _execution_report(self, order: dict, last_qty: float = 0.0, last_price: float = 0.0):
+        return {
+            'e': 'executionReport', 'E': self.now(), 's': order['symbol'], 'c': order['clientOrderId'],
+            'S': order['side'], 'o': order['type'], 'f': 'GTC', 'q': f"{order['quantity']:.8f}",
+            'p': f"{order['price']:.8f}", 'x': 'TRADE' if last_qty else 'NEW', 'X': order['status'],
+            'i': order['orderId'], 'l': f"{last_qty:.8f}", 'z': f"{order['executed']:.8f}",
+            'L': f"{last_price:.8f}", 'T': self.now(),
+        }
+
+    def _account_position(self, assets):
+        return {
+            'e': 'outboundAccountPosition', 'E': self.now(), 'u': self.now(),
+            'B': [{'a': asset, 'f': f"{self._balance(asset)['free']:.8f}", 'l': f"{self._balance(asset)['locked']:.8f}"}
+                  for asset in assets],
+        }
+
+    def _fill(self, order: dict, price: float, events: list):
+        """Fill a whole order at price (balances already reserved in 'locked' for limit orders)."""
+        base, quote = split_symbol(order['symbol'])
+        quantity = order['quantity']
+        cost = quantity * price
+        if order['side'] == 'BUY':
+            reserved = quantity * order['price'] if order['type'] == 'LIMIT' else cost
+            self._balance(quote)['locked'] -= reserved
+            self._balance(quote)['free'] += reserved - cost
+            self._balance(base)['free'] += quantity
+        else:
+            self._balance(base)['locked'] -= quantity
+            self._balance(quote)['free'] += cost
+        order.update(status='FILLED', executed=quantity, quote=cost, update_time=self.now())
+        self.fills += 1
+        events.append(self._execution_report(order, quantity, price))
+        events.append(self._account_position([base, quote]))
+
+    def create_order(self, params: dict):
+        """Handle POST /api/v3/order; returns (status, body, user events)."""
+        symbol = params.get('symbol', '').upper()
+        if symbol not in self.candles:
+            return 400, {'code': -1121, 'msg': 'Invalid symbol.'}, []
+        side, order_type = params.get('side'), params.get('type')
+        quantity = float(params.get('quantity', 0))
+        price = float(params.get('price', 0) or 0)
+        if order_type not in ('MARKET', 'LIMIT') or side not in ('BUY', 'SELL') or quantity <= 0:
+            return 400, {'code': -1102, 'msg': 'Mandatory parameter was not sent, was empty/null, or malformed.'}, []
+        if order_type == 'LIMIT' and price <= 0:
+            return 400, {'code': -1102, 'msg': "Mandatory parameter 'price' was not sent."}, []
+        base, quote = split_symbol(symbol)
+        market_price = self.last_price(symbol)
+        events = []
+        with self._lock:
+            # Reaction time of the bot: wall time since the candle it traded on closed
+            closed_at = self._last_close_wall.get(symbol)
+            if closed_at is not None:
+                self.reaction_latency.record((time.monotonic() - closed_at) * 1000)
+            reserve_asset, reserve = (quote, quantity * (price or market_price)) if side == 'BUY' else (base, quantity)
+            if self._balance(reserve_asset)['free'] + 1e-12 < reserve:
+                return 400, {'code': -2010, 'msg': 'Account has insufficient balance for requested action.'}, []
+            self._balance(reserve_asset)['free'] -= reserve
+            self._balance(reserve_asset)['locked'] += reserve
+            order = {
+                'symbol': symbol, 'orderId': self._next_order_id,
+                'clientOrderId': params.get('newClientOrderId') or f"mock-{uuid.uuid4().hex[:20]}",
+                'side': side, 'type': order_type, 'quantity': quantity, 'price': price,
+                'executed': 0.0, 'quote': 0.0, 'status': 'NEW', 'time': self.now(), 'update_time': self.now(),
+            }
+            self._next_order_id += 1
+            self.orders[order['orderId']] = order
+            marketable = order_type == 'MARKET' or (price >= market_price if side == 'BUY' else price <= market_price)
+            if marketable:
+                self._fill(order, market_price if order_type == 'MARKET' else price, events)
+            else:
+                events.append(self._execution_report(order))
+                events.append(self._account_position([reserve_asset]))
+            body = self._order_view(order)
+        return 200, body, events
+
+    def cancel_order(self, order: dict):
+        base, quote = split_symbol(order['symbol'])
+        asset, reserved = (quote, order['quantity'] * order['price']) if order['side'] == 'BUY' else (base, order['quantity'])
+        self._balance(asset)['locked'] -= reserved
+        self._balance(asset)['free'] += reserved
+        order.update(status='CANCELED', update_time=self.now())
+        return [self._execution_report(order), self._account_position([asset])]
+
+    def _match(self, symbol: str, row: int, events: list):
+        """Fill resting limit orders that the candle at row traded through."""
+        low, high = self.candles[symbol]['low'][row], self.candles[symbol]['high'][row]
+        for order in self.orders.values():
+            if order['symbol'] != symbol or order['status'] != 'NEW' or order['type'] != 'LIMIT':
+                continue
+            if (order['side'] == 'BUY' and low <= order['price']) or (order['side'] == 'SELL' and high >= order['price']):
+                self._fill(order, order['price'], events)
+
+    # --- REST ---
+
+    def handle_rest(self, method: str, path: str, params: dict):
+        """Dispatch one REST request; returns (status, body, user events)."""
+        endpoint = path.split('/api/v3/', 1)[-1]
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if endpoint in ('ping',):
+            return 200, {}, []
+        if endpoint == 'time':
+            return 200, {'serverTime': self.now()}, []
+        if endpoint == 'exchangeInfo':
+            return 200, self.exchange_info(), []
+        if endpoint == 'klines':
+            return self.klines(params)
+        if endpoint == 'ticker/price':
+            if 'symbol' in params:
+                symbol = params['symbol'].upper()
+                if symbol not in self.candles:
+                    return 400, {'code': -1121, 'msg': 'Invalid symbol.'}, []
+                return 200, {'symbol': symbol, 'price': f"{self.last_price(symbol):.8f}"}, []
+            return 200, [{'symbol': symbol, 'price': f"{self.last_price(symbol):.8f}"} for symbol in self.candles], []
+        if endpoint == 'account':
+            with self._lock:
+                balances = [{'asset': asset, 'free': f"{b['free']:.8f}", 'locked': f"{b['locked']:.8f}"}
+                            for asset, b in self.balances.items()]
+            return 200, {'updateTime': self.now(), 'balances': balances}, []
+        if endpoint == 'order' and method == 'POST':
+            return self.create_order(params)
+        if endpoint == 'order':
+            with self._lock:
+                order = self._find_order(params)
+                if order is None:
+                    return 400, {'code': -2013, 'msg': 'Order does not exist.'}, []
+                if method == 'DELETE':
+                    if order['status'] != 'NEW':
+                        return 400, {'code': -2011, 'msg': 'Unknown order sent.'}, []
+                    events = self.cancel_order(order)
+                    return 200, self._order_view(order), events
+                return 200, self._order_view(order), []
+        if endpoint == 'openOrders':
+            symbol = params.get('symbol', '').upper()
+            with self._lock:
+                return 200, [self._order_view(order) for order in self.orders.values()
+                             if order['status'] == 'NEW' and (not symbol or order['symbol'] == symbol)], []
+        if endpoint == 'userDataStream':
+            return 200, {'listenKey': params.get('listenKey') or uuid.uuid4().hex} if method == 'POST' else {}, []
+        return 404, {'code': -1100, 'msg': f"Unsupported endpoint: {path}"}, []
+
+    def _find_order(self, params: dict):
+        if 'orderId' in params:
+            return self.orders.get(int(params['orderId']))
+        client_order_id = params.get('origClientOrderId')
+        return next((order for order in self.orders.values() if order['clientOrderId'] == client_order_id), None)
+
+    def exchange_info(self):
+        symbols = []
+        for symbol in self.candles:
+            base, quote = split_symbol(symbol)
+            symbols.append({
+                'symbol': symbol, 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': quote,
+                'filters': [
+                    {'filterType': 'PRICE_FILTER', 'minPrice': DEFAULT_FILTERS['tickSize'], 'maxPrice': '10000000',
+                     'tickSize': DEFAULT_FILTERS['tickSize']},
+                    {'filterType': 'LOT_SIZE', 'minQty': DEFAULT_FILTERS['stepSize'], 'maxQty': '10000000',
+                     'stepSize': DEFAULT_FILTERS['stepSize']},
+                    {'filterType': 'NOTIONAL', 'minNotional': DEFAULT_FILTERS['minNotional'], 'applyMinToMarket': True},
+                ],
+            })
+        return {'timezone': 'UTC', 'serverTime': self.now(), 'symbols': symbols}
+
+    def klines(self, params: dict):
+        symbol = params.get('symbol', '').upper()
+        if symbol not in self.candles:
+            return 400, {'code': -1121, 'msg': 'Invalid symbol.'}, []
+        candles = self.candles[symbol]
+        limit = min(int(params.get('limit', 500)), 1000)
+        now = self.now()
+        stop = self._closed(symbol, now)
+        forming = self._forming(symbol, stop, now)
+        interval = params.get('interval', self.interval)
+        if interval != self.interval:
+            # Higher intervals are resampled from the replayed candles, forming candle included
+            frame = pd.DataFrame({field: values[:stop] for field, values in candles.items()})
+            if forming is not None:
+                frame = pd.concat([frame, pd.DataFrame([forming])], ignore_index=True)
+            try:
+                candles = {field: values.to_numpy() for field, values in
+                           resample_klines(frame, interval, self.interval, drop_partial=False).items()}
+            except ValueError as e:
+                return 400, {'code': -1120, 'msg': str(e)}, []
+            stop, forming = len(candles['open_time']), None
+        elif forming is not None:
+            stop += 1
+        forming_row = stop - 1 if forming is not None else -1
+        if 'endTime' in params:
+            stop = min(stop, int(np.searchsorted(candles['open_time'], int(params['endTime']), side='right')))
+        if 'startTime' in params:
+            first = int(np.searchsorted(candles['open_time'], int(params['startTime'])))
+            rows = range(first, min(first + limit, stop))
+        else:
+            rows = range(max(stop - limit, 0), stop)
+
+        def value(field, i):
+            return forming[field] if i == forming_row else candles[field][i]
+
+        return 200, [
+            [int(value('open_time', i)), f"{value('open', i):.8f}", f"{value('high', i):.8f}",
+             f"{value('low', i):.8f}", f"{value('close', i):.8f}", f"{value('volume', i):.8f}",
+             int(value('close_time', i)), '0', 0, '0', '0', '0']
+            for i in rows
+        ], []
+
+    def _request_handler(self):
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self, method):
+                url = urlparse(self.path)
+                params = dict(parse_qsl(url.query))
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    params.update(parse_qsl(self.rfile.read(length).decode()))
+                try:
+                    status, body, events = exchange.handle_rest(method, url.path, params)
+                except Exception as e:
+                    logging.error(f"Mock exchange error on {method} {url.path}: {e}")
+                    status, body, events = 500, {'code': -1000, 'msg': str(e)}, []
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                if events:
+                    exchange.publish_user_events(events)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_PUT(self):
+                self._handle('PUT')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    # --- WebSockets ---
+
+    def publish_user_events(self, events: list):
+        """Send events to every user data stream connection (thread-safe)."""
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._broadcast(self._user_clients, events), self._loop)
+
+    async def _broadcast(self, clients, messages):
+        for websocket in list(clients):
+            for message in messages:
+                try:
+                    await websocket.send(json.dumps(message))
+                except websockets.ConnectionClosed:
+                    clients.discard(websocket)
+                    break
+
+    async def _ws_handler(self, websocket):
+        url = urlparse(websocket.request.path)
+        if url.path.startswith('/ws/'):
+            self._user_clients.add(websocket)
+        else:
+            streams = dict(parse_qsl(url.query)).get('streams', url.path.rsplit('/', 1)[-1])
+            for stream in streams.split('/'):
+                symbol = stream.split('@', 1)[0].upper()
+                self._kline_clients.setdefault(symbol, set()).add(websocket)
+        try:
+            await websocket.wait_closed()
+        finally:
+            self._user_clients.discard(websocket)
+            for subscribers in self._kline_clients.values():
+                subscribers.discard(websocket)
+
+    async def _replay(self):
+        """Close candles on the replay clock, match resting orders and push kline events."""
+        while True:
+            now = self.now()
+            for symbol, candles in self.candles.items():
+                closed = self._closed(symbol, now)
+                events = []
+                while self.processed[symbol] < closed:
+                    row = self.processed[symbol]
+                    self.processed[symbol] += 1
+                    if candles['close_time'][row] <= self.sim_start:
+                        continue
+                    with self._lock:
+                        self._match(symbol, row, events)
+                        self._last_close_wall[symbol] = time.monotonic()
+                        self.bars_replayed += 1
+                    await self._broadcast(self._kline_clients.get(symbol, set()), [self._kline_event(symbol, row)])
+                if events:
+                    await self._broadcast(self._user_clients, events)
+            upcoming = [int(c['close_time'][self.processed[s]]) for s, c in self.candles.items()
+                        if self.processed[s] < len(c['close_time'])]
+            if not upcoming:
+                self.finished.set()
+                return
+            wait = (min(upcoming) - self.now()) / 1000 / self.speed
+            await asyncio.sleep(max(wait, 0))
+
+    def _kline_event(self, symbol: str, row: int):
+        candles = self.candles[symbol]
+        return {
+            'stream': f"{symbol.lower()}@kline_{self.interval}",
+            'data': {
+                'e': 'kline', 'E': self.now(), 's': symbol,
+                'k': {
+                    't': int(candles['open_time'][row]), 'T': int(candles['close_time'][row]), 's': symbol,
+                    'i': self.interval, 'o': f"{candles['open'][row]:.8f}", 'c': f"{candles['close'][row]:.8f}",
+                    'h': f"{candles['high'][row]:.8f}", 'l': f"{candles['low'][row]:.8f}",
+                    'v': f"{candles['volume'][row]:.8f}", 'x': True,
+                },
+            },
+        }
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        async with serve(self._ws_handler, self.host, self.ws_port) as server:
+            self.ws_port = server.sockets[0].getsockname()[1]
+            self._wall_start = time.monotonic()
+            self._ready.set()
+            replay = asyncio.create_task(self._replay())
+            await self._stop.wait()
+            replay.cancel()
+
+    # --- Lifecycle ---
+
+    @property
+    def api_url(self):
+        """Value for Client.API_URL."""
+        return f"http://{self.host}:{self.rest_port}/api"
+
+    @property
+    def stream_url(self):
+        """Value for the bot's 'stream_url' setting."""
+        return f"ws://{self.host}:{self.ws_port}"
+
+    def start(self):
+        """Start the REST server, WebSocket server and replay clock on background threads."""
+        self._http = ThreadingHTTPServer((self.host, self.rest_port), self._request_handler())
+        self._http.daemon_threads = True
+        self.rest_port = self._http.server_address[1]
+        threading.Thread(target=self._http.serve_forever, name='mock-rest', daemon=True).start()
+
+        def run_loop():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._serve())
+        threading.Thread(target=run_loop, name='mock-ws', daemon=True).start()
+        self._ready.wait()
+        logging.info(f"Mock exchange serving {self.api_url} and {self.stream_url} at {self.speed}x.")
+        return self
+
+    def stop(self):
+        """Shut both servers down."""
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def stats(self):
+        """Return replay progress, request counts, fills and bot reaction latency."""
+        elapsed = time.monotonic() - self._wall_start if self._wall_start else 0.0
+        return {
+            'bars_replayed': self.bars_replayed,
+            'bars_per_second': self.bars_replayed / elapsed if elapsed else 0.0,
+            'requests': dict(self.requests),
+            'orders': len(self.orders),
+            'fills': self.fills,
+            'reaction_latency': self.reaction_latency.summary(),
+        }
+
+def mock_client(api_url: str):
+    """Return a python-binance Client pointed at a MockExchange."""
+    client = Client('mock-key', 'mock-secret', ping=False)
+    client.API_URL = api_url
+    return client
+
+def load_replay_data(symbols: list, interval: str, store: str = None, csv_paths: dict = None):
+    """
+    Load candles to replay from the kline store or from CSV files.
+
+    Parameters:
+    - symbols: Trading pairs to replay.
+    - interval: Kline interval (store partition).
+    - store: Kline store root.
+    - csv_paths: {symbol: CSV path}, used for symbols given here.
+
+    Returns:
+    - {symbol: DataFrame}
+    """
+    csv_paths = csv_paths or {}
+    data = {}
+    for symbol in symbols:
+        if symbol in csv_paths:
+            data[symbol] = load_historical_data(csv_paths[symbol])
+        elif store is not None:
+            data[symbol] = read_klines(store, symbol, interval)
+        else:
+            raise ValueError(f"No replay data for {symbol}: pass --store or --csv {symbol}=PATH")
+    return data
+
+def main(argv=None):
+    """Command-line entry point: python -m backtest.mock_exchange --store data/klines --symbols BTCUSDT"""
+    parser = argparse.ArgumentParser(description="Serve a local mock Binance exchange replaying candles.")
+    parser.add_argument('--symbols', nargs='+', required=True)
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--store', help="Kline store root.")
+    parser.add_argument('--csv', nargs='*', default=[], metavar='SYMBOL=PATH')
+    parser.add_argument('--speed', type=float, default=100.0, help="Replay speed as a multiple of real time.")
+    parser.add_argument('--warmup', type=int, default=500)
+    parser.add_argument('--balance', nargs='*', default=['USDT=10000'], metavar='ASSET=AMOUNT')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--rest-port', type=int, default=8080)
+    parser.add_argument('--ws-port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    csv_paths = dict(item.split('=', 1) for item in args.csv)
+    balances = {asset: float(amount) for asset, amount in (item.split('=', 1) for item in args.balance)}
+    data = load_replay_data(args.symbols, args.interval, args.store, csv_paths)
+    exchange = MockExchange(data, args.interval, args.speed, balances, args.host, args.rest_port, args.ws_port,
+                            args.warmup).start()
+    print(f"api_url: {exchange.api_url}\nstream_url: {exchange.stream_url}")
+    try:
+        exchange.finished.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exchange.stop()
+        print(json.dumps(exchange.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest.kline_store import read_klines
+from backtest.sweep import max_drawdown
+from strategies.batch_indicators import batch_signals
+
+# Symbols per worker task; bounds the indicator temporaries of one task
+SHARD_SYMBOLS = 8
+
+# Per-process view of the shared close matrix, set by _init_worker
+_shared = {}
+
+def share_closes(frames: dict):
+    """
+    Align per-symbol closes on open_time directly into one shared-memory block.
+
+    Parameters:
+    - frames: {symbol: DataFrame with open_time and close}.
+
+    Returns:
+    - Tuple (SharedMemory, symbols, open_times). The block holds a
+      (symbols x bars) float64 matrix with NaN where a symbol has no candle;
+      the caller must close and unlink it.
+    """
+    symbols = list(frames)
+    open_times = np.unique(np.concatenate([frames[s]['open_time'].to_numpy(dtype=np.int64) for s in symbols]))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(symbols) * len(open_times) * 8))
+    matrix = np.ndarray((len(symbols), len(open_times)), dtype=np.float64, buffer=shm.buf)
+    matrix.fill(np.nan)
+    for row, symbol in enumerate(symbols):
+        frame = frames[symbol]
+        columns = np.searchsorted(open_times, frame['open_time'].to_numpy(dtype=np.int64))
+        matrix[row, columns] = frame['close'].to_numpy(dtype=np.float64)
+    return shm, symbols, open_times
+
+def _init_worker(shm_name: str, shape: tuple):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _shared['shm'] = shm
+    _shared['close'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+def _forward_fill(close: np.ndarray):
+    """Carry the last valid close over gaps (leading NaNs stay NaN)."""
+    positions = np.where(np.isnan(close), 0, np.arange(close.shape[1]))
+    return np.take_along_axis(close, np.maximum.accumulate(positions, axis=1), axis=1)
+
+def _shard_intents(task):
+    """
+    Worker: turn the signals of a shard of symbols into entry/exit intents.
+
+    Returns:
+    - Tuple (rows, bars, kinds, prices) of every position change; kind is
+      1 for an entry and -1 for an exit, filled at the bar's close.
+    """
+    first, last, strategy, config = task
+    close = _shared['close'][first:last]
+    buy, sell = batch_signals(close, strategy, config)
+    valid = ~np.isnan(close)
+    buy &= valid
+    sell &= valid & ~buy
+
+    # Desired position is the last signal carried forward, as in simulate_signals
+    marks = np.where(buy | sell, np.arange(close.shape[1]), -1)
+    latest = np.maximum.accumulate(marks, axis=1)
+    row_index = np.arange(close.shape[0])[:, None]
+    position = np.where(latest >= 0, buy[row_index, np.maximum(latest, 0)], False).astype(np.int8)
+    change = np.diff(position, axis=1, prepend=np.int8(0))
+    rows, bars = np.nonzero(change)
+    return rows + first, bars, change[rows, bars].astype(np.int8), close[rows, bars]
+
+def _shard_holdings_value(task):
+    """Worker: mark the accepted holdings of a shard of symbols to market on every bar."""
+    first, last, holdings = task
+    close = _forward_fill(_shared['close'][first:last])
+    value = np.zeros(close.shape[1])
+    for row, (entries, exits, quantities) in holdings.items():
+        held = np.zeros(close.shape[1] + 1)
+        np.add.at(held, entries, quantities)
+        np.add.at(held, exits, -quantities)
+        held = np.cumsum(held[:-1])
+        value += np.where(held != 0, held * np.nan_to_num(close[row - first]), 0.0)
+    return value
+
+def settle(symbols: list, rows, bars, kinds, prices, sizes: np.ndarray, initial_balance: float):
+    """
+    Replay entry/exit intents of every symbol in time order against one cash balance.
+
+    Within a bar exits are settled before entries, so freed cash can fund
+    them; an entry the cash cannot cover is skipped (and not retried until
+    the symbol's next entry signal), and so is its matching exit.
+
+    Returns:
+    - Tuple (trades, cash_changes, skipped): trades is a list of
+      [row, entry_bar, exit_bar, entry_price, exit_price, quantity] (exit_bar
+      -1 while open), cash_changes a list of (bar, amount), skipped a
+      per-symbol count of entries skipped for lack of cash.
+    """
+    order = np.lexsort((rows, kinds, bars))
+    cash = float(initial_balance)
+    open_trades = {}
+    trades, cash_changes = [], []
+    skipped = np.zeros(len(symbols), dtype=np.int64)
+    for row, bar, kind, price in zip(rows[order].tolist(), bars[order].tolist(),
+                                     kinds[order].tolist(), prices[order].tolist()):
+        if kind == 1:
+            cost = sizes[row] * price
+            if cost <= 0:
+                continue
+            if cost > cash:
+                skipped[row] += 1
+                continue
+            cash -= cost
+            trade = [row, bar, -1, price, float('nan'), float(sizes[row])]
+            open_trades[row] = trade
+            trades.append(trade)
+            cash_changes.append((bar, -cost))
+        else:
+            trade = open_trades.pop(row, None)
+            if trade is None:
+                continue
+            trade[2], trade[4] = bar, price
+            cash += trade[5] * price
+            cash_changes.append((bar, trade[5] * price))
+    return trades, cash_changes, skipped
+
+def run_portfolio(frames: dict, strategy: str, config: dict, workers: int = None):
+    """
+    Backtest a strategy over several symbols sharing one cash balance.
+
+    The closes are aligned into a shared-memory (symbols x bars) matrix and
+    symbols are sharded across worker processes, which compute signals with
+    the batch kernels and return each symbol's entry/exit intents. Intents
+    are merged in time order and settled against the shared cash: every
+    entry buys config['order_size'] units of the symbol (a number, or a
+    {symbol: size} mapping) at the bar's close if the cash covers it, and the
+    next exit sells them. The workers then mark the accepted holdings to
+    market, and the equity curve is cash plus holdings on every bar. No fees
+    or slippage are charged.
+
+    Parameters:
+    - frames: {symbol: DataFrame with open_time and close}.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - config: Strategy configuration; order_size and initial_balance (default 10000) are used.
+    - workers: Worker processes (defaults to the CPU count).
+
+    Returns:
+    - Dictionary with 'final_balance', 'equity' (Series indexed by open
+      time), 'trades' (DataFrame in entry order), 'symbols' (per-symbol
+      summary) and 'stats'.
+    """
+    workers = workers or os.cpu_count() or 1
+    initial_balance = config.get('initial_balance', 10000)
+    start = time.perf_counter()
+    shm, symbols, open_times = share_closes(frames)
+    try:
+        order_size = config['order_size']
+        sizes = np.array([order_size.get(symbol, 0.0) if isinstance(order_size, dict) else order_size
+                          for symbol in symbols], dtype=np.float64)
+        shape = (len(symbols), len(open_times))
+        shard = max(1, min(SHARD_SYMBOLS, -(-len(symbols) // workers)))
+        bounds = [(first, min(first + shard, len(symbols))) for first in range(0, len(symbols), shard)]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, shape)) as executor:
+            intents = list(executor.map(_shard_intents, [(a, b, strategy, config) for a, b in bounds]))
+            rows, bars, kinds, prices = (np.concatenate(parts) for parts in zip(*intents))
+            trades, cash_changes, skipped = settle(symbols, rows, bars, kinds, prices, sizes, initial_balance)
+
+            # Accepted trades grouped by symbol and handed back to the shard owning it
+            holdings = [{} for _ in bounds]
+            shard_of = np.repeat(np.arange(len(bounds)), [b - a for a, b in bounds])
+            table = np.array([trade[:3] + [trade[5]] for trade in trades], dtype=np.float64).reshape(-1, 4)
+            table = table[np.argsort(table[:, 0], kind='stable')]
+            trade_rows, starts = np.unique(table[:, 0].astype(np.int64), return_index=True)
+            for row, part in zip(trade_rows, np.split(table, starts[1:])):
+                exits = np.where(part[:, 2] >= 0, part[:, 2], shape[1]).astype(np.int64)
+                holdings[shard_of[row]][int(row)] = (part[:, 1].astype(np.int64), exits, part[:, 3])
+            values = executor.map(_shard_holdings_value, [(a, b, held) for (a, b), held in zip(bounds, holdings)])
+            holdings_value = sum(values, np.zeros(shape[1]))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    cash = np.zeros(shape[1])
+    if cash_changes:
+        change_bars, amounts = zip(*cash_changes)
+        np.add.at(cash, np.array(change_bars), np.array(amounts))
+    equity = initial_balance + np.cumsum(cash) + holdings_value
+    elapsed = time.perf_counter() - start
+
+    trades = pd.DataFrame(trades, columns=['row', 'entry_bar', 'exit_bar', 'entry_price', 'exit_price', 'quantity'])
+    trades.insert(0, 'symbol', [symbols[row] for row in trades.pop('row')])
+    trades['entry_time'] = open_times[trades['entry_bar'].to_numpy()]
+    closed = trades['exit_bar'] >= 0
+    trades['exit_time'] = np.where(closed, open_times[np.where(closed, trades['exit_bar'], 0)], -1)
+    trades['pnl'] = (trades['exit_price'] - trades['entry_price']) * trades['quantity']
+    summary = pd.DataFrame({
+        'trades': trades.groupby('symbol').size(),
+        'pnl': trades.groupby('symbol')['pnl'].sum(),
+    }).reindex(symbols).fillna(0)
+    summary['skipped_entries'] = skipped
+    summary.index.name = 'symbol'
+
+    final_balance = float(equity[-1]) if len(equity) else float(initial_balance)
+    stats = {
+        'symbols': len(symbols),
+        'bars': shape[1],
+        'workers': workers,
+        'elapsed': elapsed,
+        'symbol_bars_per_second': shape[0] * shape[1] / elapsed if elapsed > 0 else float('inf'),
+        'max_drawdown': max_drawdown(equity),
+    }
+    logging.info(f"Portfolio backtest: {len(symbols)} symbols x {shape[1]} bars in {elapsed:.2f}s, "
+                 f"final balance {final_balance:.2f} ({len(trades)} trades).")
+    return {
+        'final_balance': final_balance,
+        'equity': pd.Series(equity, index=pd.Index(open_times, name='open_time'), name='equity'),
+        'trades': trades,
+        'symbols': summary,
+        'stats': stats,
+    }
+
+def main(argv=None):
+    """Command-line entry point: python -m backtest.portfolio --store data/klines --start 2023-01-01 --end 2024-01-01"""
+    parser = argparse.ArgumentParser(description="Backtest config['symbols'] as one portfolio with shared cash.")
+    parser.add_argument('--store', required=True, help="Kline store root.")
+    parser.add_argument('--config', default='config/params.json', help="Strategy configuration file.")
+    parser.add_argument('--symbols', nargs='*', help="Override config['symbols'].")
+    parser.add_argument('--strategy', choices=['RSI', 'MACD', 'SMA'], help="Override config['strategy'].")
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--start', default=None)
+    parser.add_argument('--end', default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', help="Optional CSV path for the trade list.")
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as file:
+        config = json.load(file)
+    symbols = [symbol.upper() for symbol in (args.symbols or config['symbols'])]
+    frames = {symbol: read_klines(args.store, symbol, args.interval, args.start, args.end, ['close'])
+              for symbol in symbols}
+    result = run_portfolio(frames, args.strategy or config['strategy'], config, args.workers)
+    print(result['symbols'].to_string())
+    stats = result['stats']
+    print(f"\nFinal balance: {result['final_balance']:.2f}, max drawdown {stats['max_drawdown']:.2%}, "
+          f"{len(result['trades'])} trades; {stats['symbols']} symbols x {stats['bars']} bars in "
+          f"{stats['elapsed']:.1f}s on {stats['workers']} workers")
+    if args.output:
+        result['trades'].to_csv(args.output, index=False)
+        print(f"Trades saved at: {args.output}")
+
+if __name__ == "__main__":
+    main()
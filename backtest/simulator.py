@@ -1,13 +1,44 @@
+import numpy as np
 import pandas as pd
 import logging
 from strategies.rsi_strategy import calculate_rsi
 from strategies.macd_strategy import calculate_macd
 from strategies.sma_strategy import calculate_sma
+from strategies.batch_indicators import batch_signals, close_matrix
+from backtest.memo import fingerprint, memo_key, result_key
+from backtest.execution import execute_signals
 
-def simulate_strategy(data: pd.DataFrame, strategy: str, config: dict):
+def simulate_strategy(data: pd.DataFrame, strategy: str, config: dict, engine: str = 'vectorized', memo=None):
     """
     Simulate a trading strategy on historical data.
 
+    Parameters:
+    - data: DataFrame containing historical market data.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - config: Dictionary containing strategy configuration.
+    - engine: 'vectorized' (default), 'events' for the cost-aware event-driven
+      engine (fees, spread, slippage, limit orders; see backtest/execution.py)
+      or 'loop' for the original per-bar simulation.
+    - memo: Optional backtest.memo.MemoCache reused by the vectorized and events engines.
+
+    Returns:
+    - Simulated balance after running the strategy.
+    """
+    if engine == 'vectorized':
+        return simulate_strategy_vectorized(data, strategy, config, memo)['final_balance']
+    if engine == 'events':
+        return simulate_strategy_events(data, strategy, config, memo)['final_balance']
+    if engine == 'loop':
+        return simulate_strategy_loop(data, strategy, config)
+    raise ValueError(f"Unknown backtest engine: {engine}")
+
+def simulate_strategy_loop(data: pd.DataFrame, strategy: str, config: dict):
+    """
+    Simulate a trading strategy bar by bar, recomputing indicators on every bar.
+
+    Kept as the reference implementation for the vectorized engine; it is
+    O(n^2) in the number of bars and unsuitable for long histories.
+
     Parameters:
     - data: DataFrame containing historical market data.
     - strategy: Strategy name ('RSI', 'MACD', 'SMA').
@@ -65,3 +96,247 @@ def simulate_strategy(data: pd.DataFrame, strategy: str, config: dict):
         balance = holdings * data['close'].iloc[-1]
     logging.info(f"Final balance: {balance}")
     return balance
+
+def indicator_values(close: np.ndarray, name: str, params: tuple):
+    """
+    Compute one indicator over a close array with the strategy functions.
+
+    Parameters:
+    - close: Array of close prices.
+    - name: 'rsi' (period), 'macd' (fast, slow, signal periods; returns the
+      MACD and signal-line rows) or 'sma' (window).
+    - params: Indicator parameters.
+
+    Returns:
+    - NumPy array.
+    """
+    frame = pd.DataFrame({'close': close})
+    if name == 'rsi':
+        return calculate_rsi(frame, *params)['rsi'].to_numpy()
+    if name == 'macd':
+        return calculate_macd(frame, *params)[['macd', 'signal_line']].to_numpy().T.copy()
+    if name == 'sma':
+        # One window of calculate_sma
+        return frame['close'].rolling(window=params[0]).mean().to_numpy()
+    raise ValueError(f"Unknown indicator: {name}")
+
+def compute_signals(data: pd.DataFrame, strategy: str, config: dict, memo=None, digest: str = None):
+    """
+    Compute buy and sell signal arrays for a strategy in a single pass.
+
+    Indicators are computed once on the close array, so the caller's
+    DataFrame is left untouched. With a memo each indicator series is looked
+    up by (close fingerprint, indicator, parameters) first, so runs that
+    share e.g. an rsi_period but differ in thresholds compute it once.
+
+    Parameters:
+    - data: DataFrame containing historical market data.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - config: Dictionary containing strategy configuration.
+    - memo: Optional backtest.memo.MemoCache.
+    - digest: Fingerprint of data['close'], if already known.
+
+    Returns:
+    - Tuple (close, buy, sell) of NumPy arrays.
+    """
+    close = data['close'].to_numpy(dtype=np.float64)
+    if memo is not None and digest is None:
+        digest = fingerprint(close)
+
+    def indicator(name, *params):
+        if memo is None:
+            return indicator_values(close, name, params)
+        return memo.get_or_compute(memo_key('indicator', digest, name, params),
+                                   lambda: indicator_values(close, name, params))
+
+    if strategy == 'RSI':
+        rsi = indicator('rsi', config['rsi_period'])
+        buy = rsi < config['rsi_oversold']
+        sell = ~buy & (rsi > config['rsi_overbought'])
+    elif strategy == 'MACD':
+        macd, signal = indicator('macd', config['fast_period'], config['slow_period'], config['signal_period'])
+        buy = macd > signal
+        sell = macd < signal
+    elif strategy == 'SMA':
+        sma_short = indicator('sma', config['short_window'])
+        sma_long = indicator('sma', config['long_window'])
+        buy = sma_short > sma_long
+        sell = sma_short < sma_long
+    else:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    return close, buy, sell
+
+def simulate_signals(close: np.ndarray, buy: np.ndarray, sell: np.ndarray, initial_balance: float = 10000):
+    """
+    Run the all-in/all-out position logic over precomputed signal arrays.
+
+    A buy signal opens a position only when flat and a sell signal closes it
+    only when long, so the position is the forward-filled last signal. Only
+    the (few) trades are walked in Python, which keeps the balance arithmetic
+    identical to the per-bar loop.
+
+    Parameters:
+    - close: Array of close prices.
+    - buy: Boolean array of buy signals.
+    - sell: Boolean array of sell signals.
+    - initial_balance: Starting cash balance.
+
+    Returns:
+    - Dictionary with 'final_balance', 'position', 'equity' and 'trades'.
+    """
+    n = len(close)
+    if n == 0 or initial_balance <= 0:
+        return {
+            'final_balance': initial_balance,
+            'position': np.zeros(n, dtype=np.int8),
+            'equity': np.full(n, float(initial_balance)),
+            'trades': _trades_frame([], [], [], [], [], []),
+        }
+
+    state = np.full(n, np.nan)
+    state[sell] = 0.0
+    state[buy] = 1.0
+    position = pd.Series(state).ffill().fillna(0.0).to_numpy(dtype=np.int8)
+
+    change = np.diff(position, prepend=np.int8(0))
+    entries = np.flatnonzero(change == 1)
+    exits = np.flatnonzero(change == -1)
+
+    entry_prices = close[entries]
+    exit_index = np.append(exits, n - 1) if len(exits) < len(entries) else exits
+    exit_prices = close[exit_index]
+
+    quantities = np.empty(len(entries))
+    balances = np.empty(len(entries))
+    balance = initial_balance
+    for i in range(len(entries)):
+        holdings = balance / entry_prices[i]
+        balance = holdings * exit_prices[i]
+        quantities[i] = holdings
+        balances[i] = balance
+
+    # Per-bar equity: cash level while flat, holdings marked to close while long
+    trade_id = np.cumsum(change == 1) - 1
+    cash_levels = np.concatenate(([float(initial_balance)], balances))
+    cash = cash_levels[np.cumsum(change == -1)]
+    held = quantities[np.maximum(trade_id, 0)] if len(entries) else np.zeros(n)
+    equity = np.where(position == 1, held * close, cash)
+
+    final_balance = balances[-1] if len(entries) else initial_balance
+    trades = _trades_frame(entries, exit_index, entry_prices, exit_prices, quantities, balances)
+    return {
+        'final_balance': final_balance,
+        'position': position,
+        'equity': equity,
+        'trades': trades,
+    }
+
+def _trades_frame(entries, exits, entry_prices, exit_prices, quantities, balances):
+    trades = pd.DataFrame({
+        'entry_bar': np.asarray(entries, dtype=np.int64),
+        'exit_bar': np.asarray(exits, dtype=np.int64),
+        'entry_price': np.asarray(entry_prices, dtype=np.float64),
+        'exit_price': np.asarray(exit_prices, dtype=np.float64),
+        'quantity': np.asarray(quantities, dtype=np.float64),
+        'balance': np.asarray(balances, dtype=np.float64),
+    })
+    trades['pnl'] = (trades['exit_price'] - trades['entry_price']) * trades['quantity']
+    return trades
+
+def simulate_strategy_vectorized(data: pd.DataFrame, strategy: str, config: dict, memo=None, digest: str = None):
+    """
+    Simulate a trading strategy with indicators computed once and vector ops.
+
+    Produces the same final balance as simulate_strategy_loop in O(n). With a
+    memo the whole result is reused when the same closes were simulated with
+    the same strategy parameters and initial balance, and otherwise the
+    indicator series are (see compute_signals).
+
+    Parameters:
+    - data: DataFrame containing historical market data.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - config: Dictionary containing strategy configuration.
+    - memo: Optional backtest.memo.MemoCache.
+    - digest: Fingerprint of data['close'], if already known.
+
+    Returns:
+    - Dictionary with 'final_balance', 'position', 'equity' (Series aligned
+      to data.index) and 'trades' (DataFrame with one row per round trip).
+    """
+    if memo is None:
+        close, buy, sell = compute_signals(data, strategy, config)
+        result = simulate_signals(close, buy, sell, config.get('initial_balance', 10000))
+    else:
+        digest = digest or fingerprint(data['close'].to_numpy(dtype=np.float64))
+
+        def simulate():
+            close, buy, sell = compute_signals(data, strategy, config, memo, digest)
+            return simulate_signals(close, buy, sell, config.get('initial_balance', 10000))
+
+        result = dict(memo.get_or_compute(result_key(digest, strategy, config), simulate))
+    result['equity'] = pd.Series(result['equity'], index=data.index, name='equity')
+    logging.info(f"Final balance: {result['final_balance']} ({len(result['trades'])} trades)")
+    return result
+
+def simulate_strategy_events(data: pd.DataFrame, strategy: str, config: dict, memo=None, digest: str = None):
+    """
+    Simulate a trading strategy with the cost-aware event-driven engine.
+
+    Signals are the same as in simulate_strategy_vectorized (and share its
+    memoized indicators); orders are then executed by execute_signals with
+    the fees, spread, slippage, participation cap and order type of the
+    config, using the high, low and volume columns when data has them.
+
+    Parameters:
+    - data: DataFrame containing historical market data.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - config: Strategy configuration including the execution settings.
+    - memo: Optional backtest.memo.MemoCache for the indicator series.
+    - digest: Fingerprint of data['close'], if already known.
+
+    Returns:
+    - Dictionary from execute_signals, with 'equity' as a Series aligned to data.index.
+    """
+    close, buy, sell = compute_signals(data, strategy, config, memo, digest)
+    columns = {column: data[column].to_numpy(dtype=np.float64) if column in data.columns else None
+               for column in ('high', 'low', 'volume')}
+    result = execute_signals(close, buy, sell, config.get('initial_balance', 10000), config=config, **columns)
+    result['equity'] = pd.Series(result['equity'], index=data.index, name='equity')
+    costs = result['costs']
+    logging.info(f"Final balance: {result['final_balance']} ({len(result['trades'])} trades, fees {costs['fees']:.2f}, "
+                 f"spread {costs['spread']:.2f}, slippage {costs['slippage']:.2f})")
+    return result
+
+def simulate_universe(frames: dict, strategy: str, config: dict):
+    """
+    Simulate one strategy independently on many symbols with batched indicators.
+
+    The closes are aligned into a (symbols x bars) matrix and the signals of
+    every symbol come from one pass of the batch kernels; each symbol then
+    runs the same position logic as simulate_strategy_vectorized, starting
+    at its first valid close.
+
+    Parameters:
+    - frames: {symbol: DataFrame with open_time and close}.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - config: Dictionary containing strategy configuration.
+
+    Returns:
+    - DataFrame indexed by symbol with final_balance, return and trades.
+    """
+    symbols, _, close = close_matrix(frames)
+    buy, sell = batch_signals(close, strategy, config)
+    initial_balance = config.get('initial_balance', 10000)
+    rows = []
+    for row, symbol in enumerate(symbols):
+        valid = np.flatnonzero(~np.isnan(close[row]))
+        span = slice(valid[0], valid[-1] + 1) if len(valid) else slice(0, 0)
+        result = simulate_signals(close[row, span], buy[row, span], sell[row, span], initial_balance)
+        rows.append({
+            'symbol': symbol,
+            'final_balance': result['final_balance'],
+            'return': result['final_balance'] / initial_balance - 1,
+            'trades': len(result['trades']),
+        })
+    logging.info(f"Simulated {strategy} on {len(symbols)} symbols.")
+    return pd.DataFrame(rows, columns=['symbol', 'final_balance', 'return', 'trades']).set_index('symbol')
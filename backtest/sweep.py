@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import logging
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest.data_loader import load_historical_data
+from backtest.simulator import simulate_strategy_vectorized, simulate_strategy_events
+from backtest.memo import MemoCache, DEFAULT_MAX_BYTES, fingerprint, merge_counters, format_counters
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Per-process view of the shared OHLCV block, set by _init_worker
+_shared = {}
+
+def parse_grid(spec: str):
+    """
+    Parse a grid specification such as 'rsi_period=7,14,21'.
+
+    Parameters:
+    - spec: 'name=v1,v2,...' string.
+
+    Returns:
+    - Tuple (name, list of int/float values).
+    """
+    name, _, values = spec.partition('=')
+    if not name or not values:
+        raise ValueError(f"Invalid grid specification: {spec}")
+    parsed = []
+    for value in values.split(','):
+        value = value.strip()
+        parsed.append(float(value) if any(c in value for c in '.eE') else int(value))
+    return name.strip(), parsed
+
+def expand_grid(grids: dict):
+    """
+    Expand a {parameter: values} mapping into every parameter combination.
+
+    Parameters:
+    - grids: Dictionary mapping parameter names to lists of values.
+
+    Returns:
+    - List of dictionaries, one per combination.
+    """
+    names = list(grids)
+    return [dict(zip(names, values)) for values in itertools.product(*(grids[name] for name in names))]
+
+def max_drawdown(equity: np.ndarray):
+    """Return the largest peak-to-trough loss of an equity curve as a fraction."""
+    if len(equity) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(equity)
+    return float(np.max((peaks - equity) / peaks))
+
+def share_ohlcv(data: pd.DataFrame):
+    """
+    Copy the OHLCV columns of a DataFrame into one shared-memory block.
+
+    Parameters:
+    - data: DataFrame containing historical market data.
+
+    Returns:
+    - Tuple (SharedMemory, columns, length). The caller must close and unlink it.
+    """
+    columns = [column for column in OHLCV_COLUMNS if column in data.columns]
+    length = len(data)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(columns) * length * 8))
+    block = np.ndarray((len(columns), length), dtype=np.float64, buffer=shm.buf)
+    for row, column in enumerate(columns):
+        block[row] = data[column].to_numpy(dtype=np.float64)
+    return shm, columns, length
+
+def _init_worker(shm_name: str, columns: list, length: int, memo_dir: str = None, memo_max_bytes: int = None):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray((len(columns), length), dtype=np.float64, buffer=shm.buf)
+    _shared['shm'] = shm
+    _shared['data'] = pd.DataFrame({column: block[row] for row, column in enumerate(columns)}, copy=False)
+    _shared['memo'] = MemoCache(memo_dir, memo_max_bytes or DEFAULT_MAX_BYTES) if memo_dir else None
+    # The data never changes during a sweep, so every task shares one fingerprint
+    _shared['digest'] = fingerprint(_shared['data']['close'].to_numpy()) if memo_dir else None
+
+def _run_combination(task):
+    strategy, config, params, engine = task
+    memo = _shared['memo']
+    before = memo.counters() if memo is not None else {}
+    if engine == 'events':
+        result = simulate_strategy_events(_shared['data'], strategy, {**config, **params}, memo, _shared['digest'])
+    else:
+        result = simulate_strategy_vectorized(_shared['data'], strategy, {**config, **params}, memo, _shared['digest'])
+    row = {
+        **params,
+        'final_balance': float(result['final_balance']),
+        'max_drawdown': max_drawdown(result['equity'].to_numpy()),
+        'trades': len(result['trades']),
+    }
+    if memo is not None:
+        after = memo.counters()
+        row['_memo'] = {name: after[name] - before[name] for name in after if name != 'hit_rate'}
+    return row
+
+def run_sweep(data: pd.DataFrame, strategy: str, grids: dict, config: dict, workers: int = None,
+              memo_dir: str = None, memo_max_bytes: int = DEFAULT_MAX_BYTES, engine: str = 'vectorized'):
+    """
+    Run simulate_strategy over every parameter combination on a process pool.
+
+    The OHLCV arrays are placed in shared memory once; workers attach to the
+    block instead of receiving a pickled DataFrame with every task. With a
+    memo directory, indicator series and whole results are reused across
+    combinations, workers and later sweeps (see backtest/memo.py).
+
+    Parameters:
+    - data: DataFrame containing historical market data.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - grids: Dictionary mapping parameter names to lists of values.
+    - config: Base strategy configuration; grid values override it.
+    - workers: Number of worker processes (defaults to the CPU count).
+    - memo_dir: Optional memo directory shared by the workers.
+    - memo_max_bytes: Size cap of the memo directory.
+    - engine: 'vectorized' or 'events' (charges the config's fees, spread and slippage).
+
+    Returns:
+    - Tuple (results, stats): results is a DataFrame ranked by final balance,
+      stats holds elapsed time, throughput and (with a memo) the memo counters.
+    """
+    combinations = expand_grid(grids)
+    workers = workers or os.cpu_count() or 1
+    tasks = [(strategy, config, params, engine) for params in combinations]
+    chunksize = max(1, len(tasks) // (workers * 4))
+
+    shm, columns, length = share_ohlcv(data)
+    try:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, columns, length, memo_dir, memo_max_bytes)) as executor:
+            rows = list(executor.map(_run_combination, tasks, chunksize=chunksize))
+        elapsed = time.perf_counter() - start
+    finally:
+        shm.close()
+        shm.unlink()
+
+    memo_counters = merge_counters([row.pop('_memo') for row in rows]) if memo_dir else None
+    results = pd.DataFrame(rows)
+    if not results.empty:
+        results = results.sort_values(['final_balance', 'max_drawdown'], ascending=[False, True])
+        results = results.reset_index(drop=True)
+        results.index += 1
+        results.index.name = 'rank'
+    rate = len(tasks) / elapsed if elapsed > 0 else float('inf')
+    stats = {
+        'combinations': len(tasks),
+        'workers': workers,
+        'elapsed': elapsed,
+        'combinations_per_second': rate,
+        'combinations_per_second_per_core': rate / workers,
+    }
+    logging.info(f"Sweep finished: {len(tasks)} combinations in {elapsed:.2f}s on {workers} workers.")
+    if memo_counters is not None:
+        stats['memo'] = memo_counters
+        logging.info(f"Sweep memo: {format_counters(memo_counters)}.")
+    return results, stats
+
+def main(argv=None):
+    """Command-line entry point: python -m backtest.sweep --data FILE --strategy RSI --grid ..."""
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over historical data.")
+    parser.add_argument('--data', required=True, help="Historical data CSV or kline store directory (see backtest/data_loader.py).")
+    parser.add_argument('--strategy', required=True, choices=['RSI', 'MACD', 'SMA'])
+    parser.add_argument('--grid', action='append', default=[], help="Parameter grid, e.g. rsi_period=7,14,21.")
+    parser.add_argument('--config', default='config/params.json', help="Base configuration file.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument('--top', type=int, default=20, help="Rows of the ranked table to print.")
+    parser.add_argument('--output', help="Optional CSV path for the full ranked table.")
+    parser.add_argument('--timeframe', help="Resample the data to a higher interval first, e.g. 4h.")
+    parser.add_argument('--engine', choices=['vectorized', 'events'], default='vectorized',
+                        help="'events' charges the fees, spread and slippage set in the config.")
+    parser.add_argument('--memo', help="Memo directory for indicator series and results, e.g. data/memo.")
+    parser.add_argument('--memo-max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 ** 2,
+                        help="Size cap of the memo directory in MB.")
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as file:
+        config = json.load(file)
+    grids = dict(parse_grid(spec) for spec in args.grid)
+    data = load_historical_data(args.data, timeframe=args.timeframe)
+
+    results, stats = run_sweep(data, args.strategy, grids, config, args.workers,
+                               args.memo, int(args.memo_max_mb * 1024 ** 2), args.engine)
+    print(results.head(args.top).to_string())
+    print(f"\n{stats['combinations']} combinations in {stats['elapsed']:.2f}s "
+          f"({stats['combinations_per_second']:.1f}/s, "
+          f"{stats['combinations_per_second_per_core']:.1f}/s per core on {stats['workers']} workers)")
+    if 'memo' in stats:
+        print(f"Memo: {format_counters(stats['memo'])}")
+    if args.output:
+        results.to_csv(args.output)
+        print(f"Results saved at: {args.output}")
+
+if __name__ == "__main__":
+    main()
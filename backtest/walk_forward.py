@@ -0,0 +1,324 @@
+import os
+import json
+import time
+import logging
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest.data_loader import load_historical_data
+from backtest.sweep import parse_grid, expand_grid, max_drawdown, share_ohlcv
+from backtest.simulator import compute_signals, simulate_signals
+from backtest.execution import execute_signals
+from backtest.memo import MemoCache, DEFAULT_MAX_BYTES, STRATEGY_PARAMS, fingerprint, memo_key, merge_counters, format_counters
+from market.kline_stream import interval_to_millis
+
+METRICS = ('return', 'sharpe')
+
+# Bytes of full-history signal arrays each worker keeps for reuse across folds
+SIGNAL_CACHE_BYTES = 256 * 1024 ** 2
+
+# Per-process view of the shared OHLCV block, set by _init_worker
+_shared = {}
+
+def window_bars(spec, data: pd.DataFrame):
+    """
+    Convert a window size to a number of bars.
+
+    Parameters:
+    - spec: Number of bars (int or digit string) or a duration such as '90d'
+      or '12h' (needs an open_time column to know the bar length).
+    - data: DataFrame containing historical market data.
+
+    Returns:
+    - Number of bars.
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return int(spec)
+    if 'open_time' not in data.columns or len(data) < 2:
+        raise ValueError(f"Window {spec} needs data with an open_time column; give a number of bars instead")
+    bar_ms = int(np.median(np.diff(data['open_time'].to_numpy(dtype=np.int64))))
+    return max(1, interval_to_millis(str(spec)) // bar_ms)
+
+def make_folds(length: int, train: int, test: int, step: int = None, anchored: bool = False):
+    """
+    Split bar indices into rolling (or anchored) train/test windows.
+
+    Each test window directly follows its train window and the windows
+    advance by step bars (default: test), so consecutive test windows tile
+    the history after the first train window; the last test window may be
+    shorter.
+
+    Parameters:
+    - length: Number of bars.
+    - train: Bars per train window.
+    - test: Bars per test window.
+    - step: Bars between fold starts (at least test, so test windows never overlap).
+    - anchored: Train windows all start at bar 0 and grow instead of rolling.
+
+    Returns:
+    - List of (train_start, train_end, test_start, test_end) tuples, ends exclusive.
+    """
+    step = step or test
+    if train <= 0 or test <= 0:
+        raise ValueError("Train and test windows must be positive")
+    if step < test:
+        raise ValueError("step must be at least the test window, or test windows would overlap")
+    folds = []
+    start = 0
+    while start + train < length:
+        test_end = min(start + train + test, length)
+        folds.append((0 if anchored else start, start + train, start + train, test_end))
+        start += step
+    return folds
+
+def _init_worker(shm_name: str, columns: list, length: int, memo_dir: str = None, memo_max_bytes: int = None):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray((len(columns), length), dtype=np.float64, buffer=shm.buf)
+    _shared['shm'] = shm
+    _shared['data'] = pd.DataFrame({column: block[row] for row, column in enumerate(columns)}, copy=False)
+    _shared['memo'] = MemoCache(memo_dir, memo_max_bytes or DEFAULT_MAX_BYTES) if memo_dir else None
+    _shared['digest'] = fingerprint(_shared['data']['close'].to_numpy())
+    _shared['signals'] = OrderedDict()
+    _shared['signal_capacity'] = max(1, SIGNAL_CACHE_BYTES // max(1, 2 * length))
+
+def _signals(strategy: str, config: dict):
+    """
+    Full-history buy/sell arrays of one parameter set, kept in the worker for later folds.
+
+    The indicators are causal, so a window's signals are a slice of the
+    full-history ones; computing them once per parameter set serves every
+    fold (and, through the memo, later runs).
+    """
+    cache = _shared['signals']
+    key = memo_key(strategy, {name: config.get(name) for name in STRATEGY_PARAMS.get(strategy, ())})
+    if key in cache:
+        cache.move_to_end(key)
+        _shared['signal_hits'] = _shared.get('signal_hits', 0) + 1
+        return cache[key]
+    _, buy, sell = compute_signals(_shared['data'], strategy, config, _shared['memo'], _shared['digest'])
+    cache[key] = (buy, sell)
+    while len(cache) > _shared['signal_capacity']:
+        cache.popitem(last=False)
+    _shared['signal_misses'] = _shared.get('signal_misses', 0) + 1
+    return buy, sell
+
+def evaluate(data: pd.DataFrame, buy, sell, span: tuple, config: dict, engine: str, initial_balance: float):
+    """
+    Simulate precomputed signals on one window, starting flat with initial_balance.
+
+    Parameters:
+    - data: DataFrame containing historical market data.
+    - buy, sell: Full-history signal arrays.
+    - span: (start, end) bar indices of the window.
+    - config: Strategy configuration (execution settings for the events engine).
+    - engine: 'vectorized' or 'events'.
+    - initial_balance: Balance at the start of the window.
+
+    Returns:
+    - Dictionary from simulate_signals or execute_signals.
+    """
+    start, end = span
+    close = data['close'].to_numpy(dtype=np.float64)[start:end]
+    if engine == 'events':
+        columns = {column: data[column].to_numpy(dtype=np.float64)[start:end] if column in data.columns else None
+                   for column in ('high', 'low', 'volume')}
+        return execute_signals(close, buy[start:end], sell[start:end], initial_balance, config=config, **columns)
+    if engine != 'vectorized':
+        raise ValueError(f"Unknown backtest engine: {engine}")
+    return simulate_signals(close, buy[start:end], sell[start:end], initial_balance)
+
+def score(result: dict, initial_balance: float, metric: str):
+    """Score a window result: total return, or mean/std of the per-bar equity returns ('sharpe')."""
+    if metric == 'return':
+        return result['final_balance'] / initial_balance - 1
+    if metric == 'sharpe':
+        equity = np.concatenate(([initial_balance], np.asarray(result['equity'], dtype=np.float64)))
+        returns = np.diff(equity) / equity[:-1]
+        deviation = returns.std()
+        return float(returns.mean() / deviation) if deviation > 0 else 0.0
+    raise ValueError(f"Unknown metric: {metric}")
+
+def _run_fold(task):
+    """Worker: optimize one fold's train window and return the chosen set with its test signals."""
+    index, (train_start, train_end, test_start, test_end), strategy, config, combinations, metric, engine = task
+    start = time.perf_counter()
+    memo = _shared['memo']
+    before = memo.counters() if memo is not None else {}
+    hits, misses = _shared.get('signal_hits', 0), _shared.get('signal_misses', 0)
+    initial_balance = config.get('initial_balance', 10000)
+    best = None
+    for params in combinations:
+        merged = {**config, **params}
+        buy, sell = _signals(strategy, merged)
+        result = evaluate(_shared['data'], buy, sell, (train_start, train_end), merged, engine, initial_balance)
+        value = score(result, initial_balance, metric)
+        if best is None or value > best[0]:
+            best = (value, params, result['final_balance'] / initial_balance - 1, buy, sell)
+    value, params, train_return, buy, sell = best
+    fold = {
+        'fold': index,
+        'params': params,
+        'train_score': value,
+        'train_return': train_return,
+        'test_buy': buy[test_start:test_end].copy(),
+        'test_sell': sell[test_start:test_end].copy(),
+        'signal_hits': _shared.get('signal_hits', 0) - hits,
+        'signal_misses': _shared.get('signal_misses', 0) - misses,
+        'seconds': time.perf_counter() - start,
+    }
+    if memo is not None:
+        after = memo.counters()
+        fold['memo'] = {name: after[name] - before[name] for name in after if name != 'hit_rate'}
+    return fold
+
+def run_walk_forward(data: pd.DataFrame, strategy: str, grids: dict, config: dict, train, test, step=None,
+                     anchored: bool = False, metric: str = 'return', engine: str = 'vectorized',
+                     workers: int = None, memo_dir: str = None, memo_max_bytes: int = DEFAULT_MAX_BYTES):
+    """
+    Walk-forward optimization: tune on each train window, trade the next test window.
+
+    Folds run in parallel on a process pool. The OHLCV arrays are placed in
+    shared memory once, and each worker computes a parameter set's signals
+    once on the full history and slices them for every fold it runs (the
+    indicators only look back, so this adds no look-ahead). With a memo
+    directory the indicator series are also reused across workers and runs.
+    Each fold picks the combination with the best train-window metric; the
+    test windows are then simulated in order, each starting flat with the
+    balance the previous one ended with, into one out-of-sample equity curve.
+
+    Parameters:
+    - data: DataFrame containing historical market data.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - grids: Dictionary mapping parameter names to lists of values.
+    - config: Base strategy configuration; grid values override it.
+    - train, test, step: Window sizes in bars or durations (see window_bars); step defaults to test.
+    - anchored: Grow the train window from the first bar instead of rolling it.
+    - metric: Train-window objective ('return' or 'sharpe').
+    - engine: 'vectorized' or 'events' (charges the config's trading costs).
+    - workers: Number of worker processes (defaults to the CPU count).
+    - memo_dir: Optional memo directory shared by the workers.
+    - memo_max_bytes: Size cap of the memo directory.
+
+    Returns:
+    - Dictionary with 'equity' (out-of-sample Series over the test bars),
+      'folds' (DataFrame with each fold's windows, chosen parameters, train
+      score, test return/trades/drawdown and run time) and 'stats'.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    folds = make_folds(len(data), window_bars(train, data), window_bars(test, data),
+                       window_bars(step, data) if step else None, anchored)
+    if not folds:
+        raise ValueError(f"{len(data)} bars are not enough for a train window of {train}")
+    combinations = expand_grid(grids)
+    workers = workers or os.cpu_count() or 1
+    tasks = [(index, bounds, strategy, config, combinations, metric, engine) for index, bounds in enumerate(folds, 1)]
+
+    start = time.perf_counter()
+    shm, columns, length = share_ohlcv(data)
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                                 initargs=(shm.name, columns, length, memo_dir, memo_max_bytes)) as executor:
+            results = list(executor.map(_run_fold, tasks))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    labels = data['open_time'].to_numpy() if 'open_time' in data.columns else np.arange(len(data))
+    balance = float(config.get('initial_balance', 10000))
+    curves, rows = [], []
+    for (train_start, train_end, test_start, test_end), fold in zip(folds, results):
+        test_start_time = time.perf_counter()
+        merged = {**config, **fold['params']}
+        window = data.iloc[test_start:test_end]
+        result = evaluate(window, fold['test_buy'], fold['test_sell'], (0, len(window)), merged, engine, balance)
+        equity = np.asarray(result['equity'], dtype=np.float64)
+        curves.append(pd.Series(equity, index=window.index))
+        rows.append({
+            'fold': fold['fold'],
+            'train_first': labels[train_start],
+            'train_last': labels[train_end - 1],
+            'test_first': labels[test_start],
+            'test_last': labels[test_end - 1],
+            **fold['params'],
+            'train_score': fold['train_score'],
+            'train_return': fold['train_return'],
+            'test_return': result['final_balance'] / balance - 1 if balance > 0 else 0.0,
+            'test_trades': len(result['trades']),
+            'test_max_drawdown': max_drawdown(equity),
+            'seconds': fold['seconds'] + time.perf_counter() - test_start_time,
+        })
+        balance = float(result['final_balance'])
+    elapsed = time.perf_counter() - start
+
+    equity = pd.concat(curves).rename('equity')
+    table = pd.DataFrame(rows).set_index('fold')
+    initial_balance = config.get('initial_balance', 10000)
+    stats = {
+        'folds': len(folds),
+        'combinations': len(combinations),
+        'workers': min(workers, len(tasks)),
+        'elapsed': elapsed,
+        'oos_return': balance / initial_balance - 1,
+        'oos_max_drawdown': max_drawdown(equity.to_numpy()),
+        'signal_hits': sum(fold['signal_hits'] for fold in results),
+        'signal_misses': sum(fold['signal_misses'] for fold in results),
+    }
+    if memo_dir:
+        stats['memo'] = merge_counters([fold['memo'] for fold in results])
+    logging.info(f"Walk-forward finished: {len(folds)} folds x {len(combinations)} combinations in {elapsed:.2f}s, "
+                 f"out-of-sample return {stats['oos_return']:.2%}.")
+    return {'equity': equity, 'folds': table, 'stats': stats}
+
+def main(argv=None):
+    """Command-line entry point: python -m backtest.walk_forward --data FILE --strategy RSI --grid ... --train 90d --test 30d"""
+    parser = argparse.ArgumentParser(description="Walk-forward optimization over rolling train/test windows.")
+    parser.add_argument('--data', required=True, help="Historical data CSV or kline store directory (see backtest/data_loader.py).")
+    parser.add_argument('--strategy', required=True, choices=['RSI', 'MACD', 'SMA'])
+    parser.add_argument('--grid', action='append', default=[], help="Parameter grid, e.g. rsi_period=7,14,21.")
+    parser.add_argument('--config', default='config/params.json', help="Base configuration file.")
+    parser.add_argument('--train', required=True, help="Train window: bars or a duration such as 90d.")
+    parser.add_argument('--test', required=True, help="Test window: bars or a duration such as 30d.")
+    parser.add_argument('--step', help="Bars or duration between folds (default: the test window).")
+    parser.add_argument('--anchored', action='store_true', help="Grow the train window from the first bar.")
+    parser.add_argument('--metric', choices=METRICS, default='return', help="Train-window objective.")
+    parser.add_argument('--engine', choices=['vectorized', 'events'], default='vectorized',
+                        help="'events' charges the fees, spread and slippage set in the config.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument('--timeframe', help="Resample the data to a higher interval first, e.g. 4h.")
+    parser.add_argument('--memo', help="Memo directory for indicator series, e.g. data/memo.")
+    parser.add_argument('--memo-max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 ** 2,
+                        help="Size cap of the memo directory in MB.")
+    parser.add_argument('--output', help="Optional CSV path for the per-fold table.")
+    parser.add_argument('--equity-output', help="Optional CSV path for the out-of-sample equity curve.")
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as file:
+        config = json.load(file)
+    grids = dict(parse_grid(spec) for spec in args.grid)
+    data = load_historical_data(args.data, timeframe=args.timeframe)
+
+    result = run_walk_forward(data, args.strategy, grids, config, args.train, args.test, args.step, args.anchored,
+                              args.metric, args.engine, args.workers, args.memo, int(args.memo_max_mb * 1024 ** 2))
+    stats = result['stats']
+    print(result['folds'].to_string())
+    print(f"\nOut-of-sample return {stats['oos_return']:.2%}, max drawdown {stats['oos_max_drawdown']:.2%}; "
+          f"{stats['folds']} folds x {stats['combinations']} combinations in {stats['elapsed']:.2f}s "
+          f"on {stats['workers']} workers ({stats['signal_hits']} signal sets reused, {stats['signal_misses']} computed)")
+    if 'memo' in stats:
+        print(f"Memo: {format_counters(stats['memo'])}")
+    if args.output:
+        result['folds'].to_csv(args.output)
+        print(f"Fold table saved at: {args.output}")
+    if args.equity_output:
+        equity = result['equity'].to_frame()
+        if 'open_time' in data.columns:
+            equity.insert(0, 'open_time', data['open_time'].loc[equity.index])
+        equity.to_csv(args.equity_output, index=False)
+        print(f"Equity curve saved at: {args.equity_output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from strategies.rsi_strategy import calculate_rsi
+from strategies.macd_strategy import calculate_macd
+from strategies.sma_strategy import calculate_sma
+from strategies.batch_indicators import batch_rsi, batch_macd, batch_sma
+from benchmarks.bench_simulator import CONFIG
+
+def universe(symbols: int, bars: int, seed: int = 42):
+    """Random-walk (symbols x bars) close matrix."""
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (symbols, bars)), axis=1))
+
+def loop_indicators(close: np.ndarray):
+    """The per-symbol path: one DataFrame and three calculate_* calls per row."""
+    results = []
+    for row in close:
+        data = pd.DataFrame({'close': row})
+        data = calculate_rsi(data, CONFIG['rsi_period'])
+        data = calculate_macd(data, CONFIG['fast_period'], CONFIG['slow_period'], CONFIG['signal_period'])
+        data = calculate_sma(data, CONFIG['short_window'], CONFIG['long_window'])
+        results.append(data)
+    return results
+
+def batch_indicators(close: np.ndarray):
+    """The batched path: every symbol in one call per kernel."""
+    return (
+        batch_rsi(close, CONFIG['rsi_period']),
+        batch_macd(close, CONFIG['fast_period'], CONFIG['slow_period'], CONFIG['signal_period']),
+        batch_sma(close, CONFIG['short_window']),
+        batch_sma(close, CONFIG['long_window']),
+    )
+
+def best_of(function, close: np.ndarray, repeat: int = 3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(close)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def run(universes=(10, 100, 300), bar_counts=(500, 10_000)):
+    """
+    Time RSI + MACD + SMA over whole universes both ways and print the speedup.
+
+    The max-abs-diff column checks the batched values against the
+    DataFrame functions on the same data.
+    """
+    print(f"{'symbols':>8} {'bars':>8} {'loop s':>10} {'batch s':>10} {'speedup':>8} {'max diff':>10}")
+    for bars in bar_counts:
+        for symbols in universes:
+            close = universe(symbols, bars)
+            loop_seconds, frames = best_of(loop_indicators, close)
+            batch_seconds, (rsi, (macd, signal), sma_short, sma_long) = best_of(batch_indicators, close)
+            expected = np.stack([frame[['rsi', 'macd', 'signal_line', 'sma_short', 'sma_long']].to_numpy()
+                                 for frame in frames])
+            got = np.stack([rsi, macd, signal, sma_short, sma_long], axis=-1)
+            diff = np.nanmax(np.abs(got - expected))
+            print(f"{symbols:>8} {bars:>8} {loop_seconds:>10.4f} {batch_seconds:>10.4f} "
+                  f"{loop_seconds / batch_seconds:>7.1f}x {diff:>10.2e}")
+
+if __name__ == "__main__":
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (10, 100, 300))
@@ -0,0 +1,91 @@
+import sys
+import json
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from market.kline_cache import KLINE_COLUMNS, klines_to_frame, parse_klines
+
+def raw_klines(count: int, seed: int = 42):
+    """
+    Build a get_klines-style response: lists of strings decoded from JSON.
+
+    Parameters:
+    - count: Number of klines.
+    - seed: Random seed.
+
+    Returns:
+    - List of kline lists, exactly as python-binance returns them.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, count)))
+    rows = [
+        [1_700_000_000_000 + i * 60_000, f"{c:.8f}", f"{c * 1.001:.8f}", f"{c * 0.999:.8f}", f"{c:.8f}",
+         f"{rng.gamma(2.0, 50.0):.8f}", 1_700_000_000_000 + i * 60_000 + 59_999, f"{c * 100:.8f}", 100,
+         "50.00000000", f"{c * 50:.8f}", "0"]
+        for i, c in enumerate(close)
+    ]
+    # Round-trip through JSON so every string is a separate object, as in a real response
+    return json.loads(json.dumps(rows))
+
+def legacy_klines_to_frame(klines: list):
+    """The previous fetch_historical_data conversion: a 12-column frame of strings, then astype(float)."""
+    data = pd.DataFrame(klines, columns=KLINE_COLUMNS)
+    data[['open', 'high', 'low', 'close', 'volume']] = data[['open', 'high', 'low', 'close', 'volume']].astype(float)
+    return data
+
+def measure(function, repeat: int = 20):
+    """Return (best seconds, peak traced bytes) of function()."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak
+
+def retained_bytes(build):
+    """Bytes still allocated by the object build() returns."""
+    tracemalloc.start()
+    try:
+        kept = build()
+        current = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current
+
+def run(counts=(100, 500, 1_000)):
+    """
+    Compare the legacy string-frame conversion with parse_klines.
+
+    Prints per-fetch wall time and peak allocation for the legacy path, the
+    full typed frame and the strategies' open_time/close columns, then the
+    memory one cached window takes as raw kline lists versus typed arrays.
+    """
+    print(f"{'klines':>7} {'path':<22} {'us/fetch':>10} {'peak KB':>10}")
+    for count in counts:
+        klines = raw_klines(count)
+        paths = (
+            ('legacy 12-col frame', lambda: legacy_klines_to_frame(klines)),
+            ('typed frame', lambda: klines_to_frame(klines)),
+            ('open_time+close', lambda: klines_to_frame(klines, ['open_time', 'close'])),
+            ('open_time+close f32', lambda: klines_to_frame(klines, ['open_time', 'close'], np.float32)),
+        )
+        for name, function in paths:
+            seconds, peak = measure(function)
+            print(f"{count:>7} {name:<22} {seconds * 1e6:>10.1f} {peak / 1024:>10.1f}")
+
+    count = counts[-1]
+    raw = retained_bytes(lambda: raw_klines(count))
+    typed = retained_bytes(lambda: parse_klines(raw_klines(count)))
+    print(f"\nCached window of {count} klines: raw lists {raw / 1024:.1f} KB, "
+          f"typed arrays {typed / 1024:.1f} KB ({raw / typed:.0f}x smaller)")
+
+if __name__ == "__main__":
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (100, 500, 1_000))
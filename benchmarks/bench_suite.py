@@ -0,0 +1,278 @@
+import os
+import io
+import gc
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from backtest.simulator import simulate_strategy
+from backtest.data_loader import load_historical_data
+from backtest.kline_store import write_klines, partition_path
+from strategies.rsi_strategy import calculate_rsi
+from strategies.macd_strategy import calculate_macd
+from strategies.sma_strategy import calculate_sma
+from logs.trade_journal import TradeJournal, COLUMNS
+from logs.trade_aggregates import TradeAggregates
+import logs.trading_report as trading_report
+from benchmarks.bench_simulator import CONFIG
+
+BAR_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+LOG_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+# Rendering the balance chart plots every trade, so it is only measured on smaller logs
+CHART_SIZES = (1_000, 10_000, 100_000)
+# Trades appended per log_trade measurement
+TRADES_PER_RUN = 1_000
+
+def synthetic_ohlcv(bars: int, seed: int = 42, start: str = '2020-01-01', interval_ms: int = 60_000):
+    """
+    Build random-walk OHLCV candles for benchmarking.
+
+    Parameters:
+    - bars: Number of candles to generate.
+    - seed: Random seed.
+    - start: Open time of the first candle.
+    - interval_ms: Candle length in milliseconds.
+
+    Returns:
+    - DataFrame with open_time, open, high, low, close, volume and close_time.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    open_ = np.empty(bars)
+    open_[0] = 100.0
+    open_[1:] = close[:-1]
+    spread = np.abs(rng.normal(0, 0.001, bars)) * close
+    open_time = int(pd.Timestamp(start, tz='UTC').value // 1_000_000) + np.arange(bars, dtype=np.int64) * interval_ms
+    return pd.DataFrame({
+        'open_time': open_time,
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.gamma(2.0, 50.0, bars),
+        'close_time': open_time + interval_ms - 1,
+    })
+
+def _write_trades(path: str, trades: int):
+    """Write a journal file holding `trades` trades stamped today."""
+    rng = np.random.default_rng(0)
+    stamps = pd.Timestamp(datetime.now().date()) + pd.to_timedelta(np.arange(trades) % 86_400_000_000, unit='us')
+    pd.DataFrame({
+        'action': np.where(np.arange(trades) % 2 == 0, 'BUY', 'SELL'),
+        'symbol': 'BTCUSDT',
+        'quantity': 0.01,
+        'price': 100 * np.exp(np.cumsum(rng.normal(0, 0.002, trades))),
+        'balance': 10_000 + np.cumsum(rng.normal(0, 5, trades)),
+        'timestamp': stamps.strftime('%Y-%m-%d %H:%M:%S.%f'),
+    }, columns=COLUMNS).to_csv(path, index=False)
+
+@contextlib.contextmanager
+def _journal(trades: int, workdir: str):
+    """Point logs.trading_report at a temporary journal pre-filled with `trades` trades."""
+    path = os.path.join(workdir, 'trading_log.csv')
+    _write_trades(path, trades)
+    saved = trading_report.journal, trading_report.chart_renderer
+    # Never rotate during a run, so appends measure the steady state
+    trading_report.journal = TradeJournal(path, max_bytes=1 << 62,
+                                          aggregates=TradeAggregates(os.path.join(workdir, 'aggregates.json')))
+    trading_report.chart_renderer = trading_report.ChartRenderer(os.path.join(workdir, 'balance_chart.png'))
+    try:
+        trading_report.journal.stats()
+        yield trading_report.journal
+    finally:
+        # Background chart renders must finish before the directory is removed
+        trading_report.chart_renderer.wait(120)
+        trading_report.journal.close()
+        trading_report.journal, trading_report.chart_renderer = saved
+
+def _log_trades():
+    for i in range(TRADES_PER_RUN):
+        trading_report.log_trade('BUY' if i % 2 == 0 else 'SELL', 'BTCUSDT', 0.01, 45000 + i, 10000)
+
+def _quiet_report(wait: bool):
+    with contextlib.redirect_stdout(io.StringIO()):
+        trading_report.generate_report(wait=wait)
+
+@contextlib.contextmanager
+def _frame(bars: int, workdir: str):
+    yield synthetic_ohlcv(bars)
+
+@contextlib.contextmanager
+def _csv(bars: int, workdir: str):
+    path = os.path.join(workdir, 'klines.csv')
+    synthetic_ohlcv(bars).to_csv(path, index=False)
+    yield path
+
+@contextlib.contextmanager
+def _store(bars: int, workdir: str):
+    root = os.path.join(workdir, 'store')
+    write_klines(root, 'BTCUSDT', '1m', synthetic_ohlcv(bars))
+    yield partition_path(root, 'BTCUSDT', '1m')
+
+# name -> (sizes, setup(size, workdir) context manager, function timed on the setup value)
+CASES = {
+    'indicator/rsi': (BAR_SIZES, _frame, lambda data: calculate_rsi(data, CONFIG['rsi_period'])),
+    'indicator/macd': (BAR_SIZES, _frame, lambda data: calculate_macd(
+        data, CONFIG['fast_period'], CONFIG['slow_period'], CONFIG['signal_period'])),
+    'indicator/sma': (BAR_SIZES, _frame, lambda data: calculate_sma(data, CONFIG['short_window'], CONFIG['long_window'])),
+    'simulate/RSI': (BAR_SIZES, _frame, lambda data: simulate_strategy(data, 'RSI', CONFIG)),
+    'simulate/MACD': (BAR_SIZES, _frame, lambda data: simulate_strategy(data, 'MACD', CONFIG)),
+    'simulate/SMA': (BAR_SIZES, _frame, lambda data: simulate_strategy(data, 'SMA', CONFIG)),
+    'simulate/events-MACD': (BAR_SIZES, _frame, lambda data: simulate_strategy(
+        data, 'MACD', {**CONFIG, 'taker_fee': 0.001, 'spread': 0.0001, 'slippage': 0.05, 'max_participation': 0.05},
+        engine='events')),
+    'load/csv': (BAR_SIZES, _csv, load_historical_data),
+    'load/store': (BAR_SIZES, _store, load_historical_data),
+    'log_trade': (LOG_SIZES, _journal, lambda journal: _log_trades()),
+    'report': (LOG_SIZES, _journal, lambda journal: _quiet_report(wait=False)),
+    'report/chart': (CHART_SIZES, _journal, lambda journal: _quiet_report(wait=True)),
+}
+
+def measure(function, value, repeat: int = 3):
+    """
+    Measure one case.
+
+    Wall time is the best of `repeat` plain runs; peak memory comes from one
+    extra run under tracemalloc, so its overhead does not skew the timing.
+
+    Returns:
+    - Dictionary with seconds and peak_mb.
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(value)
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(value)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(timings), 'peak_mb': peak / 2**20}
+
+def run_suite(max_bars: int = 1_000_000, repeat: int = 3, only: list = None, verbose: bool = True):
+    """
+    Run every benchmark case up to max_bars rows.
+
+    Parameters:
+    - max_bars: Largest bar count (or journal size) to run.
+    - repeat: Timed runs per measurement.
+    - only: Optional case-name prefixes to run.
+    - verbose: Print each result as it is measured.
+
+    Returns:
+    - Dictionary with 'meta' and 'results' keyed by 'case@size'.
+    """
+    logging.disable(logging.INFO)
+    results = {}
+    for name, (sizes, setup, function) in CASES.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        for size in sizes:
+            if size > max_bars:
+                continue
+            workdir = tempfile.mkdtemp(prefix='bench-')
+            try:
+                with setup(size, workdir) as value:
+                    result = measure(function, value, repeat)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            results[f"{name}@{size}"] = result
+            if verbose:
+                print(f"{name:<16} {size:>10} {result['seconds']:>10.4f}s {result['peak_mb']:>10.1f} MB")
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10, min_seconds: float = 0.002,
+            min_mb: float = 1.0):
+    """
+    Compare two benchmark runs.
+
+    Parameters:
+    - baseline: Earlier run_suite output.
+    - current: New run_suite output.
+    - threshold: Relative slowdown (or memory growth) flagged as a regression.
+    - min_seconds: Absolute slowdown below which timer noise is ignored.
+    - min_mb: Absolute memory growth below which differences are ignored.
+
+    Returns:
+    - List of rows (case, baseline seconds, current seconds, time ratio,
+      memory ratio, regressed) for the cases present in both runs.
+    """
+    rows = []
+    for case, old in baseline['results'].items():
+        new = current['results'].get(case)
+        if new is None:
+            continue
+        time_ratio = new['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        memory_ratio = new['peak_mb'] / old['peak_mb'] if old['peak_mb'] else 1.0
+        slower = time_ratio > 1 + threshold and new['seconds'] - old['seconds'] > min_seconds
+        larger = memory_ratio > 1 + threshold and new['peak_mb'] - old['peak_mb'] > min_mb
+        regressed = slower or larger
+        rows.append((case, old['seconds'], new['seconds'], time_ratio, memory_ratio, regressed))
+    return rows
+
+def main(argv=None):
+    """
+    Command-line entry point:
+    python -m benchmarks.bench_suite run --output benchmarks/baselines/local.json
+    python -m benchmarks.bench_suite compare BASELINE CURRENT --threshold 0.1
+    """
+    parser = argparse.ArgumentParser(description="Benchmark indicators, simulator, data loading and trade logging.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="Run the suite and save a JSON baseline.")
+    run_parser.add_argument('--output', required=True)
+    run_parser.add_argument('--max-bars', type=int, default=1_000_000)
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--only', nargs='*', help="Case-name prefixes, e.g. indicator load/store.")
+    compare_parser = commands.add_parser('compare', help="Flag regressions between two runs.")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+    compare_parser.add_argument('--min-seconds', type=float, default=0.002)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run_suite(args.max_bars, args.repeat, args.only)
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved {len(report['results'])} results to {args.output}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    rows = compare(baseline, current, args.threshold, args.min_seconds)
+    print(f"{'case':<28} {'baseline':>10} {'current':>10} {'time':>7} {'memory':>7}")
+    for case, old, new, time_ratio, memory_ratio, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{case:<28} {old:>10.4f} {new:>10.4f} {time_ratio:>6.2f}x {memory_ratio:>6.2f}x{flag}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} regression(s) over {args.threshold:.0%} in {len(rows)} cases.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
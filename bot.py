@@ -1,13 +1,25 @@
 import os
 import logging
 import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from binance.client import Client
 from strategies.rsi_strategy import execute_rsi_strategy
 from strategies.macd_strategy import execute_macd_strategy
 from strategies.sma_strategy import execute_sma_strategy
 from logs.trading_report import log_trade, generate_report
-from orders.orders_manager import place_order, get_account_balance
+from logs.metrics import metrics, span
+from orders.orders_manager import place_order, get_account_balance, set_account_mirror, set_order_pipeline
+from orders.account_mirror import AccountMirror
+from orders.order_pipeline import OrderPipeline, CLOSE_TIMEOUT
+from market.kline_stream import KlineStream, DEFAULT_STREAM_URL, interval_to_millis
+from market.resampler import TimeframeResampler
+from market.candle_scheduler import CandleScheduler
+from market.kline_cache import kline_cache
+from market.rate_limiter import RateLimitedClient, WeightBudget, DEFAULT_WEIGHT_LIMIT
 
 # Load environment variables
 load_dotenv()
@@ -35,42 +47,234 @@ def load_config():
         logging.error(f"Failed to load configuration: {e}")
         raise
 
+def execute_symbol(client, symbol, config, data=None):
+    """
+    Execute the selected trading strategy for one symbol.
+
+    Parameters:
+    - client: Binance Client object.
+    - symbol: Trading pair (e.g., BTCUSDT).
+    - config: Dictionary containing strategy configuration.
+    - data: Optional window of closed candles; fetched over REST when omitted.
+    """
+    with span('cycle', symbol, config.get('strategy')):
+        _dispatch_strategy(client, symbol, config, data)
+
+def _dispatch_strategy(client, symbol, config, data):
+    if config.get('strategy') == 'RSI':
+        logging.info(f"Executing RSI Strategy for {symbol}...")
+        execute_rsi_strategy(client, symbol, config, data)
+    elif config.get('strategy') == 'MACD':
+        logging.info(f"Executing MACD Strategy for {symbol}...")
+        execute_macd_strategy(client, symbol, config, data)
+    elif config.get('strategy') == 'SMA':
+        logging.info(f"Executing SMA Strategy for {symbol}...")
+        execute_sma_strategy(client, symbol, config, data)
+    else:
+        logging.warning("No valid strategy specified in configuration.")
+
 def execute_strategy(client, config):
     """
-    Execute the selected trading strategy.
+    Execute the selected trading strategy for every symbol concurrently.
+
+    Symbols run on a bounded thread pool (config['max_workers'], default 8)
+    and share one request-weight budget (config['weight_limit'] per minute).
+    A failing symbol is logged and reported without affecting the others.
+
+    Returns:
+    - Dictionary mapping each symbol to None on success or the error message.
+    """
+    symbols = config.get('symbols', [])
+    if not isinstance(client, RateLimitedClient):
+        client = RateLimitedClient(client, WeightBudget(config.get('weight_limit', DEFAULT_WEIGHT_LIMIT)))
+
+    results = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config.get('max_workers', 8)) as executor:
+        futures = {executor.submit(execute_symbol, client, symbol, config): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                future.result()
+                results[symbol] = None
+            except Exception as e:
+                logging.error(f"Error during strategy execution for {symbol}: {e}")
+                results[symbol] = str(e)
+
+    failed = {symbol: error for symbol, error in results.items() if error is not None}
+    logging.info(f"Strategy cycle: {len(symbols) - len(failed)}/{len(symbols)} symbols succeeded "
+                 f"in {time.perf_counter() - start:.2f}s.")
+    if failed:
+        logging.warning(f"Failed symbols: {failed}")
+    return results
+
+def schedule_configs(config):
+    """
+    Expand config['schedules'] into one full configuration per scheduled job.
+
+    Each schedule entry overrides keys of the base configuration (e.g.
+    {"strategy": "RSI", "interval": "15m", "symbols": ["ETHUSDT"]}) and may
+    set a unique "name"; without schedules the base configuration is the
+    only job.
+    """
+    return [{**config, **schedule} for schedule in config.get('schedules') or [{}]]
+
+def run_stream(client, config):
+    """
+    Run the strategies on every closed candle of the combined kline stream.
+
+    Each symbol is subscribed once, at the smallest interval of the
+    scheduled jobs (or config['base_interval']); candles of the higher job
+    intervals are resampled from that feed as it closes, so every timeframe
+    shares one subscription and one window per symbol. The stream endpoint
+    comes from config['stream_url'] so it can point at a local replay
+    server. Unless config['account_stream'] is false, balances are mirrored
+    from the user data stream for the duration, and strategy orders go
+    through an OrderPipeline tracked from that stream. Runs until
+    interrupted, then logs the candle-close-to-decision latency summary.
     """
+    jobs = schedule_configs(config)
+    base_interval = config.get('base_interval') or min((job['interval'] for job in jobs), key=interval_to_millis)
+    higher = sorted({job['interval'] for job in jobs} - {base_interval}, key=interval_to_millis)
+    symbols = list(dict.fromkeys(symbol for job in jobs for symbol in job.get('symbols', [])))
+    limit = max(job['data_limit'] for job in jobs)
+
+    def dispatch(symbol, interval, data):
+        for job in jobs:
+            if job['interval'] != interval or symbol not in job.get('symbols', []):
+                continue
+            try:
+                execute_symbol(client, symbol, job, data.tail(job['data_limit']).reset_index(drop=True))
+            except Exception as e:
+                logging.error(f"Error during strategy execution for {symbol}: {e}")
+
+    mirror = None
+    if config.get('account_stream', True):
+        mirror = AccountMirror(client, stream_url=config.get('stream_url', DEFAULT_STREAM_URL)).start()
+        set_account_mirror(mirror)
+    pipeline = OrderPipeline(client, mirror, max_workers=config.get('order_workers', 4))
+    set_order_pipeline(pipeline)
+
+    stream = KlineStream(
+        client,
+        symbols,
+        base_interval,
+        limit,
+        lambda symbol, data: dispatch(symbol, base_interval, data),
+        stream_url=config.get('stream_url', DEFAULT_STREAM_URL),
+        resampler=TimeframeResampler(base_interval, higher, limit) if higher else None,
+        on_resampled=dispatch,
+    )
     try:
-        for symbol in config.get('symbols', []):
-            if config.get('strategy') == 'RSI':
-                logging.info(f"Executing RSI Strategy for {symbol}...")
-                execute_rsi_strategy(client, symbol, config)
-            elif config.get('strategy') == 'MACD':
-                logging.info(f"Executing MACD Strategy for {symbol}...")
-                execute_macd_strategy(client, symbol, config)
-            elif config.get('strategy') == 'SMA':
-                logging.info(f"Executing SMA Strategy for {symbol}...")
-                execute_sma_strategy(client, symbol, config)
-            else:
-                logging.warning("No valid strategy specified in configuration.")
-    except Exception as e:
-        logging.error(f"Error during strategy execution: {e}")
-        raise
+        asyncio.run(stream.run())
+    except KeyboardInterrupt:
+        logging.info("Kline stream stopped.")
+    finally:
+        logging.info(f"Stream latency: {stream.latency_summary()}")
+        pipeline.close(config.get('order_wait_timeout', CLOSE_TIMEOUT))
+        set_order_pipeline(None)
+        logging.info(f"Order latency: {pipeline.latency_summary()}")
+        logging.info(f"Stage latency: {metrics.summary()}")
+        if config.get('metrics_json'):
+            metrics.dump_json(config['metrics_json'])
+        if mirror is not None:
+            mirror.stop()
+            logging.info(f"Account mirror: {mirror.metrics()}")
+
+def run_daemon(client, config):
+    """
+    Run as a resident daemon that trades right after each candle close.
+
+    The client, request-weight budget, kline cache, live indicators, order
+    pipeline and (unless config['account_stream'] is false) the account
+    mirror stay warm between cycles, so each cycle only fetches the newest
+    candles. Jobs wake config['close_offset'] seconds (default 1) after
+    their interval closes; only jobs whose interval just closed run. A job
+    still running at its next close is skipped or coalesced according to
+    config['overrun_policy'] ('skip' by default). Runs until interrupted.
+    """
+    mirror = None
+    if config.get('account_stream', True):
+        mirror = AccountMirror(client, stream_url=config.get('stream_url', DEFAULT_STREAM_URL)).start()
+        set_account_mirror(mirror)
+    pipeline = OrderPipeline(client, mirror, max_workers=config.get('order_workers', 4))
+    set_order_pipeline(pipeline)
+
+    scheduler = CandleScheduler(
+        offset=config.get('close_offset', 1.0),
+        overrun=config.get('overrun_policy', 'skip'),
+        max_workers=config.get('scheduler_workers', 4),
+    )
+    for job_config in schedule_configs(config):
+        name = job_config.get('name') or (f"{job_config.get('strategy')}@{job_config['interval']}"
+                                          f"[{','.join(job_config.get('symbols', []))}]")
+        scheduler.add_job(name, job_config['interval'],
+                          lambda close_ms, job_config=job_config: execute_strategy(client, job_config))
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        logging.info("Daemon stopped.")
+    finally:
+        scheduler.stop()
+        logging.info(f"Scheduler: {scheduler.stats()}")
+        pipeline.close(config.get('order_wait_timeout', CLOSE_TIMEOUT))
+        set_order_pipeline(None)
+        logging.info(f"Kline cache: {kline_cache.counters()}")
+        logging.info(f"Order latency: {pipeline.latency_summary()}")
+        logging.info(f"Stage latency: {metrics.summary()}")
+        if config.get('metrics_json'):
+            metrics.dump_json(config['metrics_json'])
+        if mirror is not None:
+            mirror.stop()
+            logging.info(f"Account mirror: {mirror.metrics()}")
 
 
-def main():
+def main(argv=None):
     """
     Main function to initialize and run the trading bot.
     """
-    # Initialize Binance client
-    client = Client(API_KEY, SECRET_KEY)
+    parser = argparse.ArgumentParser(description="Binance Trading Bot")
+    parser.add_argument('--stream', action='store_true',
+                        help="Subscribe to kline streams and trade on every closed candle.")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Stay resident and run each strategy right after its interval closes.")
+    args = parser.parse_args(argv)
 
     # Load configuration
     config = load_config()
 
+    # Initialize Binance client (config['api_url'] points it at e.g. a local mock exchange)
+    api_url = config.get('api_url')
+    client = Client(API_KEY, SECRET_KEY, ping=api_url is None)
+    if api_url:
+        client.API_URL = api_url
+
+    # Share one request-weight budget across every call the bot makes
+    client = RateLimitedClient(client, WeightBudget(config.get('weight_limit', DEFAULT_WEIGHT_LIMIT)))
+
+    # Stage latency export: Prometheus text endpoint and/or periodic JSON dump
+    if config.get('metrics_port'):
+        metrics.serve(config['metrics_port'])
+    if config.get('metrics_json'):
+        metrics.start_json_dump(config['metrics_json'], config.get('metrics_interval', 60))
+
     logging.info("Starting Binance Trading Bot...")
 
-    # Execute the selected strategy
+    if args.stream:
+        run_stream(client, config)
+        return
+    if args.daemon:
+        run_daemon(client, config)
+        return
+
+    # Execute the selected strategy; orders are submitted in the background
+    pipeline = OrderPipeline(client, max_workers=config.get('order_workers', 4))
+    set_order_pipeline(pipeline)
     execute_strategy(client, config)
+    pipeline.close(config.get('order_wait_timeout', CLOSE_TIMEOUT))
+    set_order_pipeline(None)
+    logging.info(f"Kline cache: {kline_cache.counters()}")
+    logging.info(f"Order latency: {pipeline.latency_summary()}")
 
     # Example: Log a trade (replace with actual logic)
     try:
@@ -81,9 +285,14 @@ def main():
     # Generate trading report
     try:
         logging.info("Generating trading report...")
-        generate_report()
+        with span('report'):
+            generate_report()
     except Exception as e:
         logging.error(f"Failed to generate report: {e}")
 
+    logging.info(f"Stage latency: {metrics.summary()}")
+    if config.get('metrics_json'):
+        metrics.dump_json(config['metrics_json'])
+
 if __name__ == "__main__":
     main()
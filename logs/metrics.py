@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Recording is O(log buckets) and memory does not grow with the number
+    of samples; percentiles are interpolated inside the bucket that
+    contains them and capped at the exact maximum.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, q: float):
+        """Approximate the q-th percentile (0-100) in ms."""
+        if self.count == 0:
+            return float('nan')
+        rank = q / 100 * self.count
+        before = 0
+        for bucket, count in enumerate(self.counts):
+            if count and before + count >= rank:
+                lower = self.buckets[bucket - 1] if bucket > 0 else 0.0
+                upper = self.buckets[bucket] if bucket < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - before) / count, self.max)
+            before += count
+        return self.max
+
+    def summary(self):
+        """Return count, mean, p50, p99 and max in ms."""
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max,
+        }
+
+class _Span:
+    __slots__ = ('registry', 'key', 'start')
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.record(self.key, (time.perf_counter() - self.start) * 1000)
+        return False
+
+class StageMetrics:
+    """
+    In-process latency histograms per (stage, symbol, strategy).
+
+    span() times a block with two perf_counter calls and one histogram
+    update, cheap enough to leave on in production. Results are exported
+    as Prometheus text or JSON.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def span(self, stage: str, symbol: str = '', strategy: str = ''):
+        """
+        Time a block of code.
+
+        Parameters:
+        - stage: Stage name (fetch, indicator, decision, order_submit, report...).
+        - symbol: Optional trading pair tag.
+        - strategy: Optional strategy tag.
+        """
+        return _Span(self, (stage, symbol or '', strategy or ''))
+
+    def record(self, key: tuple, value_ms: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(value_ms)
+
+    def summary(self):
+        """Return one row per (stage, symbol, strategy) with count, mean, p50, p99 and max."""
+        with self._lock:
+            return [
+                {'stage': stage, 'symbol': symbol, 'strategy': strategy, **histogram.summary()}
+                for (stage, symbol, strategy), histogram in sorted(self.histograms.items())
+            ]
+
+    def prometheus_text(self):
+        """Render the histograms in the Prometheus text exposition format."""
+        lines = [
+            '# HELP bot_stage_latency_ms Trading cycle stage latency in milliseconds.',
+            '# TYPE bot_stage_latency_ms histogram',
+        ]
+        maxima = [
+            '# HELP bot_stage_latency_max_ms Slowest observed stage latency in milliseconds.',
+            '# TYPE bot_stage_latency_max_ms gauge',
+        ]
+        with self._lock:
+            for (stage, symbol, strategy), histogram in sorted(self.histograms.items()):
+                labels = f'stage="{stage}",symbol="{symbol}",strategy="{strategy}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'bot_stage_latency_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'bot_stage_latency_ms_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'bot_stage_latency_ms_sum{{{labels}}} {histogram.total}')
+                lines.append(f'bot_stage_latency_ms_count{{{labels}}} {histogram.count}')
+                maxima.append(f'bot_stage_latency_max_ms{{{labels}}} {histogram.max}')
+        return '\n'.join(lines + maxima) + '\n'
+
+    def dump_json(self, path: str):
+        """Atomically write the summary to a JSON file."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({'updated': time.time(), 'stages': self.summary()}, file, indent=2)
+        os.replace(tmp_path, path)
+
+    def start_json_dump(self, path: str, interval: float = 60.0):
+        """Dump the summary to path every interval seconds on a daemon thread."""
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump_json(path)
+                except OSError as e:
+                    logging.warning(f"Failed to dump metrics to {path}: {e}")
+        thread = threading.Thread(target=run, name='metrics-dump', daemon=True)
+        thread.start()
+        return thread
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1'):
+        """
+        Serve /metrics (Prometheus text) and /metrics.json on a daemon thread.
+
+        Returns:
+        - The running ThreadingHTTPServer.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = metrics.prometheus_text().encode(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(metrics.summary()).encode(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        logging.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+# Metrics shared by the whole process
+metrics = StageMetrics()
+
+def span(stage: str, symbol: str = '', strategy: str = ''):
+    """Time a block of code in the shared metrics: `with span('fetch', symbol, 'RSI'): ...`"""
+    return metrics.span(stage, symbol, strategy)
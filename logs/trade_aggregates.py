@@ -0,0 +1,134 @@
+import os
+import json
+import logging
+import pandas as pd
+
+class TradeAggregates:
+    """
+    Running per-symbol, per-action trade statistics.
+
+    Updated in O(1) per trade: count, traded volume, notional (for a
+    volume-weighted average price), the plain sum of prices (for the simple
+    average the report prints) and realized PnL using average cost. The
+    state is persisted as a small JSON snapshot together with the timestamp
+    of the last trade it includes, so a restart only replays newer trades.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Parameters:
+        - path: Optional JSON snapshot file.
+        """
+        self.path = path
+        self.actions = {}
+        self.positions = {}
+        self.last_timestamp = None
+
+    def update(self, action, symbol, quantity, price, timestamp=None):
+        """Fold one trade into the aggregates."""
+        quantity, price = float(quantity), float(price)
+        stats = self.actions.setdefault(f"{symbol}|{action}", {
+            'count': 0, 'volume': 0.0, 'notional': 0.0, 'price_sum': 0.0,
+        })
+        stats['count'] += 1
+        stats['volume'] += quantity
+        stats['notional'] += quantity * price
+        stats['price_sum'] += price
+
+        position = self.positions.setdefault(symbol, {'quantity': 0.0, 'cost': 0.0, 'realized_pnl': 0.0})
+        if action == 'BUY':
+            position['quantity'] += quantity
+            position['cost'] += quantity * price
+        elif action == 'SELL':
+            held = position['quantity']
+            closed = min(quantity, held) if held > 0 else 0.0
+            if closed > 0:
+                average_cost = position['cost'] / held
+                position['realized_pnl'] += closed * (price - average_cost)
+                position['cost'] -= closed * average_cost
+            position['quantity'] = max(held - quantity, 0.0)
+            if position['quantity'] == 0:
+                position['cost'] = 0.0
+        if timestamp is not None and not pd.isna(timestamp):
+            self.last_timestamp = str(timestamp)
+
+    def totals(self, action: str = None):
+        """
+        Sum the per-symbol statistics.
+
+        Parameters:
+        - action: 'BUY', 'SELL' or None for every action.
+
+        Returns:
+        - Dictionary with count, volume, notional and price_sum.
+        """
+        result = {'count': 0, 'volume': 0.0, 'notional': 0.0, 'price_sum': 0.0}
+        for key, stats in self.actions.items():
+            if action is None or key.split('|', 1)[1] == action:
+                for field in result:
+                    result[field] += stats[field]
+        return result
+
+    def per_symbol(self):
+        """
+        Return one row per symbol/action with count, volume, average price,
+        VWAP and the symbol's realized PnL.
+        """
+        rows = []
+        for key in sorted(self.actions):
+            symbol, action = key.split('|', 1)
+            stats = self.actions[key]
+            rows.append({
+                'symbol': symbol,
+                'action': action,
+                'count': stats['count'],
+                'volume': stats['volume'],
+                'avg_price': stats['price_sum'] / stats['count'] if stats['count'] else 0.0,
+                'vwap': stats['notional'] / stats['volume'] if stats['volume'] else 0.0,
+                'realized_pnl': self.positions.get(symbol, {}).get('realized_pnl', 0.0),
+            })
+        return rows
+
+    def rebuild(self, trades: pd.DataFrame):
+        """Reset and fold a full trade history, oldest first."""
+        self.actions, self.positions, self.last_timestamp = {}, {}, None
+        self.apply(trades)
+
+    def apply(self, trades: pd.DataFrame):
+        """Fold a DataFrame of trades, skipping incomplete rows."""
+        trades = trades.dropna(subset=['action', 'symbol', 'quantity', 'price'])
+        for row in trades.itertuples(index=False):
+            self.update(row.action, row.symbol, row.quantity, row.price, row.timestamp)
+
+    def save(self):
+        """Atomically write the JSON snapshot, if a path is configured."""
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({
+                'actions': self.actions,
+                'positions': self.positions,
+                'last_timestamp': self.last_timestamp,
+            }, file)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """
+        Load the JSON snapshot.
+
+        Returns:
+        - True when a snapshot was loaded.
+        """
+        if self.path is None or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r') as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable trade aggregates {self.path}: {e}")
+            return False
+        self.actions = snapshot['actions']
+        self.positions = snapshot['positions']
+        self.last_timestamp = snapshot['last_timestamp']
+        return True
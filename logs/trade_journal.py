@@ -0,0 +1,297 @@
+import os
+import csv
+import glob
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from logs.trade_aggregates import TradeAggregates
+
+COLUMNS = ['action', 'symbol', 'quantity', 'price', 'balance', 'timestamp']
+NUMERIC_COLUMNS = ['quantity', 'price', 'balance']
+
+class TradeJournal:
+    """
+    Append-only CSV trade journal.
+
+    Each trade is one line appended to the active file, so writing a trade
+    costs the same no matter how long the history is. Writes are flushed
+    immediately and fsynced in batches. The active file is rotated into
+    journal/ when it grows past max_bytes or a new day starts, and rotated
+    segments are compacted into monthly columnar .npz archives by a
+    background thread, so the append that rotates never waits for it.
+
+    When given TradeAggregates, every appended trade is also folded into
+    them and their snapshot is saved together with each fsync.
+    """
+
+    def __init__(self, path: str = 'logs/reports/trading_log.csv', max_bytes: int = 16 * 1024 * 1024,
+                 fsync_every: int = 32, fsync_interval: float = 1.0, compact_on_rotate: bool = True,
+                 aggregates: TradeAggregates = None):
+        """
+        Parameters:
+        - path: Active journal file.
+        - max_bytes: Size that triggers a rotation.
+        - fsync_every: Trades written between fsync calls.
+        - fsync_interval: Maximum seconds between fsync calls.
+        - compact_on_rotate: Compact rotated segments into archives in the background after each rotation.
+        - aggregates: Optional running statistics kept in step with the journal.
+        """
+        self.path = path
+        directory = os.path.dirname(path) or '.'
+        self.segment_dir = os.path.join(directory, 'journal')
+        self.archive_dir = os.path.join(directory, 'archive')
+        self.max_bytes = max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_on_rotate = compact_on_rotate
+        self._lock = threading.Lock()
+        # Held while archives and segments change, so reads never see a trade twice or not at all
+        self._compact_lock = threading.Lock()
+        self._compactor = None
+        self._compact_requested = False
+        self._compact_state = threading.Lock()
+        self._file = None
+        self._writer = None
+        self._day = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self.aggregates = aggregates
+        self._aggregates_ready = aggregates is None
+
+    def _ensure_aggregates(self):
+        if self._aggregates_ready:
+            return
+        if self.aggregates.load():
+            # Replay trades journaled after the snapshot was taken
+            if os.path.exists(self.path):
+                active = _read_csv(self.path)
+                if self.aggregates.last_timestamp is not None:
+                    active = active[active['timestamp'] > pd.Timestamp(self.aggregates.last_timestamp)]
+                self.aggregates.apply(active)
+        else:
+            logging.info("Rebuilding trade aggregates from the journal.")
+            self.aggregates.rebuild(self._read_all())
+        self.aggregates.save()
+        self._aggregates_ready = True
+
+    def stats(self):
+        """Return the running TradeAggregates, loading or rebuilding them on first use."""
+        with self._lock:
+            self._ensure_aggregates()
+            return self.aggregates
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+        if is_new:
+            self._writer.writerow(COLUMNS)
+            self._day = None
+        else:
+            self._day = self._first_day()
+
+    def _first_day(self):
+        with open(self.path, newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                if len(row) == len(COLUMNS) and row[-1]:
+                    return row[-1][:10]
+        return None
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self.aggregates is not None and self._aggregates_ready:
+            self.aggregates.save()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _rotate(self):
+        self._sync()
+        self._file.close()
+        self._file = None
+        os.makedirs(self.segment_dir, exist_ok=True)
+        segment = os.path.join(self.segment_dir, f"trading_log-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.csv")
+        os.replace(self.path, segment)
+        logging.info(f"Trade journal rotated to {segment}.")
+        if self.compact_on_rotate:
+            self._compact_in_background()
+        self._open()
+
+    def _compact_in_background(self):
+        with self._compact_state:
+            self._compact_requested = True
+            if self._compactor is None:
+                self._compactor = threading.Thread(target=self._compact_loop, name='journal-compact', daemon=True)
+                self._compactor.start()
+
+    def _compact_loop(self):
+        # Rotations during a compaction request one more pass instead of a second thread
+        while True:
+            with self._compact_state:
+                if not self._compact_requested:
+                    self._compactor = None
+                    return
+                self._compact_requested = False
+            try:
+                self.compact()
+            except Exception as e:
+                logging.error(f"Trade journal compaction failed: {e}")
+
+    def append(self, action, symbol, quantity, price, balance, timestamp=None):
+        """
+        Append one trade to the journal.
+
+        Parameters:
+        - action: 'BUY' or 'SELL'.
+        - symbol: Trading pair (e.g., BTCUSDT).
+        - quantity: Quantity traded.
+        - price: Price of the trade.
+        - balance: Current balance after the trade.
+        - timestamp: Optional datetime of the trade (defaults to now).
+        """
+        timestamp = timestamp or datetime.now()
+        stamp = timestamp.isoformat(sep=' ', timespec='microseconds')
+        with self._lock:
+            self._ensure_aggregates()
+            if self._file is None:
+                self._open()
+            day = stamp[:10]
+            if self._day is not None and (day != self._day or self._file.tell() >= self.max_bytes):
+                self._rotate()
+            if self._day is None:
+                self._day = day
+            self._writer.writerow([action, symbol, quantity, price, balance, stamp])
+            self._file.flush()
+            if self.aggregates is not None:
+                self.aggregates.update(action, symbol, quantity, price, stamp)
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def close(self):
+        """Fsync and close the active file, then wait for a running compaction."""
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+        with self._compact_state:
+            compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def segments(self):
+        """Return rotated, not yet compacted segment files, oldest first."""
+        return sorted(glob.glob(os.path.join(self.segment_dir, 'trading_log-*.csv')))
+
+    def archives(self):
+        """Return monthly archive files, oldest first."""
+        return sorted(glob.glob(os.path.join(self.archive_dir, 'trades-*.npz')))
+
+    def compact(self):
+        """
+        Merge rotated segments into monthly columnar archives and delete them.
+
+        A segment with a timestamp that does not parse is left in place (and
+        still read by read()), since the archives are partitioned by month.
+
+        Returns:
+        - Number of trades compacted.
+        """
+        with self._compact_lock:
+            return self._compact()
+
+    def _compact(self):
+        segments, frames = [], []
+        for segment in self.segments():
+            frame = _read_csv(segment)
+            if frame['timestamp'].isna().any():
+                logging.warning(f"Keeping {segment}: {int(frame['timestamp'].isna().sum())} trades have "
+                                f"unparseable timestamps.")
+                continue
+            segments.append(segment)
+            frames.append(frame)
+        if not segments:
+            return 0
+        trades = pd.concat(frames, ignore_index=True)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        months = trades['timestamp'].dt.strftime('%Y-%m')
+        for month in months.unique():
+            batch = trades[months == month]
+            path = os.path.join(self.archive_dir, f"trades-{month}.npz")
+            if os.path.exists(path):
+                batch = pd.concat([_read_archive(path), batch], ignore_index=True)
+            _write_archive(path, batch)
+        for segment in segments:
+            os.remove(segment)
+        logging.info(f"Compacted {len(trades)} trades from {len(segments)} segments.")
+        return len(trades)
+
+    def read(self):
+        """
+        Read every trade: archives, then rotated segments, then the active file.
+
+        Returns:
+        - DataFrame with the journal columns and a parsed 'timestamp'.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            return self._read_all()
+
+    def _read_all(self):
+        with self._compact_lock:
+            return self._read_files()
+
+    def _read_files(self):
+        frames = [_read_archive(path) for path in self.archives()]
+        frames += [_read_csv(path) for path in self.segments()]
+        if os.path.exists(self.path):
+            frames.append(_read_csv(self.path))
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+def _read_csv(path: str):
+    try:
+        frame = pd.read_csv(path)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(columns=COLUMNS)
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'], format='ISO8601', errors='coerce')
+    return frame
+
+def _read_archive(path: str):
+    with np.load(path) as archive:
+        return pd.DataFrame({column: archive[column] for column in COLUMNS})
+
+def _write_archive(path: str, trades: pd.DataFrame):
+    arrays = {
+        'action': trades['action'].to_numpy(dtype=str),
+        'symbol': trades['symbol'].to_numpy(dtype=str),
+        'timestamp': trades['timestamp'].to_numpy(dtype='datetime64[us]'),
+    }
+    for column in NUMERIC_COLUMNS:
+        arrays[column] = trades[column].to_numpy(dtype=np.float64)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+def main(argv=None):
+    """Command-line entry point: python -m logs.trade_journal compact"""
+    parser = argparse.ArgumentParser(description="Trade journal maintenance.")
+    parser.add_argument('command', choices=['compact'])
+    parser.add_argument('--path', default='logs/reports/trading_log.csv')
+    args = parser.parse_args(argv)
+    if args.command == 'compact':
+        print(f"Compacted {TradeJournal(args.path).compact()} trades.")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,25 @@
 import os
+import atexit
+import logging
+import threading
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from logs.trade_journal import TradeJournal
+from logs.trade_aggregates import TradeAggregates
 
 # Ensure the reports directory exists
 if not os.path.exists('logs/reports'):
     os.makedirs('logs/reports')
 
+# Append-only journal backing log_trade and generate_report
+journal = TradeJournal('logs/reports/trading_log.csv',
+                       aggregates=TradeAggregates('logs/reports/trade_aggregates.json'))
+atexit.register(journal.close)
+
 def log_trade(action, symbol, quantity, price, balance):
     """
-    Logs a trade to a CSV file.
+    Logs a trade to the append-only trade journal.
 
     Parameters:
     - action: 'BUY' or 'SELL'.
@@ -17,81 +28,127 @@ def log_trade(action, symbol, quantity, price, balance):
     - price: Price of the trade.
     - balance: Current balance after the trade.
     """
-    log_file = 'logs/reports/trading_log.csv'
-    columns = ['action', 'symbol', 'quantity', 'price', 'balance', 'timestamp']
-
-    # Create log file if it doesn't exist
-    if not os.path.exists(log_file):
-        df = pd.DataFrame(columns=columns)
-        df.to_csv(log_file, index=False)
-
-    # Load existing data
-    try:
-        df = pd.read_csv(log_file)
-    except pd.errors.EmptyDataError:
-        df = pd.DataFrame(columns=columns)
-
-    # Append trade to log
-    new_entry = pd.DataFrame({
-        'action': [action],
-        'symbol': [symbol],
-        'quantity': [quantity],
-        'price': [price],
-        'balance': [balance],
-        'timestamp': [pd.Timestamp.now()]
-    })
-    df = pd.concat([df, new_entry], ignore_index=True)
-    df.to_csv(log_file, index=False)
-
-def generate_report():
+    journal.append(action, symbol, quantity, price, balance)
+
+class ChartRenderer:
+    """
+    Renders the balance chart on a background thread with the Agg backend.
+
+    Requests made while a render is running are coalesced into one more
+    render, so callers never wait on matplotlib.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = False
+        self._thread = None
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def request(self):
+        """Schedule a render and return immediately."""
+        with self._lock:
+            self._pending = True
+            self._idle.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='chart-renderer', daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout: float = None):
+        """Block until no render is pending; returns False on timeout."""
+        return self._idle.wait(timeout)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    self._idle.set()
+                    return
+                self._pending = False
+            try:
+                render_balance_chart(self.path)
+            except Exception as e:
+                logging.error(f"Failed to render balance chart: {e}")
+
+def render_balance_chart(path: str):
+    """
+    Plot the balance over time from the trade journal and save it as an image.
+
+    Parameters:
+    - path: Output image path.
+    """
+    df = journal.read().dropna(subset=['timestamp', 'balance'])
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.plot(pd.to_datetime(df['timestamp']), df['balance'], marker='o', label='Balance')
+    axes.set_title('Account Balance Over Time')
+    axes.set_xlabel('Time')
+    axes.set_ylabel('Balance')
+    axes.legend()
+    axes.grid()
+    figure.tight_layout()
+    figure.savefig(path)
+    logging.info(f"Balance chart saved at: {path}")
+
+chart_renderer = ChartRenderer('logs/reports/balance_chart.png')
+# Let a pending render finish before a short-lived process exits
+atexit.register(chart_renderer.wait, 30)
+
+def generate_report(wait: bool = False):
     """
     Generate a trading report with statistics and a balance chart.
+
+    Statistics come from the running aggregates kept by the trade journal,
+    and the chart is rendered in the background.
+
+    Parameters:
+    - wait: Block until the chart has been written.
     """
-    log_file = 'logs/reports/trading_log.csv'
-    if not os.path.exists(log_file):
+    if not os.path.exists(journal.path) and not journal.segments() and not journal.archives():
         print("No trading log found to generate a report.")
         return
 
-    df = pd.read_csv(log_file)
+    stats = journal.stats()
+    totals = stats.totals()
 
-    # Handle empty or all-NA datasets
-    if df.empty or df.isna().all().all():
+    # Handle empty datasets
+    if totals['count'] == 0:
         print("No valid data in the trading log to generate a report.")
         return
 
     # Summary statistics
-    total_trades = len(df)
-    total_buys = len(df[df['action'] == 'BUY'])
-    total_sells = len(df[df['action'] == 'SELL'])
-    avg_buy_price = df[df['action'] == 'BUY']['price'].mean() if total_buys > 0 else 0
-    avg_sell_price = df[df['action'] == 'SELL']['price'].mean() if total_sells > 0 else 0
+    buys = stats.totals('BUY')
+    sells = stats.totals('SELL')
+    avg_buy_price = buys['price_sum'] / buys['count'] if buys['count'] > 0 else 0
+    avg_sell_price = sells['price_sum'] / sells['count'] if sells['count'] > 0 else 0
 
     print("Trading Report")
     print("===============")
-    print(f"Total Trades: {total_trades}")
-    print(f"Total Buys: {total_buys}")
-    print(f"Total Sells: {total_sells}")
+    print(f"Total Trades: {totals['count']}")
+    print(f"Total Buys: {buys['count']}")
+    print(f"Total Sells: {sells['count']}")
     print(f"Average Buy Price: {avg_buy_price:.2f}")
     print(f"Average Sell Price: {avg_sell_price:.2f}")
 
+    print("\nPer Symbol")
+    print("===============")
+    for row in stats.per_symbol():
+        print(f"{row['symbol']} {row['action']}: {row['count']} trades, volume {row['volume']:.6f}, "
+              f"VWAP {row['vwap']:.2f}, realized PnL {row['realized_pnl']:.2f}")
+
     # Plot balance over time
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    plt.figure(figsize=(10, 6))
-    plt.plot(df['timestamp'], df['balance'], marker='o', label='Balance')
-    plt.title('Account Balance Over Time')
-    plt.xlabel('Time')
-    plt.ylabel('Balance')
-    plt.legend()
-    plt.grid()
-    plt.tight_layout()
-    balance_chart_path = 'logs/reports/balance_chart.png'
-    plt.savefig(balance_chart_path)
-    plt.show()
-
-    print(f"Balance chart saved at: {balance_chart_path}")
+    chart_renderer.request()
+    if wait:
+        chart_renderer.wait()
+        print(f"Balance chart saved at: {chart_renderer.path}")
+    else:
+        print(f"Balance chart rendering in background: {chart_renderer.path}")
 
 # Example usage
 if __name__ == "__main__":
     log_trade('BUY', 'BTCUSDT', 0.01, 45000, 10000)
     log_trade('SELL', 'BTCUSDT', 0.005, 48000, 10500)
-    generate_report()
+    generate_report(wait=True)
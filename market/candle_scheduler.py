@@ -0,0 +1,183 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from logs.metrics import LatencyHistogram
+from market.kline_stream import interval_to_millis
+from market.resampler import bucket_open
+
+OVERRUN_POLICIES = ('skip', 'coalesce')
+
+def last_close(now_ms: int, interval_ms: int):
+    """Return the most recent candle boundary (epoch ms) at or before now_ms; weekly candles close on Monday."""
+    return bucket_open(now_ms, interval_ms)
+
+class CandleScheduler:
+    """
+    Run jobs right after their kline interval closes.
+
+    Each job has an interval; the scheduler sleeps until the next candle
+    boundary of any job plus `offset` seconds (giving the exchange time to
+    publish the closed candle), then runs every job whose interval just
+    closed on a thread pool. Jobs of other intervals are left alone.
+
+    A job still running when its next close arrives is an overrun. With the
+    'skip' policy that close is dropped; with 'coalesce' one catch-up run is
+    queued for when the current run finishes, however many closes it missed.
+    Either way runs of one job never stack. Closes missed because the
+    process itself woke late (suspend, clock jump) collapse into one run.
+    """
+
+    def __init__(self, offset: float = 1.0, overrun: str = 'skip', max_workers: int = 4, clock=time.time):
+        """
+        Parameters:
+        - offset: Seconds after the candle close to run jobs.
+        - overrun: 'skip' or 'coalesce' (see the class docstring).
+        - max_workers: Jobs running at the same time.
+        - clock: Wall-clock function returning epoch seconds.
+        """
+        if overrun not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {overrun}")
+        self.offset = offset
+        self.overrun = overrun
+        self.clock = clock
+        self.jobs = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='candle-job')
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def add_job(self, name: str, interval: str, function):
+        """
+        Register function(close_ms) to run after every close of interval.
+
+        Parameters:
+        - name: Unique job name used in logs and stats.
+        - interval: Kline interval (e.g., 1m, 15m, 1h).
+        - function: Callable receiving the close time (epoch ms) of the candle that just closed.
+
+        Raises:
+        - ValueError when a job with the same name is already registered.
+        """
+        if name in self.jobs:
+            raise ValueError(f"Duplicate job name: {name}")
+        interval_ms = interval_to_millis(interval)
+        self.jobs[name] = {
+            'interval': interval,
+            'interval_ms': interval_ms,
+            'function': function,
+            'last_close': last_close(self._now_ms(), interval_ms),
+            'running': False,
+            'pending': None,
+            'runs': 0,
+            'failures': 0,
+            'overruns': 0,
+            'skipped': 0,
+            'coalesced': 0,
+            'missed': 0,
+            'duration': LatencyHistogram(),
+            'delay': LatencyHistogram(),
+        }
+
+    def _now_ms(self):
+        return int(self.clock() * 1000)
+
+    def next_wakeup(self):
+        """Return the epoch seconds of the next candle close of any job plus the offset."""
+        closes = [job['last_close'] + job['interval_ms'] for job in self.jobs.values()]
+        return min(closes) / 1000 + self.offset
+
+    def tick(self):
+        """
+        Dispatch every job whose interval closed since its last run.
+
+        Returns:
+        - List of job names started by this call.
+        """
+        now_ms = self._now_ms()
+        started = []
+        with self._lock:
+            for name, job in self.jobs.items():
+                close_ms = last_close(now_ms - int(self.offset * 1000), job['interval_ms'])
+                if close_ms <= job['last_close']:
+                    continue
+                missed = (close_ms - job['last_close']) // job['interval_ms'] - 1
+                if missed > 0:
+                    job['missed'] += missed
+                    logging.warning(f"Job {name} woke {missed} close(s) late; running once for the latest.")
+                job['last_close'] = close_ms
+                if job['running']:
+                    job['overruns'] += 1
+                    if self.overrun == 'coalesce':
+                        if job['pending'] is not None:
+                            job['coalesced'] += 1
+                        job['pending'] = close_ms
+                        logging.warning(f"Job {name} overran its {job['interval']} interval; "
+                                        f"catch-up run queued.")
+                    else:
+                        job['skipped'] += 1
+                        logging.warning(f"Job {name} overran its {job['interval']} interval; "
+                                        f"skipping close {close_ms}.")
+                    continue
+                self._start(name, job, close_ms)
+                started.append(name)
+        return started
+
+    def _start(self, name: str, job: dict, close_ms: int):
+        if self._stop.is_set():
+            return
+        job['running'] = True
+        self._executor.submit(self._run_job, name, job, close_ms)
+
+    def _run_job(self, name: str, job: dict, close_ms: int):
+        job['delay'].record(max(self._now_ms() - close_ms, 0))
+        start = time.perf_counter()
+        try:
+            job['function'](close_ms)
+        except Exception as e:
+            job['failures'] += 1
+            logging.error(f"Scheduled job {name} failed: {e}")
+        finally:
+            with self._lock:
+                job['runs'] += 1
+                job['duration'].record((time.perf_counter() - start) * 1000)
+                pending, job['pending'] = job['pending'], None
+                if pending is not None and not self._stop.is_set():
+                    self._start(name, job, pending)
+                else:
+                    job['running'] = False
+
+    def run(self):
+        """Sleep until each close and dispatch due jobs until stop() is called."""
+        if not self.jobs:
+            raise ValueError("No jobs scheduled.")
+        logging.info(f"Candle scheduler started with jobs {list(self.jobs)} "
+                     f"(offset {self.offset}s, overrun policy {self.overrun}).")
+        while not self._stop.is_set():
+            delay = self.next_wakeup() - self.clock()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            self.tick()
+
+    def stop(self, wait: bool = True):
+        """Stop dispatching and optionally wait for running jobs."""
+        with self._lock:
+            self._stop.set()
+        self._executor.shutdown(wait=wait)
+
+    def stats(self):
+        """Return runs, failures, overruns and duration/delay percentiles per job."""
+        with self._lock:
+            return {
+                name: {
+                    'interval': job['interval'],
+                    'runs': job['runs'],
+                    'failures': job['failures'],
+                    'overruns': job['overruns'],
+                    'skipped': job['skipped'],
+                    'coalesced': job['coalesced'],
+                    'missed': job['missed'],
+                    'duration': job['duration'].summary(),
+                    'delay': job['delay'].summary(),
+                }
+                for name, job in self.jobs.items()
+            }
@@ -0,0 +1,225 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+KLINE_COLUMNS = [
+    'open_time', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+]
+
+# Largest page Binance returns for a single get_klines call
+MAX_KLINES_PER_REQUEST = 1000
+
+# Typed fields of a REST kline: position in the raw list and dtype ('ignore' is dropped)
+KLINE_FIELDS = {
+    'open_time': (0, np.int64),
+    'open': (1, np.float64),
+    'high': (2, np.float64),
+    'low': (3, np.float64),
+    'close': (4, np.float64),
+    'volume': (5, np.float64),
+    'close_time': (6, np.int64),
+    'quote_asset_volume': (7, np.float64),
+    'number_of_trades': (8, np.int64),
+    'taker_buy_base_asset_volume': (9, np.float64),
+    'taker_buy_quote_asset_volume': (10, np.float64),
+}
+
+# Fields kept by the kline cache and returned when no columns are requested
+CACHED_FIELDS = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time']
+
+def parse_klines(klines: list, columns: list = None, price_dtype=np.float64):
+    """
+    Parse raw REST klines straight into typed column arrays.
+
+    Only the requested columns are converted, each with one pass over the
+    rows and no intermediate DataFrame of strings.
+
+    Parameters:
+    - klines: List of kline lists as returned by client.get_klines.
+    - columns: Fields to keep (default: CACHED_FIELDS).
+    - price_dtype: dtype of the float fields (np.float64 or np.float32); times stay int64.
+
+    Returns:
+    - Dictionary {field: ndarray}.
+    """
+    count = len(klines)
+    arrays = {}
+    for field in columns or CACHED_FIELDS:
+        index, dtype = KLINE_FIELDS[field]
+        arrays[field] = np.fromiter((kline[index] for kline in klines), dtype=dtype, count=count)
+        if dtype is np.float64 and price_dtype is not np.float64:
+            arrays[field] = arrays[field].astype(price_dtype)
+    return arrays
+
+def klines_to_frame(klines: list, columns: list = None, price_dtype=np.float64):
+    """
+    Convert raw REST klines into a compact typed DataFrame.
+
+    Parameters:
+    - klines: List of kline lists as returned by client.get_klines.
+    - columns: Fields to keep (default: CACHED_FIELDS).
+    - price_dtype: dtype of the float fields.
+
+    Returns:
+    - DataFrame containing historical data.
+    """
+    return pd.DataFrame(parse_klines(klines, columns, price_dtype), copy=False)
+
+class KlineCache:
+    """
+    In-process cache of kline windows keyed by (symbol, interval).
+
+    Windows are kept as typed arrays (CACHED_FIELDS) rather than raw kline
+    lists. The first request for a key loads a full window; later requests only
+    fetch candles from the last cached open time onwards (which refreshes the
+    still-forming candle) and splice them in. Requests arriving within
+    max_age seconds of the previous refresh are served without any request.
+    At most max_entries windows are kept, evicting the least recently used.
+    """
+
+    def __init__(self, max_entries: int = 512, max_age: float = 5.0):
+        """
+        Parameters:
+        - max_entries: Maximum number of (symbol, interval) windows kept.
+        - max_age: Seconds a window is served without refreshing it.
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.stats = {'hits': 0, 'delta_fetches': 0, 'misses': 0, 'evictions': 0}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _count(self, name: str):
+        # Requests for different keys run concurrently, so counters are shared state
+        with self._lock:
+            self.stats[name] += 1
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._windows[key] = entry
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_entries:
+                evicted, _ = self._windows.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+                self.stats['evictions'] += 1
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is not None:
+                self._windows.move_to_end(key)
+            return entry
+
+    def get_window(self, client, symbol: str, interval: str, limit: int):
+        """
+        Return the latest `limit` klines (including the forming candle).
+
+        Parameters:
+        - client: Binance Client object.
+        - symbol: Trading pair (e.g., BTCUSDT).
+        - interval: Kline interval (e.g., 1h, 4h, 1d).
+        - limit: Number of candles wanted.
+
+        Returns:
+        - Dictionary {field: ndarray} of CACHED_FIELDS, oldest first. The
+          arrays are read-only views into the cache.
+        """
+        key = (symbol, interval)
+        with self._key_lock(key):
+            entry = self._lookup(key)
+            now = time.monotonic()
+            if entry is not None and len(entry['arrays']['open_time']) >= limit:
+                if now - entry['refreshed'] < self.max_age:
+                    self._count('hits')
+                    return _tail(entry['arrays'], limit)
+                arrays = entry['arrays']
+                delta = client.get_klines(symbol=symbol, interval=interval,
+                                          startTime=int(arrays['open_time'][-1]), limit=MAX_KLINES_PER_REQUEST)
+                if len(delta) < MAX_KLINES_PER_REQUEST:
+                    self._count('delta_fetches')
+                    if delta:
+                        new = parse_klines(delta)
+                        # Replace cached rows from the first returned open time (the refreshed forming candle)
+                        keep = int(np.searchsorted(arrays['open_time'], new['open_time'][0]))
+                        entry['arrays'] = _freeze({
+                            field: np.concatenate([arrays[field][:keep], new[field]])[-entry['size']:]
+                            for field in CACHED_FIELDS
+                        })
+                    entry['refreshed'] = now
+                    self._store(key, entry)
+                    return _tail(entry['arrays'], limit)
+                logging.info(f"Kline gap for {symbol} {interval} exceeds one page; reloading window.")
+
+            self._count('misses')
+            size = max(limit, entry['size'] if entry is not None else 0)
+            arrays = _freeze(parse_klines(client.get_klines(symbol=symbol, interval=interval, limit=size)))
+            self._store(key, {'arrays': arrays, 'size': size, 'refreshed': now})
+            return _tail(arrays, limit)
+
+    def nbytes(self):
+        """Return the bytes held by every cached window."""
+        with self._lock:
+            return sum(array.nbytes for entry in self._windows.values() for array in entry['arrays'].values())
+
+    def clear(self):
+        """Drop every cached window."""
+        with self._lock:
+            self._windows.clear()
+            self._key_locks.clear()
+
+    def counters(self):
+        """Return hit/miss counters and the number of cached windows."""
+        with self._lock:
+            total = self.stats['hits'] + self.stats['delta_fetches'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._windows),
+                'hit_rate': (self.stats['hits'] + self.stats['delta_fetches']) / total if total else 0.0,
+            }
+
+def _freeze(arrays: dict):
+    for array in arrays.values():
+        array.flags.writeable = False
+    return arrays
+
+def _tail(arrays: dict, limit: int):
+    return {field: array[-limit:] for field, array in arrays.items()}
+
+# Cache shared by every strategy in the process
+kline_cache = KlineCache()
+
+def fetch_historical_data(client, symbol: str, interval: str, limit: int, columns: list = None,
+                          price_dtype=np.float64):
+    """
+    Fetch historical candlestick data from Binance through the shared kline cache.
+
+    Parameters:
+    - client: Binance Client object.
+    - symbol: Trading pair (e.g., BTCUSDT).
+    - interval: Kline interval (e.g., 1h, 4h, 1d).
+    - limit: Number of candles to fetch.
+    - columns: Fields to return (default: CACHED_FIELDS).
+    - price_dtype: dtype of the float fields (np.float64 or np.float32).
+
+    Returns:
+    - DataFrame containing historical data.
+    """
+    try:
+        window = kline_cache.get_window(client, symbol, interval, limit)
+        return pd.DataFrame({
+            field: window[field] if window[field].dtype.kind == 'i' else window[field].astype(price_dtype)
+            for field in columns or CACHED_FIELDS
+        })
+    except Exception as e:
+        logging.error(f"Failed to fetch historical data: {e}")
+        raise
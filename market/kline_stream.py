@@ -0,0 +1,242 @@
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+import numpy as np
+import pandas as pd
+import websockets
+
+DEFAULT_STREAM_URL = 'wss://stream.binance.com:9443'
+KLINE_COLUMNS = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time']
+
+# Milliseconds per unit of a Binance interval string (1s, 1m, 1h, 1d, 1w)
+INTERVAL_UNITS = {'s': 1000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+# Klines per get_klines page when backfilling after a reconnect
+MAX_BACKFILL_PAGE = 1000
+
+def interval_to_millis(interval: str):
+    """Convert a kline interval such as '15m' or '4h' to milliseconds."""
+    try:
+        return int(interval[:-1]) * INTERVAL_UNITS[interval[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Unsupported kline interval: {interval}")
+
+def server_time_ms(client):
+    """Exchange time in epoch ms, so forming candles are recognized against a replay clock too."""
+    return int(client.get_server_time()['serverTime'])
+
+def rest_kline_to_row(kline: list):
+    """Convert a REST kline list into a typed candle dictionary."""
+    return {
+        'open_time': int(kline[0]),
+        'open': float(kline[1]),
+        'high': float(kline[2]),
+        'low': float(kline[3]),
+        'close': float(kline[4]),
+        'volume': float(kline[5]),
+        'close_time': int(kline[6]),
+    }
+
+def stream_kline_to_row(kline: dict):
+    """Convert the 'k' payload of a kline stream event into a typed candle dictionary."""
+    return {
+        'open_time': int(kline['t']),
+        'open': float(kline['o']),
+        'high': float(kline['h']),
+        'low': float(kline['l']),
+        'close': float(kline['c']),
+        'volume': float(kline['v']),
+        'close_time': int(kline['T']),
+    }
+
+class KlineStream:
+    """
+    Combined kline WebSocket stream that fires a callback when a candle closes.
+
+    Each symbol keeps a rolling window of its last `limit` closed candles,
+    seeded once over REST. After a reconnect any missed candles are
+    backfilled over REST (paging through long outages) before the stream
+    resumes, one candle at a time, so the callback sees every closed candle
+    exactly once and in order, each with the window ending at that candle.
+    With a resampler, higher timeframes are derived from this one feed
+    instead of separate streams.
+    """
+
+    def __init__(self, client, symbols: list, interval: str, limit: int, on_close,
+                 stream_url: str = DEFAULT_STREAM_URL, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 60.0, resampler=None, on_resampled=None):
+        """
+        Parameters:
+        - client: Binance Client object used for seeding and gap backfill (may be None).
+        - symbols: Trading pairs to subscribe to.
+        - interval: Kline interval (e.g., 1m, 1h).
+        - limit: Number of closed candles kept per symbol.
+        - on_close: Callable(symbol, data) run in a worker thread for every closed candle.
+        - stream_url: Base WebSocket URL; point it at a local replay server for tests.
+        - reconnect_delay: Initial reconnect backoff in seconds.
+        - max_reconnect_delay: Upper bound for the reconnect backoff.
+        - resampler: Optional TimeframeResampler deriving higher intervals from this feed.
+        - on_resampled: Callable(symbol, interval, data) run when a derived candle closes.
+        """
+        self.client = client
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.interval = interval
+        self.limit = limit
+        self.on_close = on_close
+        self.stream_url = stream_url.rstrip('/')
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.resampler = resampler
+        self.on_resampled = on_resampled
+        self.candles = {symbol: deque(maxlen=limit) for symbol in self.symbols}
+        # (symbol, close-to-decision ms, receive-to-decision ms) per fired candle
+        self.latencies = deque(maxlen=10000)
+        self._running = False
+
+    @property
+    def url(self):
+        streams = '/'.join(f"{symbol.lower()}@kline_{self.interval}" for symbol in self.symbols)
+        return f"{self.stream_url}/stream?streams={streams}"
+
+    def seed(self):
+        """Load the last `limit` closed candles of every symbol over REST."""
+        if self.client is None:
+            return
+        for symbol in self.symbols:
+            self._backfill(symbol)
+            if self.resampler is not None:
+                self.resampler.seed(self.client, symbol, server_time_ms(self.client))
+
+    def _backfill(self, symbol: str):
+        window = self.candles[symbol]
+        now_ms = server_time_ms(self.client)
+        if not window:
+            rows = self.client.get_klines(symbol=symbol, interval=self.interval, limit=self.limit + 1)
+            window.extend([row for row in map(rest_kline_to_row, rows) if row['close_time'] < now_ms][-self.limit:])
+            return []
+        # Page from the last candle in the window up to the forming one, however long the outage was
+        missed = []
+        start = window[-1]['open_time'] + 1
+        while True:
+            rows = [rest_kline_to_row(kline) for kline in self.client.get_klines(
+                symbol=symbol, interval=self.interval, startTime=start, limit=MAX_BACKFILL_PAGE)]
+            closed = [row for row in rows if row['close_time'] < now_ms]
+            missed += closed
+            if len(closed) < MAX_BACKFILL_PAGE:
+                break
+            start = closed[-1]['open_time'] + 1
+        if missed:
+            logging.info(f"Backfilled {len(missed)} candles for {symbol} after reconnect.")
+        return missed
+
+    def _append(self, symbol: str, row: dict):
+        window = self.candles[symbol]
+        if window and row['open_time'] <= window[-1]['open_time']:
+            return False
+        window.append(row)
+        return True
+
+    def frame(self, symbol: str):
+        """Return the closed-candle window of a symbol as a typed DataFrame."""
+        window = self.candles[symbol]
+        return pd.DataFrame({
+            column: np.fromiter((row[column] for row in window),
+                                dtype=np.int64 if column.endswith('_time') else np.float64, count=len(window))
+            for column in KLINE_COLUMNS
+        })
+
+    async def _fire(self, symbol: str, row: dict, received: float):
+        await asyncio.to_thread(self.on_close, symbol, self.frame(symbol))
+        if self.resampler is not None:
+            for interval in self.resampler.update(symbol, row):
+                if self.on_resampled is not None:
+                    await asyncio.to_thread(self.on_resampled, symbol, interval, self.resampler.frame(symbol, interval))
+        done = time.time()
+        self.latencies.append((symbol, done * 1000 - row['close_time'], (done - received) * 1000))
+
+    async def handle_message(self, message, received: float = None):
+        """
+        Process one raw combined-stream message.
+
+        Returns:
+        - The symbol whose candle closed, or None.
+        """
+        received = time.time() if received is None else received
+        payload = json.loads(message)
+        event = payload.get('data', payload)
+        if event.get('e') != 'kline':
+            return None
+        kline = event['k']
+        if not kline['x']:
+            return None
+        symbol = event['s'].upper()
+        if symbol not in self.candles:
+            return None
+        row = stream_kline_to_row(kline)
+        if not self._append(symbol, row):
+            return None
+        await self._fire(symbol, row, received)
+        return symbol
+
+    async def _resync(self):
+        if self.client is None:
+            return
+        for symbol in self.symbols:
+            if not self.candles[symbol]:
+                continue
+            # Append one candle at a time so each callback sees the window ending at its candle
+            for row in await asyncio.to_thread(self._backfill, symbol):
+                if self._append(symbol, row):
+                    await self._fire(symbol, row, time.time())
+
+    async def run(self):
+        """Connect, dispatch closed candles and reconnect with backoff until stop() is called."""
+        self._running = True
+        await asyncio.to_thread(self.seed)
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                async with websockets.connect(self.url, ping_interval=20) as websocket:
+                    logging.info(f"Connected to kline stream: {self.url}")
+                    await self._resync()
+                    delay = self.reconnect_delay
+                    async for message in websocket:
+                        await self.handle_message(message)
+                        if not self._running:
+                            break
+            except (OSError, websockets.ConnectionClosed, websockets.InvalidHandshake) as e:
+                logging.warning(f"Kline stream disconnected: {e}")
+            except Exception as e:
+                # e.g. a BinanceAPIException (429/418) during the backfill: back off and reconnect
+                logging.error(f"Kline stream error: {e}")
+            if not self._running:
+                break
+            logging.info(f"Reconnecting to kline stream in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def stop(self):
+        """Ask run() to return after the current message."""
+        self._running = False
+
+    def latency_summary(self):
+        """
+        Summarize candle-close-to-decision latency.
+
+        Returns:
+        - Dictionary with count, p50/p99/max close-to-decision ms and p50
+          receive-to-decision ms.
+        """
+        if not self.latencies:
+            return {'count': 0}
+        close_ms = np.array([sample[1] for sample in self.latencies])
+        receive_ms = np.array([sample[2] for sample in self.latencies])
+        return {
+            'count': len(close_ms),
+            'close_to_decision_p50_ms': float(np.percentile(close_ms, 50)),
+            'close_to_decision_p99_ms': float(np.percentile(close_ms, 99)),
+            'close_to_decision_max_ms': float(close_ms.max()),
+            'receive_to_decision_p50_ms': float(np.percentile(receive_ms, 50)),
+        }
@@ -0,0 +1,139 @@
+import time
+import logging
+import threading
+
+# Default REQUEST_WEIGHT limit per minute for the spot API
+DEFAULT_WEIGHT_LIMIT = 6000
+
+# Estimated request weight of the Client methods the bot uses; unknown calls count as 1
+ENDPOINT_WEIGHTS = {
+    'get_klines': 2,
+    'get_historical_klines': 2,
+    'get_account': 20,
+    'get_order': 4,
+    'get_open_orders': 6,
+    'get_all_orders': 20,
+    'get_exchange_info': 20,
+    'get_symbol_info': 20,
+    'get_ticker': 2,
+    'get_all_tickers': 4,
+    'get_orderbook_tickers': 4,
+    'create_order': 1,
+    'cancel_order': 1,
+    'stream_get_listen_key': 2,
+    'stream_keepalive': 2,
+}
+
+# Weight of calls that cost more when made without a symbol (all symbols at once)
+UNFILTERED_WEIGHTS = {
+    'get_open_orders': 80,
+    'get_ticker': 80,
+}
+
+USED_WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+
+class WeightBudget:
+    """
+    Client-side token bucket for Binance request weight.
+
+    Tokens refill continuously at limit/60 per second up to `limit`. After
+    every response the bucket is corrected from the used-weight header, so
+    weight spent by other processes sharing the same IP is accounted for.
+    """
+
+    def __init__(self, limit: int = DEFAULT_WEIGHT_LIMIT, safety: float = 0.9):
+        """
+        Parameters:
+        - limit: Exchange REQUEST_WEIGHT limit per minute.
+        - safety: Fraction of the limit the bot allows itself to use.
+        """
+        self.capacity = limit * safety
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight: int = 1):
+        """Block until `weight` tokens are available, then spend them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                wait = (weight - self.tokens) / self.rate
+            self.waited += wait
+            time.sleep(wait)
+
+    def update_from_headers(self, headers):
+        """Clamp the bucket to the weight the exchange reports as still unused."""
+        used = headers.get(USED_WEIGHT_HEADER) if headers is not None else None
+        if used is None:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, self.capacity - int(used))
+
+class RateLimitedClient:
+    """
+    Proxy around a Binance Client that spends request weight before each call.
+
+    Attribute access is forwarded to the wrapped client; callables are
+    wrapped so they acquire their estimated weight from the budget first and
+    sync the budget from the response headers afterwards. The client keeps
+    only its latest response, so each call's own response is captured with a
+    hook on the client's requests session; clients without one are called
+    one at a time so the response read belongs to the call.
+    """
+
+    def __init__(self, client, budget: WeightBudget):
+        self._client = client
+        self._budget = budget
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        hooks = getattr(getattr(client, 'session', None), 'hooks', None)
+        self._hooked = isinstance(hooks, dict)
+        if self._hooked:
+            hooks.setdefault('response', []).append(self._record_response)
+
+    def _record_response(self, response, *args, **kwargs):
+        # Session hooks run in the thread that made the request
+        self._local.response = response
+
+    def _call(self, attribute, args, kwargs):
+        if self._hooked:
+            self._local.response = None
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                self._sync(self._local.response)
+        with self._lock:
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                self._sync(getattr(self._client, 'response', None))
+
+    def _sync(self, response):
+        headers = getattr(response, 'headers', None)
+        if headers is not None:
+            try:
+                self._budget.update_from_headers(headers)
+            except (TypeError, ValueError) as e:
+                logging.debug(f"Ignoring used-weight header: {e}")
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+        weight = ENDPOINT_WEIGHTS.get(name, 1)
+
+        def call(*args, **kwargs):
+            self._budget.acquire(weight if 'symbol' in kwargs else UNFILTERED_WEIGHTS.get(name, weight))
+            return self._call(attribute, args, kwargs)
+        return call
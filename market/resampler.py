@@ -0,0 +1,209 @@
+import time
+import logging
+from collections import deque
+import numpy as np
+import pandas as pd
+from market.kline_stream import interval_to_millis, rest_kline_to_row, KLINE_COLUMNS
+
+# Binance weekly candles open on Monday 00:00 UTC; the epoch fell on a Thursday
+WEEK_ORIGIN_MS = 4 * 86_400_000
+
+# How each field of a higher-timeframe candle is built from its base candles
+AGGREGATIONS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum',
+    'quote_asset_volume': 'sum',
+    'number_of_trades': 'sum',
+    'taker_buy_base_asset_volume': 'sum',
+    'taker_buy_quote_asset_volume': 'sum',
+}
+
+def bucket_open(open_times, interval_ms: int):
+    """
+    Align open times to the open time of the candle of length interval_ms containing them.
+
+    Works on scalars and arrays; weekly candles are aligned to Monday like Binance's.
+    """
+    origin = WEEK_ORIGIN_MS if interval_ms % 604_800_000 == 0 else 0
+    return (open_times - origin) // interval_ms * interval_ms + origin
+
+def resample_klines(data: pd.DataFrame, interval: str, base_interval: str = None, drop_partial: bool = True):
+    """
+    Aggregate base-interval candles into a higher timeframe.
+
+    Open times are aligned like the exchange's own candles (open is the first
+    open, high the max, low the min, close the last close, volumes and trade
+    counts are summed), so the result matches what get_klines returns for
+    that interval over complete history.
+
+    Parameters:
+    - data: Candles sorted by open_time (any subset of the kline fields).
+    - interval: Target interval (e.g., 15m, 1h, 4h); a multiple of the base interval.
+    - base_interval: Interval of data; inferred from the smallest open_time step when omitted.
+    - drop_partial: Drop a trailing candle whose base candles have not all closed yet.
+
+    Returns:
+    - DataFrame of the resampled candles with open_time and close_time.
+    """
+    target_ms = interval_to_millis(interval)
+    open_time = data['open_time'].to_numpy(dtype=np.int64)
+    if base_interval is not None:
+        base_ms = interval_to_millis(base_interval)
+    else:
+        steps = np.diff(open_time)
+        base_ms = int(steps[steps > 0].min()) if (steps > 0).any() else target_ms
+    if target_ms % base_ms:
+        raise ValueError(f"Interval {interval} is not a multiple of the base interval ({base_ms} ms).")
+    if len(open_time) == 0:
+        return data.iloc[:0].reset_index(drop=True)
+
+    buckets = bucket_open(open_time, target_ms)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(open_time)] - 1
+    result = {'open_time': buckets[starts]}
+    for field, how in AGGREGATIONS.items():
+        if field not in data.columns:
+            continue
+        values = data[field].to_numpy()
+        if how == 'first':
+            result[field] = values[starts]
+        elif how == 'last':
+            result[field] = values[ends]
+        elif how == 'max':
+            result[field] = np.maximum.reduceat(values, starts)
+        elif how == 'min':
+            result[field] = np.minimum.reduceat(values, starts)
+        else:
+            result[field] = np.add.reduceat(values, starts)
+    result['close_time'] = result['open_time'] + target_ms - 1
+    resampled = pd.DataFrame(result)
+    if drop_partial and open_time[-1] + base_ms < resampled['open_time'].iloc[-1] + target_ms:
+        resampled = resampled.iloc[:-1]
+    return resampled
+
+class TimeframeResampler:
+    """
+    Derive higher-timeframe candles incrementally from one base-interval feed.
+
+    Every closed base candle of a symbol updates the forming candle of each
+    target interval; when a base candle completes a target candle (or a
+    later one arrives after a gap), that candle closes and is appended to a
+    rolling window of `limit` closed candles. Only the forming candle and
+    the closed windows are kept, so one base subscription per symbol serves
+    every timeframe.
+    """
+
+    def __init__(self, base_interval: str, intervals: list, limit: int):
+        """
+        Parameters:
+        - base_interval: Interval of the feed (e.g., 1m).
+        - intervals: Higher intervals to derive (e.g., ['15m', '1h', '4h']).
+        - limit: Closed candles kept per symbol and interval.
+        """
+        self.base_interval = base_interval
+        self.base_ms = interval_to_millis(base_interval)
+        self.intervals = {}
+        for interval in intervals:
+            interval_ms = interval_to_millis(interval)
+            if interval_ms % self.base_ms or interval_ms == self.base_ms:
+                raise ValueError(f"Interval {interval} is not a higher multiple of {base_interval}.")
+            self.intervals[interval] = interval_ms
+        self.limit = limit
+        self.closed = {}
+        self.forming = {}
+        self.last_open = {}
+
+    def _window(self, symbol: str, interval: str):
+        return self.closed.setdefault((symbol, interval), deque(maxlen=self.limit))
+
+    def _close(self, symbol: str, interval: str, candle: dict):
+        window = self._window(symbol, interval)
+        if window and candle['open_time'] <= window[-1]['open_time']:
+            return False
+        window.append(candle)
+        return True
+
+    def update(self, symbol: str, row: dict):
+        """
+        Feed one closed base candle.
+
+        Parameters:
+        - symbol: Trading pair.
+        - row: Candle dictionary with open_time, open, high, low, close, volume and close_time.
+
+        Returns:
+        - List of intervals whose candle this base candle closed.
+        """
+        closed = []
+        # Base candles replayed by a seed or reconnect backfill must not be counted twice
+        if row['open_time'] <= self.last_open.get(symbol, -1):
+            return closed
+        self.last_open[symbol] = row['open_time']
+        for interval, interval_ms in self.intervals.items():
+            key = (symbol, interval)
+            start = bucket_open(row['open_time'], interval_ms)
+            window = self._window(symbol, interval)
+            if window and start <= window[-1]['open_time']:
+                continue
+            candle = self.forming.get(key)
+            if candle is not None and candle['open_time'] != start:
+                # A gap skipped the rest of the forming candle; close it with what it has
+                if self._close(symbol, interval, candle):
+                    closed.append(interval)
+                candle = None
+            if candle is None:
+                candle = self.forming[key] = {
+                    'open_time': start, 'open': row['open'], 'high': row['high'], 'low': row['low'],
+                    'close': row['close'], 'volume': row['volume'], 'close_time': start + interval_ms - 1,
+                }
+            else:
+                candle['high'] = max(candle['high'], row['high'])
+                candle['low'] = min(candle['low'], row['low'])
+                candle['close'] = row['close']
+                candle['volume'] += row['volume']
+            if row['open_time'] + self.base_ms >= start + interval_ms:
+                del self.forming[key]
+                if self._close(symbol, interval, candle) and interval not in closed:
+                    closed.append(interval)
+        return closed
+
+    def seed(self, client, symbol: str, now_ms: int = None):
+        """
+        Load closed windows and rebuild the forming candles over REST.
+
+        Closed candles come from one get_klines call per interval (whose last
+        row is the forming candle); the forming candles are rebuilt from the
+        base candles since the oldest of them opened, so later base candles
+        extend them without double counting.
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        start = None
+        for interval in self.intervals:
+            rows = [rest_kline_to_row(kline) for kline in client.get_klines(symbol=symbol, interval=interval,
+                                                                            limit=self.limit + 1)]
+            if not rows:
+                continue
+            self._window(symbol, interval).extend(rows[:-1])
+            start = rows[-1]['open_time'] if start is None else min(start, rows[-1]['open_time'])
+        while start is not None:
+            klines = client.get_klines(symbol=symbol, interval=self.base_interval, startTime=start, limit=1000)
+            rows = [rest_kline_to_row(kline) for kline in klines]
+            for row in rows:
+                if row['close_time'] < now_ms:
+                    self.update(symbol, row)
+            if len(rows) < 1000:
+                break
+            start = rows[-1]['open_time'] + self.base_ms
+        logging.info(f"Seeded {list(self.intervals)} candles of {symbol} from the {self.base_interval} feed.")
+
+    def frame(self, symbol: str, interval: str):
+        """Return the closed-candle window of a symbol/interval as a typed DataFrame."""
+        window = self._window(symbol, interval)
+        return pd.DataFrame({
+            column: np.fromiter((row[column] for row in window),
+                                dtype=np.int64 if column.endswith('_time') else np.float64, count=len(window))
+            for column in KLINE_COLUMNS
+        })
@@ -0,0 +1,21 @@
+# Known quote assets, longest match first when splitting a symbol into base/quote
+QUOTE_ASSETS = [
+    'FDUSD', 'USDT', 'USDC', 'BUSD', 'TUSD', 'DAI', 'BTC', 'ETH', 'BNB',
+    'BRL', 'EUR', 'TRY', 'GBP', 'AUD', 'JPY', 'XRP', 'TRX', 'DOGE',
+]
+
+def split_symbol(symbol: str, quote_assets=QUOTE_ASSETS):
+    """
+    Split a trading pair (e.g., GALABRL) into (base, quote) by its quote suffix.
+
+    Parameters:
+    - symbol: Trading pair.
+    - quote_assets: Known quote assets.
+
+    Returns:
+    - Tuple (base, quote), or None when no known quote asset matches.
+    """
+    for quote in sorted(quote_assets, key=len, reverse=True):
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return None
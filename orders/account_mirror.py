@@ -0,0 +1,222 @@
+import json
+import time
+import asyncio
+import logging
+import threading
+import websockets
+from market.kline_stream import DEFAULT_STREAM_URL
+
+# Order states after which an order is no longer open
+FINAL_ORDER_STATES = {'FILLED', 'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH'}
+
+class AccountMirror:
+    """
+    In-memory mirror of account balances and open orders.
+
+    Seeded once from REST (get_account / get_open_orders) and kept current
+    from the user data stream: outboundAccountPosition and balanceUpdate
+    events update balances, executionReport events update open orders. The
+    listen key is kept alive periodically, and the mirror resyncs from REST
+    on every (re)connect and when the listen key expires, so no event gap
+    goes unnoticed.
+    """
+
+    def __init__(self, client, stream_url: str = DEFAULT_STREAM_URL, keepalive_interval: float = 30 * 60,
+                 resync_interval: float = 60 * 60, reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0):
+        """
+        Parameters:
+        - client: Binance Client object.
+        - stream_url: Base WebSocket URL of the user data stream.
+        - keepalive_interval: Seconds between listen key keepalives.
+        - resync_interval: Seconds between precautionary full REST resyncs.
+        - reconnect_delay: Initial reconnect backoff in seconds.
+        - max_reconnect_delay: Upper bound for the reconnect backoff.
+        """
+        self.client = client
+        self.stream_url = stream_url.rstrip('/')
+        self.keepalive_interval = keepalive_interval
+        self.resync_interval = resync_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.balances = {}
+        self.open_orders = {}
+        self.listeners = []
+        self.connected = False
+        self.last_update = None
+        self.events = 0
+        self.resyncs = 0
+        self._lock = threading.Lock()
+        self._listen_key = None
+        self._running = False
+        self._thread = None
+        self._resync_requested = False
+        self._account_update_time = 0
+
+    def resync(self):
+        """Reload balances and open orders from REST."""
+        account = self.client.get_account()
+        open_orders = self.client.get_open_orders()
+        with self._lock:
+            self.balances = {
+                balance['asset']: {'free': float(balance['free']), 'locked': float(balance['locked'])}
+                for balance in account['balances']
+            }
+            self.open_orders = {
+                order['orderId']: {
+                    'symbol': order['symbol'],
+                    'side': order['side'],
+                    'type': order['type'],
+                    'status': order['status'],
+                    'price': float(order['price']),
+                    'quantity': float(order['origQty']),
+                    'executed': float(order['executedQty']),
+                    'client_order_id': order.get('clientOrderId'),
+                }
+                for order in open_orders
+            }
+            self._account_update_time = account.get('updateTime', 0)
+            self.last_update = time.time()
+            self.resyncs += 1
+        logging.info(f"Account mirror resynced: {len(self.balances)} assets, {len(self.open_orders)} open orders.")
+
+    def get_balance(self, asset: str):
+        """Return the free balance of an asset (no network access)."""
+        with self._lock:
+            balance = self.balances.get(asset)
+            return balance['free'] if balance else 0.0
+
+    def free_balances(self):
+        """Return {asset: free balance} for every mirrored asset."""
+        with self._lock:
+            return {asset: balance['free'] for asset, balance in self.balances.items()}
+
+    def staleness(self):
+        """Seconds since the mirror last received an event or resync (inf if never seeded)."""
+        if self.last_update is None:
+            return float('inf')
+        return time.time() - self.last_update
+
+    def is_live(self, max_staleness: float = None):
+        """Whether lookups can be served from the mirror."""
+        if not self.connected or self.last_update is None:
+            return False
+        return max_staleness is None or self.staleness() <= max_staleness
+
+    def metrics(self):
+        """Return mirror health metrics, including staleness in seconds."""
+        return {
+            'connected': self.connected,
+            'staleness_seconds': self.staleness(),
+            'events': self.events,
+            'resyncs': self.resyncs,
+            'assets': len(self.balances),
+            'open_orders': len(self.open_orders),
+        }
+
+    def apply_event(self, event: dict):
+        """
+        Apply one user data stream event to the mirror and notify listeners.
+
+        Parameters:
+        - event: Decoded event payload.
+        """
+        event_type = event.get('e')
+        with self._lock:
+            if event_type == 'outboundAccountPosition':
+                # Skip positions older than the REST snapshot taken on (re)connect
+                if event.get('u', 0) < self._account_update_time:
+                    balances = []
+                else:
+                    balances = event['B']
+                for balance in balances:
+                    self.balances[balance['a']] = {'free': float(balance['f']), 'locked': float(balance['l'])}
+            elif event_type == 'balanceUpdate':
+                # A delta older than the REST snapshot is already part of it
+                if event.get('E', 0) >= self._account_update_time:
+                    balance = self.balances.setdefault(event['a'], {'free': 0.0, 'locked': 0.0})
+                    balance['free'] += float(event['d'])
+            elif event_type == 'executionReport':
+                order_id = event['i']
+                if event['X'] in FINAL_ORDER_STATES:
+                    self.open_orders.pop(order_id, None)
+                else:
+                    self.open_orders[order_id] = {
+                        'symbol': event['s'],
+                        'side': event['S'],
+                        'type': event['o'],
+                        'status': event['X'],
+                        'price': float(event['p']),
+                        'quantity': float(event['q']),
+                        'executed': float(event['z']),
+                        'client_order_id': event.get('c'),
+                    }
+            elif event_type == 'listenKeyExpired':
+                self._resync_requested = True
+            self.last_update = time.time()
+            self.events += 1
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logging.error(f"Account event listener failed: {e}")
+
+    async def _keepalive(self):
+        while self._running:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await asyncio.to_thread(self.client.stream_keepalive, self._listen_key)
+            except Exception as e:
+                logging.warning(f"Listen key keepalive failed: {e}")
+
+    async def _periodic_resync(self):
+        while self._running:
+            await asyncio.sleep(self.resync_interval)
+            try:
+                await asyncio.to_thread(self.resync)
+            except Exception as e:
+                logging.warning(f"Periodic account resync failed: {e}")
+
+    async def run(self):
+        """Maintain the user data stream until stop() is called."""
+        self._running = True
+        delay = self.reconnect_delay
+        tasks = [asyncio.create_task(self._keepalive()), asyncio.create_task(self._periodic_resync())]
+        try:
+            while self._running:
+                try:
+                    self._listen_key = await asyncio.to_thread(self.client.stream_get_listen_key)
+                    async with websockets.connect(f"{self.stream_url}/ws/{self._listen_key}", ping_interval=20) as websocket:
+                        # Anything that happened while disconnected is recovered from REST
+                        await asyncio.to_thread(self.resync)
+                        self.connected = True
+                        delay = self.reconnect_delay
+                        async for message in websocket:
+                            self.apply_event(json.loads(message))
+                            if self._resync_requested:
+                                self._resync_requested = False
+                                break
+                            if not self._running:
+                                break
+                except (OSError, websockets.ConnectionClosed, websockets.InvalidHandshake) as e:
+                    logging.warning(f"User data stream disconnected: {e}")
+                except Exception as e:
+                    logging.error(f"User data stream error: {e}")
+                self.connected = False
+                if not self._running:
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            self.connected = False
+            for task in tasks:
+                task.cancel()
+
+    def start(self):
+        """Run the mirror on a background thread and return immediately."""
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name='account-mirror', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the stream loop to exit after the current message."""
+        self._running = False
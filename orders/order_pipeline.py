@@ -0,0 +1,246 @@
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from binance.exceptions import BinanceAPIException, BinanceOrderException
+from logs.metrics import LatencyHistogram
+from orders.orders_manager import place_order
+from orders.symbol_rules import OrderValidationError
+from orders.account_mirror import FINAL_ORDER_STATES
+
+# Order of the non-final states; updates arriving out of order never move an order backwards
+STATUS_RANK = {'PENDING': 0, 'NEW': 1, 'PARTIALLY_FILLED': 2}
+
+# Seconds close() waits for submitted orders to reach a final state
+CLOSE_TIMEOUT = 30.0
+
+# Finished orders kept for lookup after they leave the working set
+FINISHED_HISTORY = 1000
+
+# Error code of get_order for an order the exchange does not know
+UNKNOWN_ORDER_CODE = -2013
+
+class OrderPipeline:
+    """
+    Non-blocking order submission with fill tracking.
+
+    submit() hands the order to a small thread pool and returns its client
+    order id at once, so strategy evaluation never waits for a REST
+    round-trip. Orders are then tracked through NEW/PARTIALLY_FILLED/FILLED
+    from executionReport events of an AccountMirror. Only while the user
+    data stream is down does a background thread fall back to polling:
+    one get_open_orders call per symbol with working orders (weight 6,
+    where the all-symbols call costs 80), plus get_order for orders that
+    left the open list. An order whose submission failed without an answer
+    from the exchange (e.g. a timeout) may still have been accepted, so it
+    stays pending until a poll finds it by client order id; only errors
+    returned by the exchange or the local filter checks reject an order.
+    Submit-to-ack and submit-to-fill latencies are recorded per symbol. Orders leave self.orders once they
+    reach a final state; the last `history` of them stay available through
+    order().
+    """
+
+    def __init__(self, client, mirror=None, max_workers: int = 4, poll_interval: float = 2.0, rules=None,
+                 history: int = FINISHED_HISTORY):
+        """
+        Parameters:
+        - client: Binance Client object.
+        - mirror: Optional AccountMirror whose executionReport events drive tracking.
+        - max_workers: Orders submitted concurrently.
+        - poll_interval: Seconds between fallback polls while the stream is down.
+        - rules: Optional SymbolRules passed to place_order.
+        - history: Finished orders kept for order() lookups.
+        """
+        self.client = client
+        self.mirror = mirror
+        self.poll_interval = poll_interval
+        self.rules = rules
+        self.orders = {}
+        self.finished = OrderedDict()
+        self.history = history
+        self.ack_latency = {}
+        self.fill_latency = {}
+        self.polls = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='order')
+        self._running = True
+        if mirror is not None:
+            mirror.listeners.append(self.on_event)
+        self._poller = threading.Thread(target=self._poll_loop, name='order-poller', daemon=True)
+        self._poller.start()
+
+    def submit(self, symbol: str, side: str, quantity: float, price: float = None, reference_price: float = None):
+        """
+        Queue an order and return immediately.
+
+        Returns:
+        - Client order id used to track the order in self.orders.
+        """
+        client_order_id = f"bot-{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            self.orders[client_order_id] = {
+                'symbol': symbol, 'side': side, 'quantity': quantity, 'price': price,
+                'status': 'PENDING', 'executed': 0.0, 'order_id': None, 'error': None,
+                'submitted_at': time.monotonic(), 'acked_at': None, 'filled_at': None,
+            }
+        self._executor.submit(self._send, client_order_id, symbol, side, quantity, price, reference_price)
+        return client_order_id
+
+    def _send(self, client_order_id, symbol, side, quantity, price, reference_price):
+        try:
+            response = place_order(self.client, symbol, side, quantity, price, reference_price, self.rules,
+                                   client_order_id=client_order_id)
+        except (BinanceAPIException, BinanceOrderException, OrderValidationError) as e:
+            self._reject(client_order_id, str(e))
+            return
+        except Exception as e:
+            logging.warning(f"Outcome of order {client_order_id} unknown ({e}); reconciling it by polling.")
+            with self._lock:
+                order = self.orders.get(client_order_id)
+                if order is not None:
+                    order['error'] = str(e)
+            return
+        self._update(client_order_id, response.get('orderId'), response.get('status', 'NEW'),
+                     response.get('executedQty'))
+
+    def _update(self, client_order_id, order_id, status, executed=None):
+        """Apply an order state from any source (REST response, stream event or poll)."""
+        now = time.monotonic()
+        with self._lock:
+            order = self.orders.get(client_order_id)
+            if order is None or order['status'] in FINAL_ORDER_STATES:
+                return
+            if order_id is not None:
+                order['order_id'] = order_id
+            if STATUS_RANK.get(status, len(STATUS_RANK)) >= STATUS_RANK[order['status']]:
+                order['status'] = status
+            if executed is not None:
+                order['executed'] = max(order['executed'], float(executed))
+            symbol = order['symbol']
+            if order['acked_at'] is None:
+                order['acked_at'] = now
+                self.ack_latency.setdefault(symbol, LatencyHistogram()).record((now - order['submitted_at']) * 1000)
+            if status == 'FILLED' and order['filled_at'] is None:
+                order['filled_at'] = now
+                self.fill_latency.setdefault(symbol, LatencyHistogram()).record((now - order['submitted_at']) * 1000)
+            if order['status'] in FINAL_ORDER_STATES:
+                self._retire(client_order_id)
+
+    def _reject(self, client_order_id, error: str):
+        with self._lock:
+            # A stream event may already have finished the order
+            order = self.orders.get(client_order_id)
+            if order is None:
+                return
+            order['status'], order['error'] = 'REJECTED', error
+            self._retire(client_order_id)
+
+    def _unconfirmed(self):
+        """Orders whose submission failed without an answer from the exchange (lock held)."""
+        return {key: order for key, order in self.orders.items() if order['order_id'] is None and order['error']}
+
+    def _retire(self, client_order_id):
+        """Move a final order out of the working set into the bounded history (lock held)."""
+        self.finished[client_order_id] = self.orders.pop(client_order_id)
+        while len(self.finished) > self.history:
+            self.finished.popitem(last=False)
+
+    def order(self, client_order_id: str):
+        """Return the state of a working or recently finished order (None if unknown or aged out)."""
+        with self._lock:
+            return self.orders.get(client_order_id) or self.finished.get(client_order_id)
+
+    def on_event(self, event: dict):
+        """AccountMirror listener: track our orders from executionReport events."""
+        if event.get('e') != 'executionReport':
+            return
+        # Cancellations report the original client order id in 'C'
+        client_order_id = event.get('C') or event.get('c')
+        if client_order_id in self.orders:
+            self._update(client_order_id, event.get('i'), event['X'], event.get('z'))
+
+    def pending(self):
+        """Return the client order ids that have not reached a final state."""
+        with self._lock:
+            return list(self.orders)
+
+    def poll(self):
+        """Resolve pending orders over REST (used while the stream is down)."""
+        with self._lock:
+            acked = {key: order for key, order in self.orders.items() if order['order_id'] is not None}
+            acked.update(self._unconfirmed())
+        if not acked:
+            return
+        self.polls += 1
+        open_orders = {}
+        for symbol in sorted({order['symbol'] for order in acked.values()}):
+            for order in self.client.get_open_orders(symbol=symbol):
+                open_orders[order['clientOrderId']] = order
+        for client_order_id, order in acked.items():
+            state = open_orders.get(client_order_id)
+            if state is None and order['order_id'] is None:
+                try:
+                    state = self.client.get_order(symbol=order['symbol'], origClientOrderId=client_order_id)
+                except BinanceAPIException as e:
+                    if e.code != UNKNOWN_ORDER_CODE:
+                        raise
+                    # The failed submission never reached the exchange
+                    self._reject(client_order_id, order['error'])
+                    continue
+            elif state is None:
+                # No longer open: one lookup to learn how it ended
+                state = self.client.get_order(symbol=order['symbol'], orderId=order['order_id'])
+            self._update(client_order_id, state.get('orderId'), state['status'], state.get('executedQty'))
+
+    def _poll_loop(self):
+        while self._running:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                unconfirmed = bool(self._unconfirmed())
+            # The stream never reports orders that did not reach the exchange
+            if self.mirror is not None and self.mirror.is_live() and not unconfirmed:
+                continue
+            try:
+                self.poll()
+            except Exception as e:
+                logging.warning(f"Order status poll failed: {e}")
+
+    def latency_summary(self):
+        """Return {symbol: {'ack': ..., 'fill': ...}} latency histogram summaries."""
+        with self._lock:
+            symbols = sorted(set(self.ack_latency) | set(self.fill_latency))
+            return {
+                symbol: {
+                    'ack': self.ack_latency.get(symbol, LatencyHistogram()).summary(),
+                    'fill': self.fill_latency.get(symbol, LatencyHistogram()).summary(),
+                }
+                for symbol in symbols
+            }
+
+    def wait(self, timeout: float = None):
+        """Wait until every order is final or timeout seconds elapse; returns True if none remain."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout: float = CLOSE_TIMEOUT):
+        """
+        Finish queued submissions, track orders until final, then stop the poller.
+
+        Parameters:
+        - timeout: Seconds to wait for working orders to fill or end (0 to stop at once).
+        """
+        self._executor.shutdown(wait=True)
+        if not self.wait(timeout):
+            with self._lock:
+                working = [f"{order['symbol']} {order['side']} {key} ({order['status']})"
+                           for key, order in self.orders.items()]
+            logging.warning(f"{len(working)} orders still pending at close: {', '.join(working)}")
+        self._running = False
+        if self.mirror is not None and self.on_event in self.mirror.listeners:
+            self.mirror.listeners.remove(self.on_event)
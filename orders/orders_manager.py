@@ -1,23 +1,43 @@
 import logging
 from binance.client import Client
+from orders.symbol_rules import symbol_rules
 
 # Order Manager for handling Binance trades
-def place_order(client: Client, symbol: str, side: str, quantity: float, price: float = None):
+def place_order(client: Client, symbol: str, side: str, quantity: float, price: float = None,
+                reference_price: float = None, rules=None, client_order_id: str = None):
     """
     Places an order on Binance.
 
+    Quantity and price are rounded to the symbol's LOT_SIZE and PRICE_FILTER
+    and the order's notional is checked locally against the cached exchange
+    filters, so orders the exchange would reject are never sent.
+
     Parameters:
     - client: Binance Client object.
     - symbol: Trading pair (e.g., BTCUSDT).
     - side: BUY or SELL.
     - quantity: Quantity to trade.
     - price: Optional limit price for LIMIT orders.
+    - reference_price: Optional expected price of a MARKET order, used for the notional check.
+    - rules: Optional SymbolRules; defaults to the shared orders.symbol_rules cache.
+    - client_order_id: Optional newClientOrderId used to match stream events to the order.
 
     Returns:
     - Order response from Binance.
     """
+    rules = rules or symbol_rules
+    try:
+        rules.refresh(client)
+    except Exception as e:
+        logging.warning(f"Could not refresh exchange filters: {e}")
     try:
-        if price:
+        if rules.knows(symbol):
+            quantity, price_text = rules.prepare_order(symbol, quantity, price, reference_price)
+        else:
+            logging.warning(f"No exchange filters for {symbol}; sending order unvalidated.")
+            price_text = f"{price:.2f}" if price is not None else None
+        extra = {'newClientOrderId': client_order_id} if client_order_id else {}
+        if price is not None:
             # Limit order
             order = client.create_order(
                 symbol=symbol,
@@ -25,7 +45,8 @@ def place_order(client: Client, symbol: str, side: str, quantity: float, price:
                 type=Client.ORDER_TYPE_LIMIT,
                 timeInForce=Client.TIME_IN_FORCE_GTC,
                 quantity=quantity,
-                price=f"{price:.2f}"
+                price=price_text,
+                **extra
             )
         else:
             # Market order
@@ -33,7 +54,8 @@ def place_order(client: Client, symbol: str, side: str, quantity: float, price:
                 symbol=symbol,
                 side=side,
                 type=Client.ORDER_TYPE_MARKET,
-                quantity=quantity
+                quantity=quantity,
+                **extra
             )
         logging.info(f"Order placed: {order}")
         return order
@@ -41,17 +63,66 @@ def place_order(client: Client, symbol: str, side: str, quantity: float, price:
         logging.error(f"Failed to place order: {e}")
         raise
 
-def get_account_balance(client: Client, asset: str):
+# Order pipeline used by submit_order when set
+_order_pipeline = None
+
+def set_order_pipeline(pipeline):
+    """
+    Route submit_order through a non-blocking OrderPipeline (None to disable).
+
+    Parameters:
+    - pipeline: orders.order_pipeline.OrderPipeline instance or None.
+    """
+    global _order_pipeline
+    _order_pipeline = pipeline
+
+def submit_order(client: Client, symbol: str, side: str, quantity: float, price: float = None,
+                 reference_price: float = None):
+    """
+    Submit an order without waiting for the exchange when a pipeline is set.
+
+    Strategies call this instead of place_order: with an OrderPipeline the
+    order is queued and its client order id returned immediately; without
+    one it falls back to a synchronous place_order.
+
+    Returns:
+    - Client order id (pipeline) or the order response (synchronous).
+    """
+    if _order_pipeline is not None:
+        return _order_pipeline.submit(symbol, side, quantity, price, reference_price)
+    return place_order(client, symbol, side, quantity, price, reference_price)
+
+# Live account mirror used by get_account_balance when connected
+_account_mirror = None
+
+def set_account_mirror(mirror):
+    """
+    Serve balance lookups from a live AccountMirror (None to disable).
+
+    Parameters:
+    - mirror: orders.account_mirror.AccountMirror instance or None.
+    """
+    global _account_mirror
+    _account_mirror = mirror
+
+def get_account_balance(client: Client, asset: str, mirror=None):
     """
     Retrieve the balance of a specific asset from Binance.
 
+    When an account mirror is connected the balance is a dictionary read;
+    otherwise it falls back to a get_account request.
+
     Parameters:
     - client: Binance Client object.
     - asset: Asset symbol (e.g., BTC, USDT).
+    - mirror: Optional AccountMirror; defaults to the one set with set_account_mirror.
 
     Returns:
     - Balance available for the specified asset.
     """
+    mirror = mirror or _account_mirror
+    if mirror is not None and mirror.is_live():
+        return mirror.get_balance(asset)
     try:
         account = client.get_account()
         for balance in account['balances']:
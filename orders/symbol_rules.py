@@ -0,0 +1,185 @@
+import time
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+class OrderValidationError(ValueError):
+    """Raised when an order would be rejected by the exchange filters."""
+
+def _decimals(step: float):
+    """Number of decimals needed to print multiples of step."""
+    if step <= 0:
+        return 8
+    text = f"{step:.10f}".rstrip('0')
+    return len(text.split('.')[1]) if '.' in text else 0
+
+def format_decimal(value: float, step: float):
+    """Format value with the precision implied by a step/tick size."""
+    return f"{value:.{_decimals(step)}f}"
+
+class SymbolRules:
+    """
+    Cached index of LOT_SIZE, PRICE_FILTER and MIN_NOTIONAL/NOTIONAL rules.
+
+    Built from one get_exchange_info call and refreshed when older than
+    refresh_interval. Rules are kept as aligned NumPy arrays so a batch of
+    candidate orders across many symbols is rounded and checked at once.
+    """
+
+    FIELDS = ['step_size', 'min_qty', 'max_qty', 'tick_size', 'min_price', 'max_price', 'min_notional']
+
+    def __init__(self, refresh_interval: float = 60 * 60):
+        """
+        Parameters:
+        - refresh_interval: Seconds before the exchange info is reloaded.
+        """
+        self.refresh_interval = refresh_interval
+        self.index = {}
+        self.arrays = {field: np.empty(0) for field in self.FIELDS}
+        self.market_notional = np.empty(0, dtype=bool)
+        self.loaded_at = None
+        self._lock = threading.Lock()
+        # Held while checking staleness and fetching, so only one thread reloads
+        self._refresh_lock = threading.Lock()
+
+    def load(self, exchange_info: dict):
+        """Build the rule arrays from an exchange info response."""
+        rows = {field: [] for field in self.FIELDS}
+        market_notional = []
+        index = {}
+        for symbol_info in exchange_info.get('symbols', []):
+            filters = {f['filterType']: f for f in symbol_info.get('filters', [])}
+            lot = filters.get('LOT_SIZE', {})
+            price = filters.get('PRICE_FILTER', {})
+            notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+            index[symbol_info['symbol']] = len(index)
+            rows['step_size'].append(float(lot.get('stepSize', 0)))
+            rows['min_qty'].append(float(lot.get('minQty', 0)))
+            rows['max_qty'].append(float(lot.get('maxQty', 0)))
+            rows['tick_size'].append(float(price.get('tickSize', 0)))
+            rows['min_price'].append(float(price.get('minPrice', 0)))
+            rows['max_price'].append(float(price.get('maxPrice', 0)))
+            rows['min_notional'].append(float(notional.get('minNotional', 0)))
+            market_notional.append(bool(notional.get('applyMinToMarket', notional.get('applyToMarket', True))))
+        with self._lock:
+            self.index = index
+            self.arrays = {field: np.array(values, dtype=np.float64) for field, values in rows.items()}
+            self.market_notional = np.array(market_notional, dtype=bool)
+            self.loaded_at = time.monotonic()
+        logging.info(f"Loaded exchange filters for {len(index)} symbols.")
+
+    def _fresh(self):
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.refresh_interval
+
+    def refresh(self, client, force: bool = False):
+        """
+        Reload the rules from the exchange when stale (or when forced).
+
+        Staleness is checked again once the refresh lock is held, so threads
+        that find the rules stale together make a single get_exchange_info call.
+        """
+        if not force and self._fresh():
+            return
+        loaded_at = self.loaded_at
+        with self._refresh_lock:
+            if self.loaded_at != loaded_at or (not force and self._fresh()):
+                return
+            self.load(client.get_exchange_info())
+
+    def knows(self, symbol: str):
+        return symbol in self.index
+
+    def validate_orders(self, symbols, quantities, prices, market=None):
+        """
+        Round and check a batch of candidate orders against the filters.
+
+        Quantities are floored to LOT_SIZE steps and prices rounded to the
+        PRICE_FILTER tick; min/max quantity, price range and minimum
+        notional are then checked with vector operations.
+
+        Parameters:
+        - symbols: Sequence of trading pairs.
+        - quantities: Sequence of order quantities.
+        - prices: Sequence of limit prices, or reference prices for market orders.
+        - market: Optional boolean sequence flagging market orders.
+
+        Returns:
+        - DataFrame with the rounded quantity/price, notional, 'valid' and 'reason'.
+        """
+        symbols = list(symbols)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        market = np.zeros(len(symbols), dtype=bool) if market is None else np.asarray(market, dtype=bool)
+        with self._lock:
+            rows = np.array([self.index.get(symbol, -1) for symbol in symbols], dtype=np.int64)
+            known = rows >= 0
+            safe_rows = np.where(known, rows, 0)
+            if len(self.index):
+                rules = {field: np.where(known, self.arrays[field][safe_rows], 0.0) for field in self.FIELDS}
+                market_notional = np.where(known, self.market_notional[safe_rows], False)
+            else:
+                rules = {field: np.zeros(len(symbols)) for field in self.FIELDS}
+                market_notional = np.zeros(len(symbols), dtype=bool)
+
+        step, tick = rules['step_size'], rules['tick_size']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            quantity = np.where(step > 0, np.floor(np.round(quantities / step, 9)) * step, quantities)
+            price = np.where(tick > 0, np.round(np.round(prices / tick, 9)) * tick, prices)
+        notional = quantity * price
+
+        reason = np.full(len(symbols), '', dtype=object)
+        has_price = ~np.isnan(price)
+        checks = [
+            (~known, 'unknown symbol'),
+            (quantity <= 0, 'quantity rounds to zero'),
+            (quantity < rules['min_qty'], 'quantity below LOT_SIZE minQty'),
+            ((rules['max_qty'] > 0) & (quantity > rules['max_qty']), 'quantity above LOT_SIZE maxQty'),
+            (~market & has_price & (price < rules['min_price']), 'price below PRICE_FILTER minPrice'),
+            (~market & has_price & (rules['max_price'] > 0) & (price > rules['max_price']), 'price above PRICE_FILTER maxPrice'),
+            (has_price & (~market | market_notional) & (notional < rules['min_notional']), 'notional below minimum'),
+        ]
+        for failed, message in reversed(checks):
+            reason = np.where(failed, message, reason)
+
+        return pd.DataFrame({
+            'symbol': symbols,
+            'quantity': quantity,
+            'price': price,
+            'notional': notional,
+            'valid': reason == '',
+            'reason': reason,
+        })
+
+    def prepare_order(self, symbol: str, quantity: float, price: float = None, reference_price: float = None):
+        """
+        Round one order to the symbol's filters and check it locally.
+
+        Parameters:
+        - symbol: Trading pair (e.g., BTCUSDT).
+        - quantity: Quantity to trade.
+        - price: Limit price, or None for a market order.
+        - reference_price: Expected fill price of a market order, for the notional check.
+
+        Returns:
+        - Tuple (quantity, price) as strings formatted to step/tick precision
+          (price is None for market orders).
+
+        Raises:
+        - OrderValidationError when the exchange would reject the order.
+        """
+        market = price is None
+        check_price = reference_price if market else price
+        result = self.validate_orders(
+            [symbol], [quantity], [np.nan if check_price is None else check_price], [market]
+        ).iloc[0]
+        if not result['valid']:
+            raise OrderValidationError(f"{symbol} order rejected locally: {result['reason']} "
+                                       f"(quantity={quantity}, price={check_price})")
+        row = self.index[symbol]
+        quantity_text = format_decimal(result['quantity'], self.arrays['step_size'][row])
+        price_text = None if market else format_decimal(result['price'], self.arrays['tick_size'][row])
+        return quantity_text, price_text
+
+# Rules shared by every order placed in the process
+symbol_rules = SymbolRules()
@@ -0,0 +1,221 @@
+import numpy as np
+
+# Indicator kernels over a (symbols x bars) close matrix, one row per symbol,
+# oldest bar first. They compute the same values as calculate_rsi,
+# calculate_macd and calculate_sma (to floating-point rounding) for every
+# row in one vectorized pass. Rows may start with NaN (a symbol listed later
+# than the others); those bars are treated as warm-up and the indicators
+# start from the row's first valid close, exactly as if the row had been
+# passed to the DataFrame functions without its leading NaNs.
+
+# Bars per block of the blocked prefix sums (bounds cancellation error)
+ROLLING_BLOCK = 4096
+
+def _as_matrix(values):
+    matrix = np.asarray(values, dtype=np.float64)
+    return matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+
+def _rolling_sum(values: np.ndarray, window: int):
+    """
+    Trailing sum over `window` bars (fewer at the start of a row) of a NaN-free matrix.
+
+    Prefix sums restart every block, so each window sum is a difference of
+    terms no larger than one block's sum instead of the whole row's.
+    """
+    rows, bars = values.shape
+    block = max(window, ROLLING_BLOCK)
+    blocks = -(-bars // block)
+    padded = np.zeros((rows, blocks * block))
+    padded[:, :bars] = values
+    local = np.cumsum(padded.reshape(rows, blocks, block), axis=-1)
+    totals = local[:, :, -1]
+    local = local.reshape(rows, -1)
+
+    local = local[:, :bars]
+    sums = local.copy()
+    if window < bars:
+        sums[:, window:] -= local[:, :bars - window]
+    # Windows reaching back into the previous block add that block's total
+    for b in range(1, blocks):
+        start = b * block
+        sums[:, start:min(start + window, bars)] += totals[:, b - 1:b]
+    return sums
+
+def _rolling_count(mask: np.ndarray, window: int):
+    counts = np.cumsum(mask, axis=1, dtype=np.int32)
+    if window < mask.shape[1]:
+        counts[:, window:] -= counts[:, :-window].copy()
+    return counts
+
+def batch_sma(close, window: int, min_periods: int = None):
+    """
+    Simple moving average of every row, like Series.rolling(window).mean().
+
+    Parameters:
+    - close: (symbols x bars) array; NaN marks missing bars.
+    - window: Number of bars averaged.
+    - min_periods: Valid bars required for a value (default: window).
+
+    Returns:
+    - (symbols x bars) array of averages, NaN during warm-up.
+    """
+    close = _as_matrix(close)
+    min_periods = window if min_periods is None else min_periods
+    valid = ~np.isnan(close)
+    # Center each row on its first valid close to keep the prefix sums small
+    first = np.take_along_axis(close, np.argmax(valid, axis=1)[:, None], axis=1)
+    first = np.where(np.isnan(first), 0.0, first)
+    counts = _rolling_count(valid, window)
+    sums = _rolling_sum(np.where(valid, close - first, 0.0), window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / counts + first
+    # A window of one repeated close averages to exactly that close, as in pandas
+    if window > 1:
+        moved = np.zeros(close.shape, dtype=bool)
+        np.not_equal(close[:, 1:], close[:, :-1], out=moved[:, 1:])
+        flat = _rolling_count(moved, window - 1) == 0
+        mean[flat] = close[flat]
+    return np.where((counts >= max(min_periods, 1)), mean, np.nan)
+
+def batch_ema(values, span: int):
+    """
+    Exponential moving average of every row, like Series.ewm(span=span, adjust=False).mean().
+
+    Rows are split into blocks short enough that the decay factor over a
+    block stays above 1e-6; inside a block the recursion is a weighted
+    prefix sum, and only the carry between blocks is sequential. Gaps
+    inside a row are forward-filled (pandas instead decays the weight of
+    the last value across them).
+
+    Parameters:
+    - values: (symbols x bars) array; leading NaNs are warm-up.
+    - span: EMA span.
+
+    Returns:
+    - (symbols x bars) array, NaN before each row's first valid value.
+    """
+    values = _as_matrix(values)
+    rows, bars = values.shape
+    if bars == 0:
+        return values.copy()
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    valid = ~np.isnan(values)
+    first = np.argmax(valid, axis=1)
+    positions = np.arange(bars)
+    # Forward-fill gaps and back-fill the warm-up with the first valid value
+    source = np.maximum.accumulate(np.where(valid, positions, first[:, None]), axis=1)
+    filled = np.take_along_axis(values, source, axis=1)
+    warm_up = positions < first[:, None]
+
+    if decay == 0.0:
+        ema = filled.copy()
+    else:
+        block = int(min(bars, max(1, np.log(1e6) / -np.log(decay))))
+        blocks = -(-bars // block)
+        padded = np.empty((rows, blocks * block))
+        padded[:, :bars] = filled
+        padded[:, bars:] = filled[:, -1:]
+        steps = np.arange(block)
+        growth = decay ** -steps.astype(np.float64)
+        local = alpha * decay ** steps * np.cumsum(padded.reshape(rows, blocks, block) * growth, axis=-1)
+        # Value entering each block: EMA at the end of the previous one (x0 before the first)
+        carry = np.empty((rows, blocks))
+        carry[:, 0] = filled[:, 0]
+        block_decay = decay ** block
+        for j in range(1, blocks):
+            carry[:, j] = block_decay * carry[:, j - 1] + local[:, j - 1, -1]
+        ema = (local + carry[:, :, None] * decay ** (steps + 1)).reshape(rows, -1)[:, :bars]
+        # While a row has not moved since its first value the EMA is exactly that value (as in
+        # pandas), so fast and slow averages compare equal instead of differing by rounding
+        unmoved = np.logical_and.accumulate(filled == filled[:, :1], axis=1)
+        ema[unmoved] = np.broadcast_to(filled[:, :1], ema.shape)[unmoved]
+    ema[warm_up] = np.nan
+    return ema
+
+def batch_macd(close, fast_period: int, slow_period: int, signal_period: int):
+    """
+    MACD and signal line of every row, like calculate_macd.
+
+    Returns:
+    - Tuple (macd, signal_line) of (symbols x bars) arrays.
+    """
+    close = _as_matrix(close)
+    macd = batch_ema(close, fast_period) - batch_ema(close, slow_period)
+    return macd, batch_ema(macd, signal_period)
+
+def batch_rsi(close, period: int):
+    """
+    RSI of every row, like calculate_rsi (rolling means with min_periods=1).
+
+    Windows without any loss give 100 and windows without any move give
+    NaN, as in calculate_rsi; counting moves exactly keeps those cases
+    exact despite the prefix sums.
+
+    Returns:
+    - (symbols x bars) array of RSI values.
+    """
+    close = _as_matrix(close)
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    # fmax maps the NaN deltas (first bar, warm-up) to 0 like Series.where(delta > 0, 0)
+    up = np.fmax(delta, 0.0)
+    down = np.fmax(-delta, 0.0)
+    gain = _rolling_sum(up, period)
+    loss = _rolling_sum(down, period)
+    gain[_rolling_count(up > 0, period) == 0] = 0.0
+    loss[_rolling_count(down > 0, period) == 0] = 0.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = gain / loss
+        return 100 - 100 / (1 + rs)
+
+def batch_signals(close, strategy: str, config: dict):
+    """
+    Buy and sell signal matrices with the same rules as backtest.simulator.compute_signals.
+
+    Parameters:
+    - close: (symbols x bars) close matrix.
+    - strategy: Strategy name ('RSI', 'MACD', 'SMA').
+    - config: Dictionary containing strategy configuration.
+
+    Returns:
+    - Tuple (buy, sell) of boolean (symbols x bars) arrays.
+    """
+    with np.errstate(invalid='ignore'):
+        if strategy == 'RSI':
+            rsi = batch_rsi(close, config['rsi_period'])
+            buy = rsi < config['rsi_oversold']
+            sell = ~buy & (rsi > config['rsi_overbought'])
+        elif strategy == 'MACD':
+            macd, signal = batch_macd(close, config['fast_period'], config['slow_period'], config['signal_period'])
+            buy = macd > signal
+            sell = macd < signal
+        elif strategy == 'SMA':
+            sma_short = batch_sma(close, config['short_window'])
+            sma_long = batch_sma(close, config['long_window'])
+            buy = sma_short > sma_long
+            sell = sma_short < sma_long
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+    return buy, sell
+
+def close_matrix(frames: dict, field: str = 'close'):
+    """
+    Align per-symbol candle frames on open_time into a (symbols x bars) matrix.
+
+    Parameters:
+    - frames: {symbol: DataFrame with open_time and field}.
+    - field: Column to stack.
+
+    Returns:
+    - Tuple (symbols, open_times, matrix); bars a symbol lacks are NaN.
+    """
+    symbols = list(frames)
+    if not symbols:
+        return symbols, np.empty(0, dtype=np.int64), np.empty((0, 0))
+    open_times = np.unique(np.concatenate([np.asarray(frames[s]['open_time'], dtype=np.int64) for s in symbols]))
+    matrix = np.full((len(symbols), len(open_times)), np.nan)
+    for row, symbol in enumerate(symbols):
+        frame = frames[symbol]
+        columns = np.searchsorted(open_times, np.asarray(frame['open_time'], dtype=np.int64))
+        matrix[row, columns] = np.asarray(frame[field], dtype=np.float64)
+    return symbols, open_times, matrix
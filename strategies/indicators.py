@@ -0,0 +1,275 @@
+import math
+from collections import deque
+
+# Streaming (O(1) per candle) versions of the indicators computed by
+# calculate_rsi, calculate_macd and calculate_sma. The arithmetic mirrors
+# pandas' rolling-mean and ewm kernels step for step, so values match the
+# DataFrame functions bit for bit on the same input series.
+
+def _divide(numerator: float, denominator: float):
+    """IEEE-754 division as pandas/NumPy perform it (no ZeroDivisionError)."""
+    if denominator == 0:
+        if numerator == 0 or numerator != numerator:
+            return math.nan
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+class RollingMean:
+    """
+    Fixed-window rolling mean with the same Kahan-compensated add/remove
+    updates as pandas' rolling(window).mean().
+    """
+
+    def __init__(self, window: int, min_periods: int = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._values = deque()
+        # (sum, compensation_add, compensation_remove, nobs, neg_ct, same_count, prev)
+        self._state = (0.0, 0.0, 0.0, 0, 0, 0, math.nan)
+        self.value = math.nan
+
+    def _advance(self, value: float):
+        total, comp_add, comp_remove, nobs, neg_ct, same, prev = self._state
+        if not self._values or self.window == 1:
+            # pandas recomputes from scratch when the window does not overlap the previous one
+            total, comp_add, comp_remove, nobs, neg_ct, same, prev = 0.0, 0.0, 0.0, 0, 0, 0, value
+        elif len(self._values) == self.window:
+            removed = self._values[0]
+            if removed == removed:
+                nobs -= 1
+                y = -removed - comp_remove
+                t = total + y
+                comp_remove = t - total - y
+                total = t
+                if math.copysign(1.0, removed) < 0:
+                    neg_ct -= 1
+        if value == value:
+            nobs += 1
+            y = value - comp_add
+            t = total + y
+            comp_add = t - total - y
+            total = t
+            if math.copysign(1.0, value) < 0:
+                neg_ct += 1
+            same = same + 1 if value == prev else 1
+            prev = value
+
+        if nobs >= self.min_periods and nobs > 0:
+            mean = total / nobs
+            if same >= nobs:
+                mean = prev
+            elif neg_ct == 0 and mean < 0:
+                mean = 0.0
+            elif neg_ct == nobs and mean > 0:
+                mean = 0.0
+        else:
+            mean = math.nan
+        return (total, comp_add, comp_remove, nobs, neg_ct, same, prev), mean
+
+    def peek(self, value: float):
+        """Return the mean if value were added, without committing it."""
+        return self._advance(float(value))[1]
+
+    def update(self, value: float):
+        """Add the next value and return the current mean."""
+        value = float(value)
+        self._state, self.value = self._advance(value)
+        if self.window == 1:
+            self._values.clear()
+        elif len(self._values) == self.window:
+            self._values.popleft()
+        self._values.append(value)
+        return self.value
+
+class EMA:
+    """Exponential moving average matching pandas' ewm(span=span, adjust=False).mean()."""
+
+    def __init__(self, span: int):
+        self.span = span
+        com = (span - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self._old_wt_factor = 1.0 - self.alpha
+        self._old_wt = 1.0
+        self._started = False
+        self.value = math.nan
+
+    def _advance(self, value: float):
+        if not self._started:
+            return value, 1.0
+        weighted, old_wt = self.value, self._old_wt
+        if weighted == weighted:
+            old_wt *= self._old_wt_factor
+            if value == value:
+                if weighted != value:
+                    weighted = old_wt * weighted + self.alpha * value
+                    weighted /= (old_wt + self.alpha)
+                old_wt = 1.0
+        elif value == value:
+            weighted = value
+        return weighted, old_wt
+
+    def peek(self, value: float):
+        """Return the average if value were added, without committing it."""
+        return self._advance(float(value))[0]
+
+    def update(self, value: float):
+        """Add the next value and return the current average."""
+        self.value, self._old_wt = self._advance(float(value))
+        self._started = True
+        return self.value
+
+class StreamingIndicator:
+    """
+    Base class for indicators fed one closed candle at a time.
+
+    Subclasses implement update(close), which commits a closed candle,
+    current(), which returns the committed value, and peek(close), which
+    evaluates a still-forming candle without committing it; the live
+    strategies peek at the newest (open) kline.
+    """
+
+    def __init__(self):
+        self.last_open_time = None
+
+    def seed(self, closes, open_times=None):
+        """Feed a history of closed candles, oldest first."""
+        for close in closes:
+            self.update(close)
+        if open_times is not None and len(open_times):
+            self.last_open_time = int(open_times[-1])
+        return self
+
+    def catch_up(self, open_times, closes):
+        """
+        Feed only the closed candles newer than the last one seen.
+
+        Returns False when the history does not overlap what was seen (for
+        example after a long outage), in which case the caller should seed a
+        fresh indicator.
+        """
+        if self.last_open_time is None:
+            return False
+        if len(open_times) and int(open_times[0]) > self.last_open_time:
+            return False
+        for open_time, close in zip(open_times, closes):
+            if int(open_time) > self.last_open_time:
+                self.update(close)
+                self.last_open_time = int(open_time)
+        return True
+
+class StreamingRSI(StreamingIndicator):
+    """RSI matching calculate_rsi: rolling means (min_periods=1) of gains and losses."""
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self._gain = RollingMean(period, min_periods=1)
+        self._loss = RollingMean(period, min_periods=1)
+        self._prev_close = math.nan
+        self.rsi = math.nan
+
+    def _split(self, close: float):
+        delta = close - self._prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        return gain, loss
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float):
+        rs = _divide(avg_gain, avg_loss)
+        return 100 - _divide(100, 1 + rs)
+
+    def peek(self, close: float):
+        """Return the RSI if close were appended, without committing it."""
+        gain, loss = self._split(float(close))
+        return self._rsi(self._gain.peek(gain), self._loss.peek(loss))
+
+    def current(self):
+        """Return the RSI after the last committed candle."""
+        return self.rsi
+
+    def update(self, close: float):
+        """Commit a closed candle and return the RSI."""
+        close = float(close)
+        gain, loss = self._split(close)
+        self.rsi = self._rsi(self._gain.update(gain), self._loss.update(loss))
+        self._prev_close = close
+        return self.rsi
+
+class StreamingMACD(StreamingIndicator):
+    """MACD and signal line matching calculate_macd."""
+
+    def __init__(self, fast_period: int, slow_period: int, signal_period: int):
+        super().__init__()
+        self._fast = EMA(fast_period)
+        self._slow = EMA(slow_period)
+        self._signal = EMA(signal_period)
+        self.macd = math.nan
+        self.signal_line = math.nan
+
+    def peek(self, close: float):
+        """Return (macd, signal_line) if close were appended, without committing it."""
+        macd = self._fast.peek(close) - self._slow.peek(close)
+        return macd, self._signal.peek(macd)
+
+    def current(self):
+        """Return (macd, signal_line) after the last committed candle."""
+        return self.macd, self.signal_line
+
+    def update(self, close: float):
+        """Commit a closed candle and return (macd, signal_line)."""
+        self.macd = self._fast.update(close) - self._slow.update(close)
+        self.signal_line = self._signal.update(self.macd)
+        return self.macd, self.signal_line
+
+class StreamingSMA(StreamingIndicator):
+    """Short and long simple moving averages matching calculate_sma."""
+
+    def __init__(self, short_window: int, long_window: int):
+        super().__init__()
+        self._short = RollingMean(short_window)
+        self._long = RollingMean(long_window)
+        self.sma_short = math.nan
+        self.sma_long = math.nan
+
+    def peek(self, close: float):
+        """Return (sma_short, sma_long) if close were appended, without committing it."""
+        return self._short.peek(close), self._long.peek(close)
+
+    def current(self):
+        """Return (sma_short, sma_long) after the last committed candle."""
+        return self.sma_short, self.sma_long
+
+    def update(self, close: float):
+        """Commit a closed candle and return (sma_short, sma_long)."""
+        self.sma_short = self._short.update(close)
+        self.sma_long = self._long.update(close)
+        return self.sma_short, self.sma_long
+
+def live_value(registry: dict, key, factory, data, forming: bool = True):
+    """
+    Return an indicator's value for the newest kline of a live window.
+
+    The last row of a get_klines response is the still-forming candle, so
+    by default every earlier row is treated as closed: closed candles not yet
+    seen are committed to the cached indicator, and the forming one is only
+    peeked. Windows built from closed stream candles pass forming=False.
+
+    Parameters:
+    - registry: Dictionary holding one indicator per key between runs.
+    - key: Registry key, e.g. (symbol, interval, parameters).
+    - factory: Callable building a fresh indicator.
+    - data: DataFrame with 'open_time' and 'close' columns, oldest first.
+    - forming: Whether the last row is a still-open candle.
+
+    Returns:
+    - The indicator value for the last row.
+    """
+    open_times = data['open_time'].to_numpy()
+    closes = data['close'].to_numpy(dtype=float)
+    closed = len(closes) - 1 if forming else len(closes)
+    indicator = registry.get(key)
+    if indicator is None or not indicator.catch_up(open_times[:closed], closes[:closed]):
+        indicator = factory().seed(closes[:closed], open_times[:closed])
+        registry[key] = indicator
+    return indicator.peek(closes[-1]) if forming else indicator.current()
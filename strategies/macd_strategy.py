@@ -2,37 +2,13 @@ import logging
 from binance.client import Client
 import pandas as pd
 import numpy as np
-from orders.orders_manager import place_order
+from orders.orders_manager import submit_order
+from logs.metrics import span
+from market.kline_cache import fetch_historical_data
+from strategies.indicators import StreamingMACD, live_value
 
-def fetch_historical_data(client: Client, symbol: str, interval: str, limit: int):
-    """
-    Fetch historical candlestick data from Binance.
-
-    Parameters:
-    - client: Binance Client object.
-    - symbol: Trading pair (e.g., BTCUSDT).
-    - interval: Kline interval (e.g., 1h, 4h, 1d).
-    - limit: Number of candles to fetch.
-
-    Returns:
-    - DataFrame containing historical data.
-    """
-    try:
-        klines = client.get_klines(symbol=symbol, interval=interval, limit=limit)
-        data = pd.DataFrame(klines, columns=[
-            'open_time', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'number_of_trades',
-            'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-        ])
-        data['close'] = data['close'].astype(float)
-        data['open'] = data['open'].astype(float)
-        data['high'] = data['high'].astype(float)
-        data['low'] = data['low'].astype(float)
-        data['volume'] = data['volume'].astype(float)
-        return data
-    except Exception as e:
-        logging.error(f"Failed to fetch historical data: {e}")
-        raise
+# Streaming indicators kept warm between runs, keyed by symbol/interval/parameters
+_live_indicators = {}
 
 def calculate_macd(data: pd.DataFrame, fast_period: int, slow_period: int, signal_period: int):
     """
@@ -53,7 +29,7 @@ def calculate_macd(data: pd.DataFrame, fast_period: int, slow_period: int, signa
     data['signal_line'] = data['macd'].ewm(span=signal_period, adjust=False).mean()
     return data
 
-def execute_macd_strategy(client: Client, symbol: str, config: dict):
+def execute_macd_strategy(client: Client, symbol: str, config: dict, data: pd.DataFrame = None):
     """
     Execute MACD trading strategy.
 
@@ -61,34 +37,44 @@ def execute_macd_strategy(client: Client, symbol: str, config: dict):
     - client: Binance Client object.
     - symbol: Trading pair (e.g., BTCUSDT).
     - config: Dictionary containing strategy configuration.
+    - data: Optional window of closed candles (e.g. from the kline stream);
+      fetched over REST when omitted.
     """
     try:
         logging.info(f"Executing MACD strategy for {symbol}...")
 
-        # Fetch historical data
-        data = fetch_historical_data(client, symbol, config['interval'], config['data_limit'])
+        # Fetch historical data unless closed candles were supplied
+        forming = data is None
+        if forming:
+            with span('fetch', symbol, 'MACD'):
+                data = fetch_historical_data(client, symbol, config['interval'], config['data_limit'],
+                                             columns=['open_time', 'close'])
 
         # Validate sufficient data for MACD calculation
         if len(data) < max(config['fast_period'], config['slow_period'], config['signal_period']):
             logging.error("Not enough data to calculate MACD. Consider increasing 'data_limit'.")
             return
 
-        # Calculate MACD and Signal Line
-        data = calculate_macd(data, config['fast_period'], config['slow_period'], config['signal_period'])
-
-        # Get the latest MACD and Signal Line values
-        latest_macd = data['macd'].iloc[-1]
-        latest_signal = data['signal_line'].iloc[-1]
+        # Update the streaming MACD with new closed candles and read the latest values
+        periods = (config['fast_period'], config['slow_period'], config['signal_period'])
+        key = (symbol, config['interval']) + periods
+        with span('indicator', symbol, 'MACD'):
+            latest_macd, latest_signal = live_value(_live_indicators, key, lambda: StreamingMACD(*periods), data, forming)
 
         # Make trading decision
-        if latest_macd > latest_signal:
-            logging.info(f"MACD ({latest_macd}) crossed above Signal Line ({latest_signal}). Buying {symbol}.")
-            place_order(client, symbol, "BUY", config['order_size'])
-        elif latest_macd < latest_signal:
-            logging.info(f"MACD ({latest_macd}) crossed below Signal Line ({latest_signal}). Selling {symbol}.")
-            place_order(client, symbol, "SELL", config['order_size'])
-        else:
-            logging.info("No clear MACD signal. Holding position.")
+        with span('decision', symbol, 'MACD'):
+            side = None
+            if latest_macd > latest_signal:
+                logging.info(f"MACD ({latest_macd}) crossed above Signal Line ({latest_signal}). Buying {symbol}.")
+                side = "BUY"
+            elif latest_macd < latest_signal:
+                logging.info(f"MACD ({latest_macd}) crossed below Signal Line ({latest_signal}). Selling {symbol}.")
+                side = "SELL"
+            else:
+                logging.info("No clear MACD signal. Holding position.")
+        if side is not None:
+            with span('order_submit', symbol, 'MACD'):
+                submit_order(client, symbol, side, config['order_size'], reference_price=data['close'].iloc[-1])
 
     except Exception as e:
         logging.error(f"Error in MACD strategy: {e}")
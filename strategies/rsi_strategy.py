@@ -1,32 +1,13 @@
 import logging
 from binance.client import Client
 import pandas as pd
+from orders.orders_manager import submit_order
+from logs.metrics import span
+from market.kline_cache import fetch_historical_data
+from strategies.indicators import StreamingRSI, live_value
 
-def fetch_historical_data(client: Client, symbol: str, interval: str, limit: int):
-    """
-    Fetch historical candlestick data from Binance.
-
-    Parameters:
-    - client: Binance Client object.
-    - symbol: Trading pair (e.g., BTCUSDT).
-    - interval: Kline interval (e.g., 1h, 4h, 1d).
-    - limit: Number of candles to fetch.
-
-    Returns:
-    - DataFrame containing historical data.
-    """
-    try:
-        klines = client.get_klines(symbol=symbol, interval=interval, limit=limit)
-        data = pd.DataFrame(klines, columns=[
-            'open_time', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'number_of_trades',
-            'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-        ])
-        data['close'] = data['close'].astype(float)
-        return data
-    except Exception as e:
-        logging.error(f"Failed to fetch historical data: {e}")
-        raise
+# Streaming indicators kept warm between runs, keyed by symbol/interval/parameters
+_live_indicators = {}
 
 def calculate_rsi(data: pd.DataFrame, period: int):
     """
@@ -51,7 +32,7 @@ def calculate_rsi(data: pd.DataFrame, period: int):
 
     return data
 
-def execute_rsi_strategy(client: Client, symbol: str, config: dict):
+def execute_rsi_strategy(client: Client, symbol: str, config: dict, data: pd.DataFrame = None):
     """
     Execute RSI trading strategy.
 
@@ -59,33 +40,43 @@ def execute_rsi_strategy(client: Client, symbol: str, config: dict):
     - client: Binance Client object.
     - symbol: Trading pair (e.g., BTCUSDT).
     - config: Dictionary containing strategy configuration.
+    - data: Optional window of closed candles (e.g. from the kline stream);
+      fetched over REST when omitted.
     """
     try:
         logging.info(f"Executing RSI strategy for {symbol}...")
 
-        # Fetch historical data
-        data = fetch_historical_data(client, symbol, config['interval'], config['data_limit'])
+        # Fetch historical data unless closed candles were supplied
+        forming = data is None
+        if forming:
+            with span('fetch', symbol, 'RSI'):
+                data = fetch_historical_data(client, symbol, config['interval'], config['data_limit'],
+                                             columns=['open_time', 'close'])
 
         # Validate sufficient data for RSI calculation
         if len(data) < config['rsi_period']:
             logging.error("Not enough data to calculate RSI. Consider increasing 'data_limit'.")
             return
 
-        # Calculate RSI
-        data = calculate_rsi(data, config['rsi_period'])
-
-        # Get the latest RSI value
-        latest_rsi = data['rsi'].iloc[-1]
+        # Update the streaming RSI with new closed candles and read the latest value
+        key = (symbol, config['interval'], config['rsi_period'])
+        with span('indicator', symbol, 'RSI'):
+            latest_rsi = live_value(_live_indicators, key, lambda: StreamingRSI(config['rsi_period']), data, forming)
 
         # Make trading decision
-        if latest_rsi < config['rsi_oversold']:
-            logging.info(f"RSI ({latest_rsi}) below {config['rsi_oversold']}. Buying {symbol}.")
-            place_order(client, symbol, "BUY", config['order_size'])
-        elif latest_rsi > config['rsi_overbought']:
-            logging.info(f"RSI ({latest_rsi}) above {config['rsi_overbought']}. Selling {symbol}.")
-            place_order(client, symbol, "SELL", config['order_size'])
-        else:
-            logging.info(f"RSI ({latest_rsi}) neutral. Holding position.")
+        with span('decision', symbol, 'RSI'):
+            side = None
+            if latest_rsi < config['rsi_oversold']:
+                logging.info(f"RSI ({latest_rsi}) below {config['rsi_oversold']}. Buying {symbol}.")
+                side = "BUY"
+            elif latest_rsi > config['rsi_overbought']:
+                logging.info(f"RSI ({latest_rsi}) above {config['rsi_overbought']}. Selling {symbol}.")
+                side = "SELL"
+            else:
+                logging.info(f"RSI ({latest_rsi}) neutral. Holding position.")
+        if side is not None:
+            with span('order_submit', symbol, 'RSI'):
+                submit_order(client, symbol, side, config['order_size'], reference_price=data['close'].iloc[-1])
 
     except Exception as e:
         logging.error(f"Error in RSI strategy: {e}")
@@ -0,0 +1,103 @@
+import os
+import json
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from binance.client import Client
+from market.kline_cache import kline_cache
+from market.rate_limiter import RateLimitedClient, WeightBudget, DEFAULT_WEIGHT_LIMIT
+from strategies.batch_indicators import batch_rsi, batch_macd, batch_sma, close_matrix
+
+def scan_frames(frames: dict, config: dict):
+    """
+    Evaluate every indicator and strategy signal on the newest bar of each symbol.
+
+    Parameters:
+    - frames: {symbol: DataFrame with open_time and close}, oldest first.
+    - config: Dictionary containing strategy configuration.
+
+    Returns:
+    - DataFrame indexed by symbol with close, rsi, macd, signal_line,
+      sma_short, sma_long and the RSI/MACD/SMA signals ('BUY', 'SELL' or missing).
+    """
+    symbols, _, close = close_matrix(frames)
+    if not symbols:
+        return pd.DataFrame()
+    # Newest bar of every symbol (rows may end at different bars)
+    valid = ~np.isnan(close)
+    last = close.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    rows = np.arange(len(symbols))
+
+    def latest(matrix):
+        return matrix[rows, last]
+
+    macd, signal_line = batch_macd(close, config['fast_period'], config['slow_period'], config['signal_period'])
+    result = pd.DataFrame({
+        'close': latest(close),
+        'rsi': latest(batch_rsi(close, config['rsi_period'])),
+        'macd': latest(macd),
+        'signal_line': latest(signal_line),
+        'sma_short': latest(batch_sma(close, config['short_window'])),
+        'sma_long': latest(batch_sma(close, config['long_window'])),
+    }, index=pd.Index(symbols, name='symbol'))
+    result['RSI'] = np.where(result['rsi'] < config['rsi_oversold'], 'BUY',
+                             np.where(result['rsi'] > config['rsi_overbought'], 'SELL', None))
+    result['MACD'] = np.where(result['macd'] > result['signal_line'], 'BUY',
+                              np.where(result['macd'] < result['signal_line'], 'SELL', None))
+    result['SMA'] = np.where(result['sma_short'] > result['sma_long'], 'BUY',
+                             np.where(result['sma_short'] < result['sma_long'], 'SELL', None))
+    return result
+
+def scan(client, symbols: list, config: dict):
+    """
+    Scan a symbol universe in one batched indicator pass.
+
+    Windows of config['data_limit'] klines come from the shared kline cache
+    (fetched concurrently, config['max_workers'] threads); the newest row is
+    the forming candle, as in the live strategies.
+
+    Parameters:
+    - client: Binance Client object (ideally a RateLimitedClient).
+    - symbols: Trading pairs to scan.
+    - config: Dictionary containing strategy configuration.
+
+    Returns:
+    - DataFrame from scan_frames; symbols whose fetch failed are logged and left out.
+    """
+    def fetch(symbol):
+        try:
+            window = kline_cache.get_window(client, symbol, config['interval'], config['data_limit'])
+            return symbol, pd.DataFrame({'open_time': window['open_time'], 'close': window['close']})
+        except Exception as e:
+            logging.error(f"Failed to fetch {symbol} for the scan: {e}")
+            return symbol, None
+
+    with ThreadPoolExecutor(max_workers=config.get('max_workers', 8)) as executor:
+        frames = {symbol: frame for symbol, frame in executor.map(fetch, symbols) if frame is not None}
+    return scan_frames(frames, config)
+
+def main(argv=None):
+    """Command-line entry point: python -m strategies.scanner --symbols BTCUSDT ETHUSDT"""
+    parser = argparse.ArgumentParser(description="Scan a symbol universe with batched indicators.")
+    parser.add_argument('--symbols', nargs='+', required=True)
+    parser.add_argument('--config', default='config/params.json', help="Strategy configuration file.")
+    parser.add_argument('--interval', help="Override the configured kline interval.")
+    parser.add_argument('--api-url', help="Override the REST base URL (e.g. a local mock exchange).")
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as file:
+        config = json.load(file)
+    config.setdefault('short_window', 20)
+    config.setdefault('long_window', 50)
+    if args.interval:
+        config['interval'] = args.interval
+    client = Client(os.getenv("BINANCE_API_KEY"), os.getenv("BINANCE_SECRET_KEY"), ping=False)
+    if args.api_url:
+        client.API_URL = args.api_url
+    client = RateLimitedClient(client, WeightBudget(config.get('weight_limit', DEFAULT_WEIGHT_LIMIT)))
+    print(scan(client, [symbol.upper() for symbol in args.symbols], config).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,13 @@
 import logging
 from binance.client import Client
 import pandas as pd
+from orders.orders_manager import submit_order
+from logs.metrics import span
+from market.kline_cache import fetch_historical_data
+from strategies.indicators import StreamingSMA, live_value
 
-def fetch_historical_data(client: Client, symbol: str, interval: str, limit: int):
-    """
-    Fetch historical candlestick data from Binance.
-
-    Parameters:
-    - client: Binance Client object.
-    - symbol: Trading pair (e.g., BTCUSDT).
-    - interval: Kline interval (e.g., 1h, 4h, 1d).
-    - limit: Number of candles to fetch.
-
-    Returns:
-    - DataFrame containing historical data.
-    """
-    try:
-        klines = client.get_klines(symbol=symbol, interval=interval, limit=limit)
-        data = pd.DataFrame(klines, columns=[
-            'open_time', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'number_of_trades',
-            'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-        ])
-        data['close'] = data['close'].astype(float)
-        return data
-    except Exception as e:
-        logging.error(f"Failed to fetch historical data: {e}")
-        raise
+# Streaming indicators kept warm between runs, keyed by symbol/interval/parameters
+_live_indicators = {}
 
 def calculate_sma(data: pd.DataFrame, short_window: int, long_window: int):
     """
@@ -44,7 +25,7 @@ def calculate_sma(data: pd.DataFrame, short_window: int, long_window: int):
     data['sma_long'] = data['close'].rolling(window=long_window).mean()
     return data
 
-def execute_sma_strategy(client: Client, symbol: str, config: dict):
+def execute_sma_strategy(client: Client, symbol: str, config: dict, data: pd.DataFrame = None):
     """
     Execute SMA trading strategy.
 
@@ -52,34 +33,44 @@ def execute_sma_strategy(client: Client, symbol: str, config: dict):
     - client: Binance Client object.
     - symbol: Trading pair (e.g., BTCUSDT).
     - config: Dictionary containing strategy configuration.
+    - data: Optional window of closed candles (e.g. from the kline stream);
+      fetched over REST when omitted.
     """
     try:
         logging.info(f"Executing SMA strategy for {symbol}...")
 
-        # Fetch historical data
-        data = fetch_historical_data(client, symbol, config['interval'], config['data_limit'])
+        # Fetch historical data unless closed candles were supplied
+        forming = data is None
+        if forming:
+            with span('fetch', symbol, 'SMA'):
+                data = fetch_historical_data(client, symbol, config['interval'], config['data_limit'],
+                                             columns=['open_time', 'close'])
 
         # Validate sufficient data for SMA calculation
         if len(data) < max(config['short_window'], config['long_window']):
             logging.error("Not enough data to calculate SMAs. Consider increasing 'data_limit'.")
             return
 
-        # Calculate SMAs
-        data = calculate_sma(data, config['short_window'], config['long_window'])
-
-        # Get the latest SMA values
-        latest_sma_short = data['sma_short'].iloc[-1]
-        latest_sma_long = data['sma_long'].iloc[-1]
+        # Update the streaming SMAs with new closed candles and read the latest values
+        windows = (config['short_window'], config['long_window'])
+        key = (symbol, config['interval']) + windows
+        with span('indicator', symbol, 'SMA'):
+            latest_sma_short, latest_sma_long = live_value(_live_indicators, key, lambda: StreamingSMA(*windows), data, forming)
 
         # Make trading decision
-        if latest_sma_short > latest_sma_long:
-            logging.info(f"Short SMA ({latest_sma_short}) crossed above Long SMA ({latest_sma_long}). Buying {symbol}.")
-            place_order(client, symbol, "BUY", config['order_size'])
-        elif latest_sma_short < latest_sma_long:
-            logging.info(f"Short SMA ({latest_sma_short}) crossed below Long SMA ({latest_sma_long}). Selling {symbol}.")
-            place_order(client, symbol, "SELL", config['order_size'])
-        else:
-            logging.info("No clear SMA signal. Holding position.")
+        with span('decision', symbol, 'SMA'):
+            side = None
+            if latest_sma_short > latest_sma_long:
+                logging.info(f"Short SMA ({latest_sma_short}) crossed above Long SMA ({latest_sma_long}). Buying {symbol}.")
+                side = "BUY"
+            elif latest_sma_short < latest_sma_long:
+                logging.info(f"Short SMA ({latest_sma_short}) crossed below Long SMA ({latest_sma_long}). Selling {symbol}.")
+                side = "SELL"
+            else:
+                logging.info("No clear SMA signal. Holding position.")
+        if side is not None:
+            with span('order_submit', symbol, 'SMA'):
+                submit_order(client, symbol, side, config['order_size'], reference_price=data['close'].iloc[-1])
 
     except Exception as e:
         logging.error(f"Error in SMA strategy: {e}")
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call
 import pandas as pd
 from strategies.rsi_strategy import calculate_rsi
 from strategies.macd_strategy import calculate_macd
@@ -68,3 +68,831 @@ def test_get_account_balance():
     }
     balance = get_account_balance(client_mock, 'BTC')
     assert balance == 0.5
+
+# Test vectorized backtest engine matches the per-bar loop
+def test_vectorized_simulator_matches_loop():
+    from backtest.simulator import simulate_strategy, simulate_strategy_vectorized
+    import numpy as np
+    rng = np.random.default_rng(7)
+    data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))})
+    config = {
+        'rsi_period': 14, 'rsi_oversold': 30, 'rsi_overbought': 70,
+        'fast_period': 12, 'slow_period': 26, 'signal_period': 9,
+        'short_window': 5, 'long_window': 20,
+    }
+    for strategy in ('RSI', 'MACD', 'SMA'):
+        expected = simulate_strategy(data.copy(), strategy, config, engine='loop')
+        result = simulate_strategy_vectorized(data, strategy, config)
+        assert result['final_balance'] == expected
+        assert len(result['equity']) == len(data)
+        assert result['equity'].iloc[-1] == pytest.approx(expected)
+        assert len(result['trades']) > 0
+
+# Test parameter sweep over a shared-memory dataset
+def test_run_sweep_ranks_combinations():
+    from backtest.sweep import parse_grid, run_sweep
+    import numpy as np
+    rng = np.random.default_rng(3)
+    data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 200)))})
+    grids = dict([parse_grid('short_window=3,5'), parse_grid('long_window=10,20')])
+    results, stats = run_sweep(data, 'SMA', grids, {}, workers=2)
+    assert stats['combinations'] == 4
+    assert list(results['final_balance']) == sorted(results['final_balance'], reverse=True)
+    assert {'max_drawdown', 'trades'} <= set(results.columns)
+
+# Test columnar kline store round trip and time-range loading
+def test_kline_store_range_query(tmp_path):
+    from backtest.kline_store import write_klines, partition_path
+    from backtest.data_loader import load_historical_data
+    import numpy as np
+    open_time = 1706745600000 + np.arange(120, dtype=np.int64) * 3_600_000  # 2024-02-01, hourly
+    data = pd.DataFrame({'open_time': open_time, 'close': np.arange(120, dtype=float)})
+    write_klines(str(tmp_path), 'BTCUSDT', '1h', data)
+    path = partition_path(str(tmp_path), 'BTCUSDT', '1h')
+    loaded = load_historical_data(path, start=int(open_time[10]), end=int(open_time[20]), columns=['close'])
+    assert list(loaded.columns) == ['open_time', 'close']
+    assert loaded['close'].tolist() == list(range(10, 20))
+    assert loaded['open_time'].dtype == np.int64
+
+# Test streaming indicators reproduce the DataFrame indicators exactly
+def test_streaming_indicators_match_calculate_functions():
+    from strategies.indicators import StreamingRSI, StreamingMACD, StreamingSMA
+    import numpy as np
+    rng = np.random.default_rng(11)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 500)))
+    data = pd.DataFrame({'close': close})
+    data = calculate_sma(calculate_macd(calculate_rsi(data, 14), 12, 26, 9), 5, 20)
+
+    rsi, macd, sma = StreamingRSI(14), StreamingMACD(12, 26, 9), StreamingSMA(5, 20)
+    streamed = np.array([[rsi.update(x), *macd.update(x), *sma.update(x)] for x in close])
+    expected = data[['rsi', 'macd', 'signal_line', 'sma_short', 'sma_long']].to_numpy()
+    assert np.array_equal(streamed, expected, equal_nan=True)
+
+    seeded = StreamingMACD(12, 26, 9).seed(close[:-1])
+    assert seeded.peek(close[-1]) == (data['macd'].iloc[-1], data['signal_line'].iloc[-1])
+
+# Test kline stream dispatches closed candles once, in order
+def test_kline_stream_fires_on_closed_candles():
+    import asyncio
+    import json
+    from market.kline_stream import KlineStream
+    fired = []
+    stream = KlineStream(None, ['BTCUSDT'], '1m', 10, lambda symbol, data: fired.append((symbol, data['close'].tolist())))
+
+    def message(open_time, close, closed):
+        kline = {'t': open_time, 'T': open_time + 59999, 'o': '1', 'h': '1', 'l': '1', 'c': str(close), 'v': '1', 'x': closed}
+        return json.dumps({'stream': 'btcusdt@kline_1m', 'data': {'e': 'kline', 's': 'BTCUSDT', 'k': kline}})
+
+    async def feed():
+        await stream.handle_message(message(0, 100, False))
+        await stream.handle_message(message(0, 101, True))
+        await stream.handle_message(message(0, 101, True))
+        await stream.handle_message(message(60000, 102, True))
+
+    asyncio.run(feed())
+    assert fired == [('BTCUSDT', [101.0]), ('BTCUSDT', [101.0, 102.0])]
+    assert stream.latency_summary()['count'] == 2
+
+# Test strategies accept a window of closed candles without fetching
+def test_strategy_uses_supplied_closed_candles():
+    from strategies.sma_strategy import execute_sma_strategy
+    client_mock = MagicMock()
+    data = pd.DataFrame({'open_time': range(0, 600000, 60000), 'close': [float(x) for x in range(1, 11)]})
+    config = {'interval': '1m', 'data_limit': 10, 'short_window': 3, 'long_window': 5, 'order_size': 0.01}
+    execute_sma_strategy(client_mock, 'BTCUSDT', config, data)
+    client_mock.get_klines.assert_not_called()
+    assert client_mock.create_order.call_args.kwargs['side'] == 'BUY'
+
+# Test shared kline cache only fetches the delta after the first load
+def test_kline_cache_fetches_delta():
+    from market.kline_cache import KlineCache
+    klines = [[i * 60000, '1', '1', '1', str(i), '1', i * 60000 + 59999, '0', 1, '0', '0', '0'] for i in range(200)]
+    visible = 150
+    client_mock = MagicMock()
+
+    def get_klines(symbol, interval, limit, startTime=None):
+        rows = [k for k in klines[:visible] if startTime is None or k[0] >= startTime]
+        return rows[:limit] if startTime is not None else rows[-limit:]
+
+    client_mock.get_klines.side_effect = get_klines
+    cache = KlineCache(max_age=60)
+    assert cache.get_window(client_mock, 'BTCUSDT', '1m', 100)['close'][-1] == 149.0
+    cache.get_window(client_mock, 'BTCUSDT', '1m', 50)
+    assert client_mock.get_klines.call_count == 1
+
+    cache.max_age = 0
+    visible = 153
+    window = cache.get_window(client_mock, 'BTCUSDT', '1m', 100)
+    assert (window['open_time'] // 60000).tolist() == list(range(53, 153))
+    assert client_mock.get_klines.call_args.kwargs['startTime'] == 149 * 60000
+    assert cache.counters()['misses'] == 1 and cache.counters()['delta_fetches'] == 1
+
+# Test klines parse straight into the requested typed columns
+def test_parse_klines_typed_columns():
+    import numpy as np
+    from market.kline_cache import parse_klines
+    klines = [[i * 60000, '1.5', '2', '1', str(i + 0.25), '10', i * 60000 + 59999, '0', 1, '0', '0', '0'] for i in range(3)]
+    arrays = parse_klines(klines, ['open_time', 'close'], price_dtype=np.float32)
+    assert list(arrays) == ['open_time', 'close']
+    assert arrays['open_time'].dtype == np.int64 and arrays['close'].dtype == np.float32
+    assert arrays['close'].tolist() == [0.25, 1.25, 2.25]
+
+# Test request-weight budget spends estimated weight and syncs from headers
+def test_rate_limited_client_spends_weight():
+    from market.rate_limiter import RateLimitedClient, WeightBudget
+    client_mock = MagicMock()
+    client_mock.response.headers = {'x-mbx-used-weight-1m': '500'}
+    budget = WeightBudget(limit=1000, safety=1.0)
+    client = RateLimitedClient(client_mock, budget)
+    client.get_account()
+    client_mock.get_account.assert_called_once()
+    assert budget.tokens == pytest.approx(500, abs=1)
+
+    # Open orders of every symbol cost 80, one symbol's cost 6
+    client_mock.response = None
+    budget = WeightBudget(limit=1000, safety=1.0)
+    client = RateLimitedClient(client_mock, budget)
+    client.get_open_orders(symbol='BTCUSDT')
+    assert budget.tokens == pytest.approx(994, abs=1)
+    client.get_open_orders()
+    assert budget.tokens == pytest.approx(914, abs=1)
+
+# Test append-only trade journal rotates, compacts and reads back every trade
+def test_trade_journal_rotation_and_compaction(tmp_path):
+    from logs.trade_journal import TradeJournal
+    journal = TradeJournal(str(tmp_path / 'trading_log.csv'), max_bytes=500)
+    for i in range(40):
+        journal.append('BUY' if i % 2 else 'SELL', 'BTCUSDT', 0.01, 45000 + i, 10000 + i)
+    journal.close()
+    assert journal.archives() and not journal.segments()
+    trades = journal.read()
+    assert len(trades) == 40
+    assert trades['price'].tolist() == [45000 + i for i in range(40)]
+
+# Test running trade aggregates (VWAP and realized PnL)
+def test_trade_aggregates_incremental_stats(tmp_path):
+    from logs.trade_journal import TradeJournal
+    from logs.trade_aggregates import TradeAggregates
+    snapshot = str(tmp_path / 'aggregates.json')
+    journal = TradeJournal(str(tmp_path / 'trading_log.csv'), aggregates=TradeAggregates(snapshot))
+    journal.append('BUY', 'BTCUSDT', 1.0, 100.0, 0)
+    journal.append('BUY', 'BTCUSDT', 3.0, 200.0, 0)
+    journal.append('SELL', 'BTCUSDT', 2.0, 250.0, 0)
+    journal.close()
+    rows = {row['action']: row for row in journal.stats().per_symbol()}
+    assert rows['BUY']['vwap'] == 175.0
+    assert rows['BUY']['avg_price'] == 150.0
+    assert rows['SELL']['realized_pnl'] == 150.0
+
+    reloaded = TradeJournal(str(tmp_path / 'trading_log.csv'), aggregates=TradeAggregates(snapshot))
+    assert reloaded.stats().totals()['count'] == 3
+
+# Test portfolio valuation through the price graph (direct, via BTC, via USDT)
+def test_value_portfolio_resolves_intermediates():
+    from viewer.utils import value_portfolio
+    prices = {'BTCBRL': 300000.0, 'ETHBTC': 0.05, 'USDTBRL': 5.0, 'GALAUSDT': 0.02}
+    rows, total = value_portfolio({'BTC': 1, 'ETH': 2, 'GALA': 100, 'XYZ': 5, 'DUST': 0}, prices, 'BRL')
+    values = {asset: value for asset, _, value in rows}
+    assert values == {'BTC': 300000.0, 'ETH': 30000.0, 'GALA': 10.0, 'XYZ': None}
+    assert total == 330010.0
+
+# Test account mirror applies user data stream events without REST calls
+def test_account_mirror_serves_balances_from_events():
+    from orders.account_mirror import AccountMirror
+    client_mock = MagicMock()
+    client_mock.get_account.return_value = {'updateTime': 100, 'balances': [{'asset': 'BTC', 'free': '0.5', 'locked': '0'}]}
+    client_mock.get_open_orders.return_value = []
+    mirror = AccountMirror(client_mock)
+    mirror.resync()
+    mirror.connected = True
+    mirror.apply_event({'e': 'outboundAccountPosition', 'u': 50, 'B': [{'a': 'BTC', 'f': '9', 'l': '0'}]})
+    mirror.apply_event({'e': 'outboundAccountPosition', 'u': 150, 'B': [{'a': 'BTC', 'f': '0.75', 'l': '0'}]})
+    mirror.apply_event({'e': 'executionReport', 'i': 1, 's': 'BTCUSDT', 'S': 'BUY', 'o': 'LIMIT', 'X': 'NEW',
+                        'p': '100', 'q': '1', 'z': '0'})
+    assert get_account_balance(client_mock, 'BTC', mirror) == 0.75
+    assert client_mock.get_account.call_count == 1
+    assert 1 in mirror.open_orders
+    mirror.apply_event({'e': 'executionReport', 'i': 1, 's': 'BTCUSDT', 'S': 'BUY', 'o': 'LIMIT', 'X': 'FILLED',
+                        'p': '100', 'q': '1', 'z': '1'})
+    assert mirror.open_orders == {}
+    assert mirror.metrics()['staleness_seconds'] < 5
+
+# Test exchange filters round orders and reject them locally before any request
+def test_symbol_rules_round_and_validate():
+    from orders.symbol_rules import SymbolRules, OrderValidationError
+    client_mock = MagicMock()
+    client_mock.get_exchange_info.return_value = {'symbols': [
+        {'symbol': 'BTCUSDT', 'filters': [
+            {'filterType': 'PRICE_FILTER', 'minPrice': '0.01', 'maxPrice': '1000000', 'tickSize': '0.01'},
+            {'filterType': 'LOT_SIZE', 'minQty': '0.00001', 'maxQty': '9000', 'stepSize': '0.00001'},
+            {'filterType': 'NOTIONAL', 'minNotional': '5', 'applyMinToMarket': True},
+        ]},
+        {'symbol': 'GALAUSDT', 'filters': [
+            {'filterType': 'PRICE_FILTER', 'minPrice': '0.00001', 'maxPrice': '1000', 'tickSize': '0.00001'},
+            {'filterType': 'LOT_SIZE', 'minQty': '1', 'maxQty': '9000000', 'stepSize': '1'},
+            {'filterType': 'MIN_NOTIONAL', 'minNotional': '5', 'applyToMarket': True},
+        ]},
+    ]}
+    rules = SymbolRules()
+    rules.refresh(client_mock)
+    rules.refresh(client_mock)
+    assert client_mock.get_exchange_info.call_count == 1
+
+    batch = rules.validate_orders(['BTCUSDT', 'GALAUSDT', 'GALAUSDT', 'ETHUSDT'],
+                                  [0.123456, 1000.7, 10, 1], [30000.004, 0.0234567, 0.02, 10])
+    assert batch['valid'].tolist() == [True, True, False, False]
+    assert batch['quantity'].tolist()[:2] == pytest.approx([0.12345, 1000])
+    assert batch['reason'].tolist()[2:] == ['notional below minimum', 'unknown symbol']
+
+    client_mock.create_order.return_value = {'orderId': '1'}
+    place_order(client_mock, 'GALAUSDT', 'BUY', 300.9, price=0.0234567, rules=rules)
+    assert client_mock.create_order.call_args.kwargs['quantity'] == '300'
+    assert client_mock.create_order.call_args.kwargs['price'] == '0.02346'
+    with pytest.raises(OrderValidationError):
+        place_order(client_mock, 'BTCUSDT', 'BUY', 0.00001, reference_price=30000, rules=rules)
+    assert client_mock.create_order.call_count == 1
+
+# Test the order pipeline returns at once and tracks fills from stream events
+def test_order_pipeline_tracks_fills_from_events():
+    import time
+    from orders.order_pipeline import OrderPipeline
+    from orders.symbol_rules import SymbolRules
+    client_mock = MagicMock()
+
+    def create_order(**kwargs):
+        time.sleep(0.2)
+        return {'orderId': 7, 'clientOrderId': kwargs['newClientOrderId'], 'status': 'NEW', 'executedQty': '0'}
+    client_mock.create_order.side_effect = create_order
+    pipeline = OrderPipeline(client_mock, poll_interval=60, rules=SymbolRules())
+
+    start = time.perf_counter()
+    client_order_id = pipeline.submit('BTCUSDT', 'BUY', 0.01)
+    assert time.perf_counter() - start < 0.1
+    # Events can outrun the REST acknowledgement
+    pipeline.on_event({'e': 'executionReport', 'c': client_order_id, 'i': 7, 'X': 'PARTIALLY_FILLED', 'z': '0.005'})
+    pipeline.close(timeout=0)
+    assert pipeline.order(client_order_id)['status'] == 'PARTIALLY_FILLED'
+    pipeline.on_event({'e': 'executionReport', 'c': client_order_id, 'i': 7, 'X': 'FILLED', 'z': '0.01'})
+    assert pipeline.pending() == []
+    # Finished orders leave the working set but stay available for lookups
+    assert client_order_id not in pipeline.orders and pipeline.order(client_order_id)['status'] == 'FILLED'
+    summary = pipeline.latency_summary()['BTCUSDT']
+    assert summary['ack']['count'] == 1 and summary['fill']['count'] == 1
+
+    # Without a stream, open orders are resolved by polling
+    client_mock.create_order.side_effect = None
+    client_mock.create_order.return_value = {'orderId': 8, 'status': 'NEW'}
+    client_mock.get_open_orders.return_value = []
+    client_mock.get_order.return_value = {'orderId': 8, 'status': 'FILLED', 'executedQty': '1'}
+    pipeline = OrderPipeline(client_mock, poll_interval=0.05, rules=SymbolRules())
+    client_order_id = pipeline.submit('ETHUSDT', 'SELL', 1, price=2000)
+    # close() keeps polling until the order is final, so its fill latency is recorded
+    pipeline.close(timeout=5)
+    assert pipeline.order(client_order_id)['status'] == 'FILLED'
+    assert pipeline.latency_summary()['ETHUSDT']['fill']['count'] == 1
+    assert client_mock.get_open_orders.call_args_list == [call(symbol='ETHUSDT')]
+
+# Test the mock exchange serves klines and fills orders placed through a real Client
+def test_mock_exchange_fills_market_order():
+    import numpy as np
+    from backtest.mock_exchange import MockExchange, mock_client
+    close = 100 + np.arange(200, dtype=float)
+    frame = pd.DataFrame({'open_time': 1_700_000_000_000 + np.arange(200) * 60_000, 'open': close,
+                          'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0})
+    exchange = MockExchange({'BTCUSDT': frame}, '1m', speed=1, warmup=100).start()
+    try:
+        client = mock_client(exchange.api_url)
+        klines = client.get_klines(symbol='BTCUSDT', interval='1m', limit=500)
+        # The closed candles, then the forming one
+        assert len(klines) == 101 and float(klines[-2][4]) == 199.0 and float(klines[-1][1]) == 200.0
+        order = place_order(client, 'BTCUSDT', 'BUY', 2, reference_price=199.0)
+        assert order['status'] == 'FILLED'
+        assert get_account_balance(client, 'BTC') == 2.0
+        assert get_account_balance(client, 'USDT') == 10000 - 2 * 199.0
+    finally:
+        exchange.stop()
+
+# Test the benchmark generator produces valid candles and compare flags real regressions only
+def test_bench_suite_compare_flags_regressions():
+    from benchmarks.bench_suite import synthetic_ohlcv, compare
+    data = synthetic_ohlcv(1000)
+    assert (data['high'] >= data[['open', 'close']].max(axis=1)).all()
+    assert (data['low'] <= data[['open', 'close']].min(axis=1)).all()
+    baseline = {'results': {'a@1': {'seconds': 1.0, 'peak_mb': 10}, 'b@1': {'seconds': 0.0010, 'peak_mb': 1},
+                            'c@1': {'seconds': 1.0, 'peak_mb': 10}}}
+    current = {'results': {'a@1': {'seconds': 1.5, 'peak_mb': 10}, 'b@1': {'seconds': 0.0015, 'peak_mb': 1},
+                           'c@1': {'seconds': 1.05, 'peak_mb': 10}}}
+    assert [row[0] for row in compare(baseline, current, threshold=0.1) if row[-1]] == ['a@1']
+
+# Test stage spans aggregate per stage/symbol/strategy and export as Prometheus text
+def test_stage_metrics_spans_and_export():
+    import time
+    import json
+    import urllib.request
+    from logs.metrics import StageMetrics
+    metrics = StageMetrics()
+    for _ in range(3):
+        with metrics.span('fetch', 'BTCUSDT', 'RSI'):
+            time.sleep(0.002)
+    with metrics.span('report'):
+        pass
+    rows = {row['stage']: row for row in metrics.summary()}
+    assert rows['fetch']['count'] == 3 and rows['fetch']['symbol'] == 'BTCUSDT'
+    assert 1 <= rows['fetch']['p50_ms'] <= rows['fetch']['max_ms'] and rows['fetch']['max_ms'] >= 2
+    text = metrics.prometheus_text()
+    assert 'bot_stage_latency_ms_count{stage="fetch",symbol="BTCUSDT",strategy="RSI"} 3' in text
+    server = metrics.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        assert urllib.request.urlopen(f"{url}/metrics").read().decode() == metrics.prometheus_text()
+        assert len(json.loads(urllib.request.urlopen(f"{url}/metrics.json").read())) == 2
+    finally:
+        server.shutdown()
+
+# Test the downloader pages concurrently into the store, reports gaps and resumes from its checkpoint
+def test_downloader_resumes_and_reports_gaps(tmp_path):
+    import numpy as np
+    from backtest.mock_exchange import MockExchange, mock_client
+    from backtest.downloader import download
+    from backtest.kline_store import read_klines
+    open_time = 1_706_700_000_000 + np.arange(3000, dtype=np.int64) * 60_000  # crosses 2024-02-01
+    open_time = np.delete(open_time, 1500)
+    close = np.linspace(100, 200, len(open_time))
+    frame = pd.DataFrame({'open_time': open_time, 'open': close, 'high': close, 'low': close, 'close': close,
+                          'volume': 1.0})
+    exchange = MockExchange({'BTCUSDT': frame}, '1m', warmup=len(frame)).start()
+    try:
+        client = mock_client(exchange.api_url)
+        end = int(open_time[-1]) + 60_000
+        result = download(client, str(tmp_path), ['BTCUSDT'], '1m', int(open_time[0]), end, workers=4)
+        assert result['candles'] == len(frame)
+        assert result['gaps']['BTCUSDT'] == [(int(open_time[1499]) + 60_000, 1)]
+        stored = read_klines(str(tmp_path), 'BTCUSDT', '1m')
+        assert np.array_equal(stored['open_time'].to_numpy(), open_time)
+        assert np.allclose(stored['close'].to_numpy(), close, rtol=0, atol=1e-8)
+
+        again = download(client, str(tmp_path), ['BTCUSDT'], '1m', int(open_time[0]), end, workers=4)
+        assert again['candles'] == 0 and again['skipped_units'] == 2
+    finally:
+        exchange.stop()
+
+# Test candle scheduler runs only due jobs and coalesces overruns
+def test_candle_scheduler_due_jobs_and_overruns():
+    import threading
+    from market.candle_scheduler import CandleScheduler
+    now = [600.0]
+    release = threading.Event()
+    ran = []
+    scheduler = CandleScheduler(offset=1.0, overrun='coalesce', clock=lambda: now[0])
+    scheduler.add_job('fast', '1m', lambda close_ms: (ran.append(close_ms), release.wait(5)))
+    scheduler.add_job('slow', '5m', lambda close_ms: None)
+    assert scheduler.next_wakeup() == 661.0
+
+    now[0] = 661.0
+    assert scheduler.tick() == ['fast']
+    for close in (720.0, 780.0):
+        now[0] = close + 1.0
+        assert scheduler.tick() == []
+    release.set()
+    for _ in range(500):
+        if scheduler.stats()['fast']['runs'] == 2:
+            break
+        threading.Event().wait(0.01)
+    scheduler.stop()
+    stats = scheduler.stats()
+    assert ran == [660000, 780000]
+    assert stats['fast']['overruns'] == 2 and stats['fast']['coalesced'] == 1
+    assert stats['slow']['runs'] == 0
+
+# Test incremental resampling matches the batch resampler over the same base candles
+def test_timeframe_resampler_matches_batch():
+    import numpy as np
+    from market.resampler import TimeframeResampler, resample_klines
+    from benchmarks.bench_suite import synthetic_ohlcv
+    base = synthetic_ohlcv(600, start='2024-01-01 00:07')
+    resampler = TimeframeResampler('1m', ['15m', '1h'], limit=100)
+    fired = []
+    for row in base.to_dict('records'):
+        fired += resampler.update('BTCUSDT', row)
+    assert fired.count('1h') == 10
+
+    for interval in ('15m', '1h'):
+        expected = resample_klines(base, interval, '1m')
+        streamed = resampler.frame('BTCUSDT', interval)
+        # The first candle only saw part of its base candles in both
+        assert (expected['open_time'] % 900_000 == 0).all()
+        assert np.allclose(streamed.to_numpy(), expected[streamed.columns].to_numpy())
+    hourly = resample_klines(base, '1h')
+    assert hourly['high'].iloc[1] == base['high'].iloc[53:113].max()
+    assert hourly['volume'].iloc[1] == pytest.approx(base['volume'].iloc[53:113].sum())
+
+# Test batched indicator kernels match the per-symbol functions, with late-listed symbols
+def test_batch_indicators_match_per_symbol():
+    import numpy as np
+    from strategies.batch_indicators import batch_rsi, batch_macd, batch_sma
+    from backtest.simulator import simulate_universe, simulate_strategy_vectorized
+    rng = np.random.default_rng(5)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (3, 400)), axis=1))
+    close[1, :150] = np.nan
+    rsi, (macd, signal), sma = batch_rsi(close, 14), batch_macd(close, 12, 26, 9), batch_sma(close, 20)
+    for row, first in ((0, 0), (1, 150), (2, 0)):
+        data = calculate_sma(calculate_macd(calculate_rsi(pd.DataFrame({'close': close[row, first:]}), 14), 12, 26, 9), 20, 50)
+        got = np.column_stack([rsi[row, first:], macd[row, first:], signal[row, first:], sma[row, first:]])
+        expected = data[['rsi', 'macd', 'signal_line', 'sma_short']].to_numpy()
+        assert np.allclose(got, expected, rtol=1e-10, atol=1e-10, equal_nan=True)
+        assert np.isnan(macd[row, :first]).all()
+
+    frames = {symbol: pd.DataFrame({'open_time': np.arange(400)[~np.isnan(close[i])],
+                                    'close': close[i][~np.isnan(close[i])]})
+              for i, symbol in enumerate(['AAA', 'BBB', 'CCC'])}
+    config = {'fast_period': 12, 'slow_period': 26, 'signal_period': 9}
+    results = simulate_universe(frames, 'MACD', config)
+    expected = simulate_strategy_vectorized(frames['BBB'], 'MACD', config)['final_balance']
+    assert results.loc['BBB', 'final_balance'] == pytest.approx(expected)
+
+# Test the portfolio backtest shares one cash balance across symbols
+def test_portfolio_shares_cash_across_symbols():
+    import numpy as np
+    from backtest.portfolio import run_portfolio
+    from backtest.simulator import simulate_strategy_vectorized
+    rng = np.random.default_rng(8)
+    frames = {}
+    for i, symbol in enumerate(['AAA', 'BBB', 'CCC']):
+        first = 100 if symbol == 'BBB' else 0
+        frames[symbol] = pd.DataFrame({'open_time': np.arange(first, 600) * 60_000,
+                                       'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 600 - first)))})
+    config = {'fast_period': 12, 'slow_period': 26, 'signal_period': 9, 'order_size': 1.0, 'initial_balance': 1e6}
+
+    # With ample cash every symbol trades exactly as it would on its own
+    result = run_portfolio(frames, 'MACD', config, workers=1)
+    for symbol, data in frames.items():
+        alone = simulate_strategy_vectorized(data, 'MACD', config)['trades']
+        trades = result['trades'][result['trades']['symbol'] == symbol]
+        assert trades['entry_time'].tolist() == data['open_time'].to_numpy()[alone['entry_bar']].tolist()
+    assert result['symbols']['skipped_entries'].sum() == 0
+    assert len(result['equity']) == 600 and result['equity'].iloc[0] == pytest.approx(1e6)
+
+    # Cash for a single position: entries overlapping an open one are skipped
+    tight = run_portfolio(frames, 'MACD', {**config, 'initial_balance': 150}, workers=1)
+    assert tight['symbols']['skipped_entries'].sum() > 0
+    assert len(tight['trades']) < len(result['trades'])
+    trades = tight['trades']
+    last_close = trades['symbol'].map({symbol: data['close'].iloc[-1] for symbol, data in frames.items()})
+    marked = trades['pnl'].fillna((last_close - trades['entry_price']) * trades['quantity'])
+    assert tight['final_balance'] == pytest.approx(150 + marked.sum())
+
+# Test the on-disk memo reuses indicators and results across runs
+def test_memo_reuses_indicators_and_results(tmp_path):
+    import numpy as np
+    from backtest.memo import MemoCache
+    from backtest.simulator import simulate_strategy_vectorized
+    rng = np.random.default_rng(9)
+    data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 500)))})
+    config = {'rsi_period': 14, 'rsi_oversold': 30, 'rsi_overbought': 70}
+    memo = MemoCache(str(tmp_path / 'memo'))
+
+    first = simulate_strategy_vectorized(data, 'RSI', config, memo)
+    assert memo.counters()['hits'] == 0
+    # Other thresholds reuse the RSI series; a repeat reuses the whole result
+    other = simulate_strategy_vectorized(data, 'RSI', {**config, 'rsi_oversold': 25}, memo)
+    assert memo.counters()['hits'] == 1
+    repeat = simulate_strategy_vectorized(data, 'RSI', {**config, 'symbols': ['BTCUSDT']}, MemoCache(str(tmp_path / 'memo')))
+    assert repeat['final_balance'] == first['final_balance']
+    assert repeat['equity'].equals(first['equity']) and repeat['trades'].equals(first['trades'])
+    assert other['final_balance'] == simulate_strategy_vectorized(data, 'RSI', {**config, 'rsi_oversold': 25})['final_balance']
+
+    counters = memo.counters()
+    assert counters['hit_rate'] == pytest.approx(1 / 4) and counters['bytes_saved'] > 0
+    small = MemoCache(str(tmp_path / 'small'), max_bytes=counters['bytes_written'] // 2)
+    simulate_strategy_vectorized(data, 'RSI', config, small)
+    simulate_strategy_vectorized(data, 'RSI', {**config, 'rsi_period': 7}, small)
+    assert small.counters()['evictions'] > 0
+    assert sum(path.stat().st_size for path in (tmp_path / 'small').iterdir()) <= small.max_bytes
+
+# Test the event engine charges costs, fills partially and fills limit orders
+def test_event_engine_costs_partial_fills_and_limits():
+    import numpy as np
+    from backtest.execution import execute_signals
+    from backtest.simulator import simulate_strategy_vectorized, simulate_strategy_events
+    rng = np.random.default_rng(10)
+    data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1000)))})
+    config = {'fast_period': 12, 'slow_period': 26, 'signal_period': 9}
+    # Without costs the events engine reproduces the vectorized one exactly
+    free, vectorized = simulate_strategy_events(data, 'MACD', config), simulate_strategy_vectorized(data, 'MACD', config)
+    assert free['final_balance'] == vectorized['final_balance']
+    assert free['equity'].equals(vectorized['equity'])
+    assert simulate_strategy_events(data, 'MACD', {**config, 'taker_fee': 0.001})['final_balance'] < free['final_balance']
+
+    close = np.array([10.0, 10.0, 11.0, 12.0, 11.0, 10.0])
+    buy = np.array([False, True, False, False, False, False])
+    sell = np.array([False, False, False, True, False, False])
+    fees = execute_signals(close, buy, sell, 1000, config={'taker_fee': 0.001})
+    assert fees['final_balance'] == pytest.approx(1000 / (10 * 1.001) * 12 * 0.999)
+    assert fees['costs']['fees'] == pytest.approx(1000 / 1.001 * 0.001 + 1000 / (10 * 1.001) * 12 * 0.001)
+
+    # At most half of a 20-unit bar volume per bar: the buy fills 10 + 10 units before the sell signal
+    partial = execute_signals(close, buy, sell, 1000, volume=np.full(6, 20.0), config={'max_participation': 0.5})
+    assert partial['fills']['quantity'].tolist() == [10.0, 10.0, 10.0, 10.0]
+    assert partial['orders'] == {'submitted': 2, 'filled': 1, 'partial': 1, 'unfilled': 0}
+    assert partial['final_balance'] == pytest.approx(1000 - 100 - 110 + 120 + 110)
+
+    # A buy limit 10% under the signal close fills at 9 on the next bar reaching it, paying the maker fee
+    limit = execute_signals(close, buy, sell, 1000, high=close + 2.5, low=close - 2.5,
+                            config={'order_type': 'limit', 'limit_offset': 0.1, 'maker_fee': 0.0002})
+    entry = limit['fills'].iloc[0]
+    assert (entry['bar'], entry['price'], entry['liquidity']) == (2, 9.0, 'maker')
+    assert limit['trades']['exit_price'].iloc[0] == pytest.approx(13.2)
+    assert limit['final_balance'] == pytest.approx(1000 / (9 * 1.0002) * 13.2 * 0.9998)
+
+# Test walk-forward folds and the stitched out-of-sample equity curve
+def test_walk_forward_folds_and_out_of_sample_curve():
+    import numpy as np
+    from backtest.walk_forward import make_folds, run_walk_forward
+    from backtest.simulator import simulate_strategy_vectorized
+    assert make_folds(100, 40, 20) == [(0, 40, 40, 60), (20, 60, 60, 80), (40, 80, 80, 100)]
+    assert make_folds(90, 40, 20, anchored=True)[-1] == (0, 80, 80, 90)
+    with pytest.raises(ValueError):
+        make_folds(100, 40, 20, step=10)
+
+    rng = np.random.default_rng(11)
+    data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 600)))})
+    grids = {'short_window': [3, 5], 'long_window': [10, 20]}
+    result = run_walk_forward(data, 'SMA', grids, {}, train=200, test=100, workers=2)
+    folds = result['folds']
+    assert len(folds) == 4 and result['stats']['signal_misses'] <= 2 * 4
+    assert len(result['equity']) == 400 and result['equity'].index[0] == 200
+
+    # The chosen set is the best on its train window, and test windows compound into the curve
+    train = data.iloc[0:200]
+    returns = {(s, l): simulate_strategy_vectorized(train, 'SMA', {'short_window': s, 'long_window': l})['final_balance']
+               for s in grids['short_window'] for l in grids['long_window']}
+    assert (folds.loc[1, 'short_window'], folds.loc[1, 'long_window']) == max(returns, key=returns.get)
+    assert result['equity'].iloc[-1] == pytest.approx(10000 * np.prod(1 + folds['test_return']))
+    assert (folds['seconds'] > 0).all()
+
+# Test batch indicators return warm-up NaNs when the window exceeds the history
+def test_batch_indicators_window_longer_than_history():
+    import numpy as np
+    from strategies.batch_indicators import batch_sma, batch_rsi
+    from backtest.simulator import simulate_universe
+    assert np.isnan(batch_sma(np.ones((2, 5)), 7)).all()
+    close = 100 + np.cumsum(np.random.default_rng(12).normal(0, 1, (2, 30)), axis=1)
+    expected = calculate_rsi(pd.DataFrame({'close': close[0]}), 40)['rsi'].to_numpy()
+    assert np.allclose(batch_rsi(close, 40)[0], expected, equal_nan=True)
+    frames = {symbol: pd.DataFrame({'open_time': np.arange(30), 'close': close[i]}) for i, symbol in enumerate(['AAA', 'BBB'])}
+    results = simulate_universe(frames, 'SMA', {'short_window': 20, 'long_window': 50})
+    assert (results['trades'] == 0).all() and (results['final_balance'] == 10000).all()
+
+# Test trade journal compacts rotated segments off the write path
+def test_trade_journal_compacts_off_the_write_path(tmp_path):
+    import threading
+    from logs.trade_journal import TradeJournal
+    journal = TradeJournal(str(tmp_path / 'trading_log.csv'), max_bytes=200)
+    release = threading.Event()
+    compact = journal.compact
+
+    def slow_compact():
+        release.wait(5)
+        return compact()
+    journal.compact = slow_compact
+    for i in range(10):
+        journal.append('BUY', 'BTCUSDT', 0.01, 45000 + i, 10000)
+    # Rotations happened while compaction was blocked, yet every append returned
+    assert journal.segments() and not journal.archives()
+    assert len(journal.read()) == 10
+    release.set()
+    journal.close()
+    assert journal.archives() and not journal.segments()
+    assert len(journal.read()) == 10
+
+# Test trade journal compaction keeps segments with unparseable timestamps
+def test_trade_journal_keeps_segments_with_bad_timestamps(tmp_path):
+    from logs.trade_journal import TradeJournal
+    journal = TradeJournal(str(tmp_path / 'trading_log.csv'))
+    (tmp_path / 'journal').mkdir()
+    (tmp_path / 'journal' / 'trading_log-1.csv').write_text(
+        "action,symbol,quantity,price,balance,timestamp\nBUY,BTCUSDT,0.01,45000,10000,2024-01-02 10:00:00\n")
+    (tmp_path / 'journal' / 'trading_log-2.csv').write_text(
+        "action,symbol,quantity,price,balance,timestamp\nSELL,BTCUSDT,0.01,46000,10010,not a time\n"
+        "BUY,ETHUSDT,1,2000,8010,2024-01-03 10:00:00\n")
+    assert journal.compact() == 1
+    assert [path.rsplit('/', 1)[-1] for path in journal.segments()] == ['trading_log-2.csv']
+    assert sorted(journal.read()['price'].tolist()) == [2000, 45000, 46000]
+
+# Test exchange filters are reloaded by one thread when many find them stale
+def test_symbol_rules_refresh_fetches_once_across_threads():
+    import threading
+    import time
+    from orders.symbol_rules import SymbolRules
+    rules = SymbolRules()
+    client = MagicMock()
+
+    def slow_exchange_info():
+        time.sleep(0.05)
+        return {'symbols': []}
+
+    client.get_exchange_info.side_effect = slow_exchange_info
+    threads = [threading.Thread(target=rules.refresh, args=(client,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.get_exchange_info.call_count == 1
+    rules.refresh(client, force=True)
+    assert client.get_exchange_info.call_count == 2
+
+# Test the downloader leaves units reaching into the future out of its checkpoint
+def test_downloader_checkpoints_only_past_units(tmp_path):
+    import time
+    from backtest.downloader import download, Checkpoint, partition_path
+    client = MagicMock()
+    client.get_klines.return_value = []
+    now = int(time.time() * 1000)
+    download(client, str(tmp_path), ['BTCUSDT'], '1d', now - 90 * 86_400_000, now + 86_400_000, workers=1)
+    checkpoint = Checkpoint(partition_path(str(tmp_path), 'BTCUSDT', '1d'))
+    assert checkpoint.done and all(unit_end <= now for _, unit_end in checkpoint.done)
+
+    first, _ = max(checkpoint.done)
+    checkpoint.mark_done(first, now)
+    checkpoint.mark_done(first, now + 1)
+    assert [unit for unit in checkpoint.done if unit[0] == first] == [(first, now + 1)]
+
+# Test volume-based execution costs refuse to run without bar volumes
+def test_execute_signals_requires_volume_for_participation():
+    import numpy as np
+    from backtest.execution import execute_signals
+    close = np.array([10.0, 11.0, 12.0])
+    buy, sell = np.array([True, False, False]), np.array([False, False, True])
+    for config in ({'max_participation': 0.05}, {'slippage': 0.05}):
+        with pytest.raises(ValueError):
+            execute_signals(close, buy, sell, 1000, config=config)
+    assert execute_signals(close, buy, sell, 1000, volume=np.full(3, 1e6), config={'max_participation': 0.05})['orders']['filled'] == 2
+
+# Test weekly jobs run at Binance's Monday week boundary
+def test_candle_scheduler_weeks_close_on_monday():
+    from market.candle_scheduler import last_close
+    monday = int(pd.Timestamp('2024-01-08', tz='UTC').value // 1_000_000)
+    assert last_close(monday + 3_600_000, 604_800_000) == monday
+    assert last_close(monday - 1, 604_800_000) == monday - 604_800_000
+    assert last_close(monday + 90_000, 60_000) == monday + 60_000
+
+# Test the budget syncs from each call's own response, not the client's latest one
+def test_rate_limited_client_reads_its_own_response_headers():
+    import threading
+    import requests
+    from market.rate_limiter import RateLimitedClient, WeightBudget
+
+    class SessionClient:
+        def __init__(self):
+            self.session = requests.Session()
+            self.response = None
+
+        def get_account(self, used):
+            response = requests.Response()
+            response.headers['x-mbx-used-weight-1m'] = str(used)
+            for hook in self.session.hooks['response']:
+                hook(response)
+            # Another thread's request lands in the shared attribute
+            self.response = MagicMock(headers={'x-mbx-used-weight-1m': '900'})
+
+    budget = WeightBudget(limit=1000, safety=1.0)
+    client = RateLimitedClient(SessionClient(), budget)
+    thread = threading.Thread(target=client.get_account, args=(300,))
+    thread.start()
+    thread.join()
+    assert budget.tokens == pytest.approx(700, abs=1)
+
+# Test kline cache counters stay exact when different keys are read concurrently
+def test_kline_cache_counters_across_threads():
+    import sys
+    import threading
+    from market.kline_cache import KlineCache
+    klines = [[i * 60000, '1', '1', '1', str(i), '1', i * 60000 + 59999, '0', 1, '0', '0', '0'] for i in range(10)]
+    client_mock = MagicMock()
+    client_mock.get_klines.return_value = klines
+    cache = KlineCache(max_age=60)
+
+    def read(symbol):
+        for _ in range(500):
+            cache.get_window(client_mock, symbol, '1m', 5)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=read, args=(f"S{i}USDT",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert cache.counters()['misses'] == 8 and cache.counters()['hits'] == 8 * 499
+
+# Test a reconnect backfill pages through the gap and fires each missed candle with the window ending at it
+def test_kline_stream_backfills_gap_candle_by_candle(monkeypatch):
+    import asyncio
+    from market import kline_stream
+    from market.kline_stream import KlineStream, rest_kline_to_row
+    monkeypatch.setattr(kline_stream, 'MAX_BACKFILL_PAGE', 2)
+    klines = [[i * 60000, '1', '1', '1', str(100 + i), '1', i * 60000 + 59999] for i in range(7)]
+    client_mock = MagicMock()
+    client_mock.get_klines.side_effect = lambda symbol, interval, startTime, limit: \
+        [k for k in klines if k[0] >= startTime][:limit]
+    client_mock.get_server_time.return_value = {'serverTime': 7 * 60000}
+    fired = []
+    stream = KlineStream(client_mock, ['BTCUSDT'], '1m', 10, lambda symbol, data: fired.append(data['close'].iloc[-1]))
+    stream.candles['BTCUSDT'].append(rest_kline_to_row(klines[0]))
+    asyncio.run(stream._resync())
+    assert fired == [101.0, 102.0, 103.0, 104.0, 105.0, 106.0]
+    assert client_mock.get_klines.call_count == 4
+
+# Test symbols split into base and quote on the longest known quote asset
+def test_split_symbol_longest_quote():
+    from market.symbols import split_symbol
+    assert split_symbol('BTCFDUSD') == ('BTC', 'FDUSD')
+    assert split_symbol('GALABRL') == ('GALA', 'BRL')
+    assert split_symbol('USDT') is None
+
+# Test account mirror ignores balance deltas the REST snapshot already includes
+def test_account_mirror_skips_balance_updates_before_snapshot():
+    from orders.account_mirror import AccountMirror
+    client_mock = MagicMock()
+    client_mock.get_account.return_value = {'updateTime': 100, 'balances': [{'asset': 'USDT', 'free': '50', 'locked': '0'}]}
+    client_mock.get_open_orders.return_value = []
+    mirror = AccountMirror(client_mock)
+    mirror.resync()
+    mirror.apply_event({'e': 'balanceUpdate', 'E': 90, 'a': 'USDT', 'd': '50'})
+    mirror.apply_event({'e': 'balanceUpdate', 'E': 110, 'a': 'USDT', 'd': '25'})
+    assert mirror.get_balance('USDT') == 75.0
+
+# Test the pipeline rejects only exchange errors and reconciles submissions that timed out
+def test_order_pipeline_reconciles_unknown_submissions():
+    import time
+    import requests
+    from binance.exceptions import BinanceAPIException
+    from orders.order_pipeline import OrderPipeline
+    from orders.symbol_rules import SymbolRules
+    response = MagicMock(status_code=400, text='{"code": -2013, "msg": "Order does not exist."}')
+    unknown = BinanceAPIException(response, 400, response.text)
+    client_mock = MagicMock()
+    client_mock.get_open_orders.return_value = []
+    pipeline = OrderPipeline(client_mock, poll_interval=60, rules=SymbolRules())
+    client_mock.create_order.side_effect = unknown
+    rejected = pipeline.submit('BTCUSDT', 'BUY', 1)
+    while pipeline.order(rejected)['status'] == 'PENDING':
+        time.sleep(0.01)
+    client_mock.create_order.side_effect = requests.ReadTimeout('timed out')
+    accepted = pipeline.submit('BTCUSDT', 'BUY', 1)
+    lost = pipeline.submit('BTCUSDT', 'BUY', 1)
+    pipeline._executor.shutdown(wait=True)
+    assert pipeline.order(rejected)['status'] == 'REJECTED'
+    assert pipeline.order(accepted)['status'] == 'PENDING' and pipeline.order(lost)['status'] == 'PENDING'
+
+    def get_order(symbol, origClientOrderId):
+        if origClientOrderId == lost:
+            raise unknown
+        return {'orderId': 9, 'status': 'NEW', 'executedQty': '0'}
+
+    client_mock.get_order.side_effect = get_order
+    pipeline.poll()
+    assert pipeline.order(accepted)['status'] == 'NEW' and pipeline.order(accepted)['order_id'] == 9
+    assert pipeline.order(lost)['status'] == 'REJECTED'
+    pipeline.close(timeout=0)
+
+# Test the candle scheduler refuses a second job under an existing name
+def test_candle_scheduler_rejects_duplicate_job_names():
+    from market.candle_scheduler import CandleScheduler
+    scheduler = CandleScheduler(clock=lambda: 600.0)
+    scheduler.add_job('RSI@15m[BTCUSDT]', '15m', lambda close_ms: None)
+    scheduler.add_job('RSI@15m[ETHUSDT]', '15m', lambda close_ms: None)
+    with pytest.raises(ValueError):
+        scheduler.add_job('RSI@15m[BTCUSDT]', '15m', lambda close_ms: None)
+    scheduler.stop()
+
+# Test the events engine reuses a known data fingerprint instead of hashing the closes again
+def test_simulate_strategy_events_uses_given_digest(tmp_path, monkeypatch):
+    from backtest import simulator
+    from backtest.memo import MemoCache, fingerprint
+    from benchmarks.bench_suite import synthetic_ohlcv
+    data = synthetic_ohlcv(500)
+    config = {'rsi_period': 14, 'rsi_oversold': 30, 'rsi_overbought': 70}
+    digest = fingerprint(data['close'].to_numpy(dtype='float64'))
+    expected = simulator.simulate_strategy_events(data, 'RSI', config)['final_balance']
+    monkeypatch.setattr(simulator, 'fingerprint', MagicMock(side_effect=AssertionError('closes hashed again')))
+    memo = MemoCache(str(tmp_path / 'memo'))
+    assert simulator.simulate_strategy_events(data, 'RSI', config, memo, digest)['final_balance'] == expected
+    assert memo.counters()['stores'] > 0
+
+# Test a zero price is handled as a limit order everywhere, never sent as a market order
+def test_place_order_zero_price_is_a_limit_order():
+    from binance.client import Client
+    from orders.symbol_rules import SymbolRules, OrderValidationError
+    client_mock = MagicMock()
+    client_mock.get_exchange_info.return_value = {'symbols': [{'symbol': 'BTCUSDT', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'tickSize': '0.01', 'minPrice': '0.01', 'maxPrice': '1000000'}]}]}
+    with pytest.raises(OrderValidationError):
+        place_order(client_mock, 'BTCUSDT', 'BUY', 1, price=0, rules=SymbolRules())
+    client_mock.create_order.assert_not_called()
+    # Without filters for the symbol the order goes out unvalidated, still as a limit order
+    place_order(client_mock, 'ETHUSDT', 'BUY', 1, price=0, rules=SymbolRules())
+    assert client_mock.create_order.call_args.kwargs['type'] == Client.ORDER_TYPE_LIMIT
@@ -22,3 +22,9 @@ class CriptoBot:
         """
         ticker = self.client.get_ticker(symbol=pair)
         return float(ticker["lastPrice"]), float(ticker["priceChangePercent"])
+
+    def get_all_prices(self):
+        """
+        Obtém o último preço de todos os pares em uma única requisição.
+        """
+        return {ticker["symbol"]: float(ticker["price"]) for ticker in self.client.get_all_tickers()}
@@ -1,65 +1,71 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime  # Para pegar a hora atual
 from bot import CriptoBot
-from utils import convert_to_brl
+from utils import value_portfolio
+
+# Cliente reutilizado entre atualizações (criado na primeira busca)
+bot = None
+# Resultados das buscas em segundo plano, consumidos pela thread da interface
+results = queue.Queue()
+refresh_job = None
+
+def fetch_portfolio(selected_currency):
+    """
+    Busca saldos e um snapshot único de preços fora da thread da interface.
+    Custa duas requisições por atualização, independente do número de ativos.
+    """
+    global bot
+    try:
+        if bot is None:
+            bot = CriptoBot()
+        balances = bot.get_balance()
+        prices = bot.get_all_prices()
+        results.put((selected_currency, value_portfolio(balances, prices, selected_currency), None))
+    except Exception as e:
+        results.put((selected_currency, None, e))
 
 def update_portfolio():
-    bot = CriptoBot()
+    global refresh_job
+    if refresh_job is not None:
+        root.after_cancel(refresh_job)
+        refresh_job = None
 
     # Exibir mensagem de carregamento
     update_button.config(state=tk.DISABLED, text="Carregando...")
-    root.update_idletasks()  # Atualiza a interface antes de processar
 
-    balances = bot.get_balance()
-    selected_currency = currency_combo.get()
+    threading.Thread(target=fetch_portfolio, args=(currency_combo.get(),), daemon=True).start()
+    root.after(100, show_portfolio)
+
+def show_portfolio():
+    global refresh_job
+    try:
+        selected_currency, portfolio, error = results.get_nowait()
+    except queue.Empty:
+        root.after(100, show_portfolio)
+        return
 
     # Limpar a área de exibição
     portfolio_text.delete(1.0, tk.END)
     portfolio_text.insert(tk.END, f"Seu Portfólio (valores em {selected_currency}):\n\n")
 
-    try:
-        total_value = 0  # Para somar o valor total do portfólio
-
-        for asset, amount in balances.items():
-            if amount > 0:
-                price = 0  # Valor padrão para moedas sem conversão
-
-                # Determinar o par para conversão
-                try:
-                    if asset == selected_currency:
-                        price = 1  # Exemplo: 1 USDT = 1 USDT
-                    else:
-                        # Buscar preço do par direto (ex.: GALABRL ou GALAUSDT)
-                        pair = f"{asset}{selected_currency}"
-                        price = float(bot.get_price_data(pair)[0])
-                except Exception:
-                    try:
-                        # Tentar conversão indireta via BTC (ex.: YOYO → BTC → USDT)
-                        pair_to_btc = f"{asset}BTC"
-                        price_in_btc = float(bot.get_price_data(pair_to_btc)[0])
-                        btc_to_selected = float(bot.get_price_data(f"BTC{selected_currency}")[0])
-                        price = price_in_btc * btc_to_selected
-                    except Exception:
-                        price = 0  # Moeda sem par disponível
-
-                # Calcular o valor total da moeda
-                value_in_currency = amount * price
-                total_value += value_in_currency
-
-                # Exibir moeda no formato "MOEDA: VALOR / QTDE"
-                portfolio_text.insert(
-                    tk.END, f"- {asset}: {value_in_currency:.2f} {selected_currency} / {amount:.6f}\n"
-                    if price > 0
-                    else f"- {asset}: Preço não disponível / {amount:.6f}\n"
-                )
+    if error is not None:
+        portfolio_text.insert(tk.END, f"\nErro ao buscar dados: {str(error)}")
+    else:
+        rows, total_value = portfolio
+        for asset, amount, value_in_currency in rows:
+            # Exibir moeda no formato "MOEDA: VALOR / QTDE"
+            portfolio_text.insert(
+                tk.END, f"- {asset}: {value_in_currency:.2f} {selected_currency} / {amount:.6f}\n"
+                if value_in_currency is not None
+                else f"- {asset}: Preço não disponível / {amount:.6f}\n"
+            )
 
         # Exibir o valor total do portfólio
         portfolio_text.insert(tk.END, f"\nValor Total: {total_value:.2f} {selected_currency}\n")
 
-    except Exception as e:
-        portfolio_text.insert(tk.END, f"\nErro ao buscar dados: {str(e)}")
-
     # Atualizar hora da última atualização
     current_time = datetime.now().strftime("%H:%M:%S")
     last_update_label.config(text=f"Última atualização: {current_time}")
@@ -68,7 +74,7 @@ def update_portfolio():
     update_button.config(state=tk.NORMAL, text="Atualizar Portfólio")
 
     # Atualizar novamente após 1 minuto (60000 ms)
-    root.after(60000, update_portfolio)
+    refresh_job = root.after(60000, update_portfolio)
 
 # Carregar configurações ao abrir
 def load_initial_portfolio():
@@ -3,3 +3,92 @@ def convert_to_brl(amount, pair_price):
     Converte um valor para BRL baseado no preço do par.
     """
     return amount * pair_price
+
+# Moedas de cotação conhecidas, usadas para separar base/cotação dos símbolos
+QUOTE_ASSETS = [
+    'FDUSD', 'USDT', 'USDC', 'BUSD', 'TUSD', 'DAI', 'BTC', 'ETH', 'BNB',
+    'BRL', 'EUR', 'TRY', 'GBP', 'AUD', 'JPY', 'XRP', 'TRX', 'DOGE',
+]
+
+# Intermediárias preferidas quando não existe par direto
+PREFERRED_INTERMEDIATES = ['BTC', 'USDT']
+
+def split_symbol(symbol, quote_assets=QUOTE_ASSETS):
+    """
+    Separa um símbolo (ex.: GALABRL) em (base, cotação) pelo sufixo de cotação.
+    Retorna None quando nenhuma cotação conhecida corresponde.
+    """
+    for quote in sorted(quote_assets, key=len, reverse=True):
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return None
+
+class PriceGraph:
+    """
+    Grafo de preços montado a partir de um único snapshot de tickers.
+
+    Cada par BASEQUOTE vira uma aresta base→cotação (preço) e a inversa
+    (1/preço). rates_to() resolve em uma única passada o preço de todos os
+    ativos numa moeda: par direto, ou via uma intermediária (BTC, USDT, ...).
+    """
+
+    def __init__(self, prices, quote_assets=QUOTE_ASSETS):
+        """
+        Parâmetros:
+        - prices: dicionário {símbolo: preço}.
+        - quote_assets: moedas de cotação conhecidas.
+        """
+        self.edges = {}
+        for symbol, price in prices.items():
+            parts = split_symbol(symbol, quote_assets)
+            if parts is None or price <= 0:
+                continue
+            base, quote = parts
+            self.edges.setdefault(base, {})[quote] = price
+            self.edges.setdefault(quote, {}).setdefault(base, 1 / price)
+
+    def rates_to(self, target, intermediates=PREFERRED_INTERMEDIATES):
+        """
+        Calcula o preço de cada ativo em `target`.
+
+        Retorna:
+        - dicionário {ativo: preço em target}; ativos sem conversão ficam de fora.
+        """
+        rates = {target: 1.0}
+        direct = {asset: quotes[target] for asset, quotes in self.edges.items() if target in quotes}
+        rates.update({asset: rate for asset, rate in direct.items() if asset not in rates})
+
+        # Uma intermediária: ativo → X → target, priorizando as preferidas
+        hops = [x for x in intermediates if x in rates] + [x for x in direct if x not in intermediates]
+        for asset, quotes in self.edges.items():
+            if asset in rates:
+                continue
+            for intermediate in hops:
+                if intermediate in quotes:
+                    rates[asset] = quotes[intermediate] * rates[intermediate]
+                    break
+        return rates
+
+def value_portfolio(balances, prices, currency):
+    """
+    Valoriza o portfólio numa moeda a partir de um snapshot de preços.
+
+    Parâmetros:
+    - balances: dicionário {ativo: quantidade}.
+    - prices: dicionário {símbolo: preço} (ex.: de get_all_tickers).
+    - currency: moeda de exibição (ex.: BRL).
+
+    Retorna:
+    - (linhas, total): linhas é uma lista de (ativo, quantidade, valor ou None).
+    """
+    rates = PriceGraph(prices).rates_to(currency)
+    rows = []
+    total = 0
+    for asset, amount in balances.items():
+        if amount > 0:
+            rate = rates.get(asset)
+            value = amount * rate if rate else None
+            if value is not None:
+                total += value
+            rows.append((asset, amount, value))
+    return rows, total